@@ -2,18 +2,35 @@
 # backend/server.py
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-import os, requests, urllib.parse, re
+import os, sys, urllib.parse, re
+from pathlib import Path
 from dotenv import load_dotenv
 
+# Métricas, respuestas y cliente upstream viven en common/ (compartido con local_api).
+# La raíz del repo se agrega al path para que funcione tanto ``uvicorn backend.server:app``
+# desde la raíz como ``uvicorn server:app`` dentro de backend/.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from common.metrics import MetricsMiddleware, prometheus_response  # noqa: E402
+from common.responses import CompressionMiddleware, FastJSONResponse  # noqa: E402
+from common.upstream import UpstreamClient  # noqa: E402
+
 load_dotenv()
-app = FastAPI(title="YouTube Live API")
+app = FastAPI(title="YouTube Live API", default_response_class=FastJSONResponse)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"], allow_methods=["*"], allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware, minimum_size=int(os.getenv("COMPRESS_MIN_BYTES", "1024")))
+app.add_middleware(MetricsMiddleware)
 
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")  # ponla en .env
 DEFAULT_VIDEO_ID = os.getenv("VIDEO_ID", "f2AMDc1EOt8")  # opcional
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
+YOUTUBE_API_BASE = os.getenv("YOUTUBE_API_BASE", "https://www.googleapis.com/youtube/v3").rstrip("/")
+
+# Mismo cliente async con pool de conexiones que local_api
+upstream = UpstreamClient(timeout=HTTP_TIMEOUT)
 
 def extract_video_id(q: str | None) -> str:
     """Acepta ID directo o URL de YouTube y devuelve el videoId."""
@@ -33,30 +50,36 @@ def extract_video_id(q: str | None) -> str:
         pass
     return q  # último intento
 
+@app.on_event("shutdown")
+async def _close_upstream():
+    await upstream.aclose()
+
 @app.get("/health")
-def health():
+async def health():
     return {"status": "ok"}
 
+@app.get("/metrics")
+def metrics():
+    return prometheus_response()
+
 @app.get("/live-data")
-def get_live_video_data(video: str | None = None):
+async def get_live_video_data(video: str | None = None):
     if not YOUTUBE_API_KEY:
         raise HTTPException(status_code=400, detail="Falta YOUTUBE_API_KEY")
 
     video_id = extract_video_id(video)
-    info_url = (
-        "https://www.googleapis.com/youtube/v3/videos"
-        f"?part=snippet,liveStreamingDetails,statistics&id={video_id}&key={YOUTUBE_API_KEY}"
-    )
-    r = requests.get(info_url, timeout=15)
-    if r.status_code != 200:
-        raise HTTPException(status_code=400, detail=f"No se pudo obtener datos: {r.text}")
-
-    data = r.json()
+    info_url = f"{YOUTUBE_API_BASE}/videos"
+    info_params = {"part": "snippet,liveStreamingDetails,statistics", "id": video_id, "key": YOUTUBE_API_KEY}
+    data = await upstream.get_json(info_url, params=info_params, revalidate=True)  # If-None-Match / 304
+    if data.get("_status_code") != 200:
+        raise HTTPException(status_code=400, detail=f"No se pudo obtener datos: {data.get('error')}")
+
     if not data.get("items"):
         raise HTTPException(status_code=404, detail="Video no encontrado")
 
     item = data["items"][0]
-    statistics = item.get("statistics", {}) or {}
+    # copia: el cuerpo puede venir del almacén de ETags y no debe mutarse
+    statistics = dict(item.get("statistics", {}) or {})
     live_details = item.get("liveStreamingDetails", {}) or {}
 
     # concurrentViewers (si está en vivo)
@@ -64,22 +87,27 @@ def get_live_video_data(video: str | None = None):
 
     # Live chat
     comentarios = []
+    chat_error = None
     live_chat_id = live_details.get("activeLiveChatId")
     if live_chat_id:
-        chat_url = (
-            "https://www.googleapis.com/youtube/v3/liveChat/messages"
-            f"?liveChatId={live_chat_id}&part=snippet,authorDetails&maxResults=200&key={YOUTUBE_API_KEY}"
-        )
-        cr = requests.get(chat_url, timeout=15)
-        if cr.status_code == 200:
-            for it in cr.json().get("items", []):
-                autor = it["authorDetails"]["displayName"]
-                mensaje = it["snippet"]["displayMessage"]
+        chat_url = f"{YOUTUBE_API_BASE}/liveChat/messages"
+        chat_params = {"liveChatId": live_chat_id, "part": "snippet,authorDetails", "maxResults": 200, "key": YOUTUBE_API_KEY}
+        # get_json no lanza: errores de red o JSON inválido vuelven como {"error", "_status_code"}
+        chat = await upstream.get_json(chat_url, params=chat_params)
+        if chat.get("_status_code") == 200:
+            for it in chat.get("items", []) or []:
+                autor = (it.get("authorDetails") or {}).get("displayName", "")
+                mensaje = (it.get("snippet") or {}).get("displayMessage", "")
                 comentarios.append({"autor": autor, "mensaje": mensaje})
+        else:
+            chat_error = chat.get("error") or f"No se pudo leer el chat ({chat.get('_status_code')})"
 
-    return {
+    out = {
         "videoId": video_id,
         "statistics": statistics,
         "liveCommentCount": len(comentarios),
         "comentarios": comentarios,
     }
+    if chat_error:
+        out["error"] = chat_error  # mismo formato que local_api: datos parciales + "error"
+    return out
@@ -0,0 +1,77 @@
+# bench/bench_payloads.py — Bytes y CPU por respuesta: JSONResponse vs FastJSONResponse + compresión
+#
+# Uso:  python bench/bench_payloads.py [--repeat 200]
+import argparse
+import gzip
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from starlette.responses import JSONResponse  # noqa: E402
+
+from common.responses import FastJSONResponse, brotli, project  # noqa: E402
+
+
+def live_data_payload(n_comments: int = 200) -> Dict[str, Any]:
+    comentarios = [
+        {"autor": f"usuario_{i}", "mensaje": f"Saludos desde Santa Cruz 🇧🇴 mensaje número {i} 👏👏", "ts": f"2025-01-01T20:{i % 60:02d}:00Z"}
+        for i in range(n_comments)
+    ]
+    statistics = {"concurrentViewers": 7107, "likeCount": 1520, "viewCount": 90411, "commentCount": 0, "liveCommentCount": 3410}
+    return {"items": [{"statistics": statistics, "comentarios": comentarios}]}
+
+
+def tiktok_payload(n_gifts: int = 5000) -> Dict[str, Any]:
+    gifts = [
+        {"user": f"fan_{i % 400}", "gift": ("Rose", "Lion", "Galaxy", "TikTok")[i % 4], "amount": 1 + i % 3, "diamonds": (1, 29999, 1000, 1)[i % 4], "ts": "2025-01-01T20:00:00Z"}
+        for i in range(n_gifts)
+    ]
+    stats = {"username": "eldeber", "likes": 250000, "comments": 8100, "viewers": 3100, "diamonds": 981233, "shares": 410, "giftsCount": n_gifts}
+    return {"items": [{"platform": "TikTok", "statistics": stats, "gifts": gifts}]}
+
+
+def cpu_us(fn: Callable[[], Any], repeat: int) -> float:
+    t0 = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - t0) / repeat * 1e6
+
+
+def row(name: str, payload: Dict[str, Any], response_cls, repeat: int) -> None:
+    body = response_cls(payload).body
+    gz = gzip.compress(body, compresslevel=6)
+    br = brotli.compress(body, quality=4) if brotli is not None else b""
+    print(
+        f"{name:<34} {len(body):>10,} {len(gz):>10,} {len(br) if br else '-':>10} "
+        f"{cpu_us(lambda: response_cls(payload), repeat):>12.1f} "
+        f"{cpu_us(lambda: gzip.compress(body, compresslevel=6), repeat):>10.1f}"
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=200)
+    ap.add_argument("--comments", type=int, default=200)
+    ap.add_argument("--gifts", type=int, default=5000)
+    args = ap.parse_args()
+
+    yt = live_data_payload(args.comments)
+    tt = tiktok_payload(args.gifts)
+    cases = [
+        ("live-data", yt),
+        ("live-data ?fields=statistics", project(yt, ["statistics"])),
+        ("tiktok-stats", tt),
+        ("tiktok-stats ?fields=statistics", project(tt, ["statistics"])),
+    ]
+    print(f"{'respuesta':<34} {'bytes':>10} {'gzip':>10} {'br':>10} {'render µs':>12} {'gzip µs':>10}")
+    for label, cls in (("JSONResponse", JSONResponse), ("FastJSONResponse", FastJSONResponse)):
+        print(f"--- {label}")
+        for name, payload in cases:
+            row(name, payload, cls, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
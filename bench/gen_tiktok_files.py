@@ -0,0 +1,60 @@
+# bench/gen_tiktok_files.py — Genera live_<user>.json de tamaño creciente para las pruebas de carga
+#
+# Uso:  python bench/gen_tiktok_files.py --out bench/data --sizes 100 1000 10000 50000
+#       y levantar local_api con TIKTOK_WATCH_DIR=bench/data
+#       (cada archivo queda como usuario ``bench<gifts>``, p.ej. ?user=bench10000)
+import argparse
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict
+
+GIFTS = [("Rose", 1), ("TikTok", 1), ("Finger Heart", 5), ("Rosa", 10), ("Galaxy", 1000), ("Lion", 29999)]
+
+
+def capture(username: str, n_gifts: int) -> Dict[str, Any]:
+    start = datetime(2025, 1, 1, 20, 0, tzinfo=timezone.utc)
+    gifts = []
+    for i in range(n_gifts):
+        name, diamonds = random.choice(GIFTS)
+        amount = random.randint(1, 5)
+        gifts.append({
+            "user": f"fan_{random.randint(1, max(10, n_gifts // 20))}",
+            "gift": name,
+            "amount": amount,
+            "diamonds": diamonds * amount,
+            "ts": (start + timedelta(seconds=i * 3600 / max(1, n_gifts))).isoformat().replace("+00:00", "Z"),
+        })
+    return {
+        "username": username,
+        "likes": random.randint(10_000, 500_000),
+        "comments": random.randint(1_000, 50_000),
+        "viewers": random.randint(100, 20_000),
+        "diamonds": sum(g["diamonds"] for g in gifts),
+        "shares": random.randint(10, 2_000),
+        "giftsCount": n_gifts,
+        "gifts": gifts,
+        "lastUpdate": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", default="bench/data")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+    random.seed(args.seed)
+
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    for n in args.sizes:
+        user = f"bench{n}"
+        path = out / f"live_{user}.json"
+        path.write_text(json.dumps(capture(user, n), ensure_ascii=False), encoding="utf-8")
+        print(f"{path}  {path.stat().st_size:,} bytes  ({n} gifts)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# bench/load.py — Generador de carga para local_api: throughput, p50/p95/p99 y llamadas upstream
+#
+# Pasos:
+#   1) python bench/stub_upstream.py --latency-ms 80 --error-rate 0.01
+#   2) python bench/gen_tiktok_files.py --out bench/data
+#   3) YOUTUBE_API_KEY=bench YOUTUBE_API_BASE=http://127.0.0.1:8900/youtube/v3 RATE_LIMIT_ENABLED=0 \
+#      TIKTOK_WATCH_DIR=bench/data uvicorn local_api.main:app --port 8000
+#      (con RATE_LIMIT_ENABLED=1 todo sale de una IP: se mediría el limitador, no la API)
+#   4) python bench/load.py --concurrency 50 --duration 30 --videos 20 \
+#        --tiktok-users bench100 bench10000 bench50000
+import argparse
+import asyncio
+import math
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # nearest-rank
+    rank = math.ceil(q / 100 * len(sorted_values))
+    return sorted_values[min(len(sorted_values), max(1, rank)) - 1]
+
+
+def build_targets(args) -> List[Tuple[str, str, Dict[str, str]]]:
+    # (etiqueta, ruta, params); cada worker elige al azar uno por petición
+    targets: List[Tuple[str, str, Dict[str, str]]] = [("/health", "/health", {})]
+    video_ids = [f"bench{i:06d}xx"[:11] for i in range(args.videos)]
+    for vid in video_ids:
+        targets.append(("/live-data", "/live-data", {"video": vid}))
+    for user in args.tiktok_users:
+        targets.append((f"/tiktok-stats?user={user}", "/tiktok-stats", {"user": user, "fallback": "false"}))
+    return targets
+
+
+async def upstream_calls(client: httpx.AsyncClient, stub: Optional[str], reset: bool = False) -> Dict[str, int]:
+    if not stub:
+        return {}
+    try:
+        if reset:
+            await client.post(f"{stub}/_reset")
+            return {}
+        return (await client.get(f"{stub}/_stats")).json()
+    except httpx.HTTPError:
+        return {}
+
+
+def is_ok(path: str, r: httpx.Response) -> bool:
+    # las rutas de datos responden 200 también cuando fallan ({"items": [], "error": ...})
+    if r.status_code != 200:
+        return False
+    if path == "/health":
+        return True
+    try:
+        body = r.json()
+    except ValueError:
+        return False
+    return isinstance(body, dict) and not body.get("error") and bool(body.get("items"))
+
+
+async def worker(client, base, targets, deadline, latencies, errors, weights) -> None:
+    while time.perf_counter() < deadline:
+        label, path, params = random.choices(targets, weights=weights)[0]
+        t0 = time.perf_counter()
+        try:
+            r = await client.get(base + path, params=params)
+            ok = is_ok(path, r)
+        except httpx.HTTPError:
+            ok = False
+        latencies[label].append(time.perf_counter() - t0)
+        if not ok:
+            errors[label] += 1
+
+
+async def run(args) -> None:
+    targets = build_targets(args)
+    # /health pesa poco: el foco es el camino de datos
+    weights = [0.1 if t[0] == "/health" else 1.0 for t in targets]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        await upstream_calls(client, args.stub, reset=True)
+        if args.warmup:
+            await asyncio.gather(*(client.get(args.base + p, params=q) for _, p, q in targets), return_exceptions=True)
+            await upstream_calls(client, args.stub, reset=True)
+
+        latencies: Dict[str, List[float]] = defaultdict(list)
+        errors: Dict[str, int] = defaultdict(int)
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(worker(client, args.base, targets, deadline, latencies, errors, weights) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        calls = await upstream_calls(client, args.stub)
+
+    groups: Dict[str, List[float]] = defaultdict(list)
+    group_errors: Dict[str, int] = defaultdict(int)
+    for label, values in latencies.items():
+        groups[label].extend(values)
+        group_errors[label] += errors[label]
+        groups["TOTAL"].extend(values)
+        group_errors["TOTAL"] += errors[label]
+
+    print(f"concurrency={args.concurrency} duration={elapsed:.1f}s base={args.base}")
+    print(f"{'ruta':<32} {'reqs':>8} {'req/s':>9} {'err':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for label in sorted(groups, key=lambda k: (k == "TOTAL", k)):
+        v = sorted(groups[label])
+        print(
+            f"{label:<32} {len(v):>8} {len(v) / elapsed:>9.1f} {group_errors[label]:>6} "
+            f"{percentile(v, 50) * 1000:>9.1f} {percentile(v, 95) * 1000:>9.1f} {percentile(v, 99) * 1000:>9.1f}"
+        )
+    if calls:
+        print("llamadas upstream:", ", ".join(f"{k}={v}" for k, v in sorted(calls.items())))
+        total_reqs = len(groups["TOTAL"])
+        data_calls = calls.get("videos.list", 0) + calls.get("liveChatMessages.list", 0)
+        if total_reqs:
+            print(f"llamadas upstream por petición: {data_calls / total_reqs:.4f}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--base", default="http://127.0.0.1:8000")
+    ap.add_argument("--stub", default="http://127.0.0.1:8900", help="stub upstream para contar llamadas ('' = no contar)")
+    ap.add_argument("--concurrency", type=int, default=20)
+    ap.add_argument("--duration", type=float, default=20.0)
+    ap.add_argument("--timeout", type=float, default=30.0)
+    ap.add_argument("--videos", type=int, default=10, help="cantidad de videoIds distintos")
+    ap.add_argument("--tiktok-users", nargs="*", default=["bench100", "bench10000"])
+    ap.add_argument("--no-warmup", dest="warmup", action="store_false")
+    asyncio.run(run(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# bench/stub_upstream.py — Stub local de videos.list y liveChat/messages del YouTube Data API
+#
+# Uso:  python bench/stub_upstream.py --port 8900 --latency-ms 80 --jitter-ms 40 --error-rate 0.02
+#       y luego levantar local_api con YOUTUBE_API_BASE=http://127.0.0.1:8900/youtube/v3
+#
+# Las estadísticas cambian cada ``--change-every`` segundos (el ETag también), así
+# se ejercita tanto la revalidación (304) como las respuestas completas.
+import argparse
+import asyncio
+import hashlib
+import random
+import time
+from collections import Counter
+from typing import Any, Dict
+
+import uvicorn
+from fastapi import FastAPI, Query, Request, Response
+from fastapi.responses import JSONResponse
+
+CONFIG: Dict[str, float] = {"latency_ms": 50.0, "jitter_ms": 20.0, "error_rate": 0.0, "change_every": 5.0}
+CALLS: Counter = Counter()
+
+app = FastAPI(title="Stub YouTube Data API")
+
+
+async def _simulate() -> bool:
+    """Espera la latencia configurada; True si esta llamada debe fallar."""
+    delay = CONFIG["latency_ms"] + random.uniform(-1, 1) * CONFIG["jitter_ms"]
+    await asyncio.sleep(max(0.0, delay) / 1000.0)
+    return random.random() < CONFIG["error_rate"]
+
+
+def _epoch() -> int:
+    return int(time.time() // max(0.1, CONFIG["change_every"]))
+
+
+def _video(video_id: str, epoch: int) -> Dict[str, Any]:
+    seed = int(hashlib.md5(video_id.encode()).hexdigest()[:8], 16)
+    return {
+        "kind": "youtube#video",
+        "id": video_id,
+        "snippet": {"title": f"Live {video_id}", "channelTitle": "El Deber", "liveBroadcastContent": "live"},
+        "liveStreamingDetails": {
+            "actualStartTime": "2025-01-01T20:00:00Z",
+            "concurrentViewers": str(1000 + seed % 5000 + epoch % 97),
+            "activeLiveChatId": f"chat-{video_id}",
+        },
+        "statistics": {"viewCount": str(50000 + epoch), "likeCount": str(1000 + epoch % 500), "commentCount": "0"},
+    }
+
+
+@app.get("/youtube/v3/videos")
+async def videos(request: Request, id: str = Query(default="")):
+    CALLS["videos.list"] += 1
+    if await _simulate():
+        CALLS["videos.list:error"] += 1
+        return JSONResponse({"error": {"code": 503, "message": "stub error"}}, status_code=503)
+    epoch = _epoch()
+    ids = [v for v in id.split(",") if v]
+    etag = f'"{hashlib.md5(f"{id}:{epoch}".encode()).hexdigest()}"'
+    if request.headers.get("if-none-match") == etag:
+        CALLS["videos.list:304"] += 1
+        return Response(status_code=304, headers={"ETag": etag})
+    body = {"kind": "youtube#videoListResponse", "etag": etag, "items": [_video(v, epoch) for v in ids]}
+    return JSONResponse(body, headers={"ETag": etag})
+
+
+@app.get("/youtube/v3/liveChat/messages")
+async def chat_messages(liveChatId: str = Query(default=""), pageToken: str = Query(default=""), maxResults: int = Query(default=200)):
+    CALLS["liveChatMessages.list"] += 1
+    if await _simulate():
+        CALLS["liveChatMessages.list:error"] += 1
+        return JSONResponse({"error": {"code": 503, "message": "stub error"}}, status_code=503)
+    page = int(pageToken or 0)
+    n = random.randint(0, min(20, maxResults))
+    items = [
+        {
+            "id": f"{liveChatId}-{page}-{i}",
+            "snippet": {"displayMessage": f"mensaje {page}-{i} 🔥 vamos", "publishedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())},
+            "authorDetails": {"displayName": f"usuario_{random.randint(1, 300)}"},
+        }
+        for i in range(n)
+    ]
+    return {"items": items, "nextPageToken": str(page + 1), "pollingIntervalMillis": 2000}
+
+
+@app.get("/_stats")
+async def stats():
+    return dict(CALLS)
+
+
+@app.post("/_reset")
+async def reset():
+    CALLS.clear()
+    return {"reset": True}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8900)
+    ap.add_argument("--latency-ms", type=float, default=CONFIG["latency_ms"])
+    ap.add_argument("--jitter-ms", type=float, default=CONFIG["jitter_ms"])
+    ap.add_argument("--error-rate", type=float, default=CONFIG["error_rate"])
+    ap.add_argument("--change-every", type=float, default=CONFIG["change_every"])
+    args = ap.parse_args()
+    CONFIG.update(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate, change_every=args.change_every)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# common — Piezas HTTP compartidas por local_api y backend (métricas, respuestas, cliente upstream)
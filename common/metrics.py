@@ -0,0 +1,248 @@
+# common/metrics.py — Métricas en formato de texto de Prometheus (sin dependencias)
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from starlette.responses import PlainTextResponse
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAST_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [f"{self.name}{_fmt_labels(self.labelnames, k)} {_fmt_value(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # por etiqueta: [conteo por bucket (no acumulado) + overflow, suma, total]
+        self._values: Dict[Labels, List[Any]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            v = self._values.get(labels)
+            if v is None:
+                v = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            v[0][i] += 1
+            v[1] += value
+            v[2] += 1
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, *labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._values.items())
+        lines = self._header()
+        for labels, (counts, total, n) in items:
+            acc = 0
+            for le, c in zip(self.buckets, counts):
+                acc += c
+                le_label = 'le="%s"' % le
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, labels, le_label)} {acc}")
+            inf_label = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, labels, inf_label)} {n}")
+            lines.append(f"{self.name}_sum{_fmt_labels(self.labelnames, labels)} {_fmt_value(total)}")
+            lines.append(f"{self.name}_count{_fmt_labels(self.labelnames, labels)} {n}")
+        return lines
+
+
+Collector = Callable[[], List[Tuple[str, str, str, Dict[str, str], float]]]
+
+
+class Registry:
+    """Métricas del proceso más ``collectors`` que leen estado ajeno (cachés) al exportar."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Collector] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collector: Collector) -> None:
+        """``collector()`` devuelve ``(nombre, tipo, ayuda, etiquetas, valor)`` por muestra."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for m in self._metrics:
+            lines.extend(m.render())
+        # las muestras de un mismo nombre deben salir juntas bajo un solo HELP/TYPE
+        families: Dict[str, List[str]] = {}
+        for collect in self._collectors:
+            try:
+                samples = collect()
+            except Exception:
+                continue
+            for name, kind, help, labels, value in samples:
+                family = families.get(name)
+                if family is None:
+                    family = families[name] = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+                family.append(f"{name}{_fmt_labels(list(labels), list(labels.values()))} {_fmt_value(value)}")
+        for family in families.values():
+            lines.extend(family)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter("http_requests_total", "Peticiones atendidas por ruta, método y código.", ("route", "method", "status"))
+HTTP_LATENCY = REGISTRY.histogram("http_request_duration_seconds", "Latencia de las rutas propias.", ("route", "method"))
+HTTP_BYTES_OUT = REGISTRY.counter("http_response_bytes_total", "Bytes de cuerpo enviados por ruta.", ("route",))
+HTTP_IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "Peticiones en curso.")
+
+UPSTREAM_LATENCY = REGISTRY.histogram("upstream_request_duration_seconds", "Latencia de las llamadas upstream (incluye reintentos).", ("host", "endpoint"))
+UPSTREAM_RESPONSES = REGISTRY.counter("upstream_responses_total", "Respuestas upstream por código (error = fallo de red).", ("host", "endpoint", "status"))
+UPSTREAM_BYTES_IN = REGISTRY.counter("upstream_response_bytes_total", "Bytes recibidos de upstream.", ("host", "endpoint"))
+UPSTREAM_IN_FLIGHT = REGISTRY.gauge("upstream_requests_in_flight", "Llamadas upstream en curso.", ("host",))
+JSON_PARSE = REGISTRY.histogram("json_parse_duration_seconds", "Tiempo de parseo de JSON por origen.", ("source",), buckets=FAST_BUCKETS)
+
+
+class MetricsMiddleware:
+    """Middleware ASGI: latencia, código, bytes y peticiones en curso por ruta.
+
+    La ruta se etiqueta con su plantilla (``/tiktok/capturers/{user}``) para no
+    crear una serie por valor; lo que no coincide con ninguna ruta va a ``unmatched``.
+    """
+
+    def __init__(self, app, skip: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.skip = set(skip)
+        self._route_paths: Dict[Any, str] = {}
+
+    def _route_of(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            for r in getattr(scope.get("app"), "routes", []):
+                if getattr(r, "endpoint", None) is endpoint:
+                    path = r.path
+                    break
+            path = self._route_paths[endpoint] = path or getattr(endpoint, "__name__", "unmatched")
+        return path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in self.skip:
+            await self.app(scope, receive, send)
+            return
+        status = ["500"]
+        sent = [0]
+
+        async def wrapped_send(message):
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+            elif message["type"] == "http.response.body":
+                sent[0] += len(message.get("body", b""))
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, wrapped_send)
+        finally:
+            elapsed = time.perf_counter() - t0
+            HTTP_IN_FLIGHT.dec()
+            route, method = self._route_of(scope), scope.get("method", "")
+            HTTP_LATENCY.observe(elapsed, route, method)
+            HTTP_REQUESTS.inc(route, method, status[0])
+            HTTP_BYTES_OUT.inc(route, amount=sent[0])
+
+
+def cache_collector(name: str, stats: Callable[[], Dict[str, Any]]) -> Collector:
+    """Exporta los contadores de ``TTLCache.stats()`` con la etiqueta ``cache=name``."""
+
+    def collect():
+        s = stats()
+        labels = {"cache": name}
+        return [
+            ("cache_hits_total", "counter", "Aciertos de caché.", labels, s.get("hits", 0)),
+            ("cache_misses_total", "counter", "Fallos de caché.", labels, s.get("misses", 0)),
+            ("cache_coalesced_total", "counter", "Peticiones unidas a una carga en curso.", labels, s.get("coalesced", 0)),
+            ("cache_evictions_total", "counter", "Entradas desalojadas.", labels, s.get("evictions", 0)),
+            ("cache_entries", "gauge", "Entradas en caché.", labels, s.get("entries", 0)),
+        ]
+
+    return collect
+
+
+def prometheus_response(registry: Optional[Registry] = None) -> PlainTextResponse:
+    return PlainTextResponse((registry or REGISTRY).render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,142 @@
+# common/responses.py — Serialización JSON rápida, proyección de campos y compresión
+import gzip
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+
+try:  # opcional: orjson serializa varias veces más rápido que json
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:  # opcional: brotli comprime mejor que gzip para JSON
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """``JSONResponse`` que serializa con orjson (si está instalado) y sin espacios."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# ---------- Proyección ----------
+def parse_fields(fields: str) -> List[str]:
+    return [f.strip() for f in (fields or "").split(",") if f.strip()]
+
+
+def wants(fields: List[str], name: str) -> bool:
+    """True si ``name`` (o algo dentro de él) fue pedido; sin ``fields`` se pide todo."""
+    return not fields or any(f == name or f.startswith(name + ".") for f in fields)
+
+
+def _project_one(obj: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for path in fields:
+        head, _, rest = path.partition(".")
+        if head not in obj:
+            continue
+        if rest and isinstance(obj[head], dict):
+            sub = out.setdefault(head, {})
+            if isinstance(sub, dict):
+                sub.update(_project_one(obj[head], [rest]))
+        else:
+            out[head] = obj[head]
+    return out
+
+
+def project(payload: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """Deja solo los campos pedidos de cada elemento de ``items``.
+
+    ``fields=statistics`` conserva ``statistics`` entero; ``statistics.likes``
+    solo ese contador. Las claves fuera de ``items`` (error, warning...) se
+    mantienen siempre.
+    """
+    if not fields or not isinstance(payload.get("items"), list):
+        return payload
+    keep = ["platform", *fields]
+    return {**payload, "items": [_project_one(it, keep) if isinstance(it, dict) else it for it in payload["items"]]}
+
+
+# ---------- Compresión ----------
+class CompressionMiddleware:
+    """Middleware ASGI con negociación ``br``/``gzip`` según ``Accept-Encoding``.
+
+    Solo comprime respuestas completas de al menos ``minimum_size`` bytes;
+    los streams (``text/event-stream`` o cuerpos en varios trozos) pasan tal
+    cual para no retrasar los eventos SSE.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _choose(self, accept: str) -> Optional[str]:
+        offered = {p.split(";")[0].strip().lower() for p in accept.split(",")}
+        if brotli is not None and "br" in offered:
+            return "br"
+        if "gzip" in offered:
+            return "gzip"
+        return None
+
+    def _compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self._choose(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Dict[str, Any] = {}
+        passthrough = False
+
+        async def wrapped_send(message):
+            nonlocal passthrough
+            if message["type"] == "http.response.start":
+                start.update(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start.setdefault("headers", []))
+            body = message.get("body", b"")
+            streaming = message.get("more_body", False)
+            skip = (
+                streaming
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or headers.get("content-type", "").startswith("text/event-stream")
+            )
+            if skip:
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            body = self._compress(encoding, body)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, wrapped_send)
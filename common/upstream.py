@@ -0,0 +1,183 @@
+# common/upstream.py — Cliente HTTP async compartido para llamadas upstream
+import asyncio
+import random
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from .metrics import JSON_PARSE, UPSTREAM_BYTES_IN, UPSTREAM_IN_FLIGHT, UPSTREAM_LATENCY, UPSTREAM_RESPONSES
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Parámetros que no identifican al recurso (no forman parte de la clave del ETag)
+_ETAG_IGNORED_PARAMS = {"key"}
+
+
+class ETagStore:
+    """Último ETag y cuerpo parseado por recurso (LRU acotado)."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max(1, max_entries)
+        self._data: "OrderedDict[str, Tuple[str, Dict[str, Any]]]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self.conditional = 0
+        self.not_modified = 0
+        self.bytes_saved = 0
+
+    @staticmethod
+    def key(url: str, params: Optional[Dict[str, Any]]) -> str:
+        items = sorted((k, str(v)) for k, v in (params or {}).items() if k not in _ETAG_IGNORED_PARAMS)
+        return url + "?" + "&".join(f"{k}={v}" for k, v in items)
+
+    def get(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        entry = self._data.get(key)
+        if entry is not None:
+            self._data.move_to_end(key)
+        return entry
+
+    def put(self, key: str, etag: str, body: Dict[str, Any], size: int) -> None:
+        self._data[key] = (etag, body)
+        self._data.move_to_end(key)
+        self._sizes[key] = size
+        while len(self._data) > self.max_entries:
+            old, _ = self._data.popitem(last=False)
+            self._sizes.pop(old, None)
+
+    def not_modified_hit(self, key: str) -> None:
+        self.not_modified += 1
+        self.bytes_saved += self._sizes.get(key, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._data),
+            "conditionalRequests": self.conditional,
+            "notModified": self.not_modified,
+            "bytesSaved": self.bytes_saved,
+        }
+
+
+class UpstreamClient:
+    """Cliente httpx.AsyncClient con keep-alive, límite de concurrencia por host
+    y reintentos con backoff exponencial + jitter.
+
+    Un solo cliente por proceso: las conexiones TCP/TLS a googleapis se reutilizan
+    entre peticiones en vez de abrirse en cada ``requests.get``.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 12.0,
+        max_connections: int = 100,
+        max_keepalive: int = 20,
+        per_host_limit: int = 10,
+        retries: int = 2,
+        backoff: float = 0.3,
+    ):
+        self.timeout = timeout
+        self.per_host_limit = max(1, per_host_limit)
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_sems: Dict[str, asyncio.Semaphore] = {}
+        self.etags = ETagStore()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=self._limits)
+        return self._client
+
+    def _sem(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        sem = self._host_sems.get(host)
+        if sem is None:
+            sem = self._host_sems[host] = asyncio.Semaphore(self.per_host_limit)
+        return sem
+
+    async def _sleep_before_retry(self, attempt: int) -> None:
+        # "full jitter": espera aleatoria entre 0 y backoff * 2^intento
+        await asyncio.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    @staticmethod
+    def _labels(url: str) -> Tuple[str, str]:
+        parts = urlsplit(url)
+        return parts.netloc, parts.path.rstrip("/").rsplit("/", 1)[-1] or "/"
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        host, endpoint = self._labels(url)
+        UPSTREAM_IN_FLIGHT.inc(host)
+        try:
+            with UPSTREAM_LATENCY.time(host, endpoint):
+                r = await self._get_with_retries(url, params, headers)
+        except httpx.HTTPError:
+            UPSTREAM_RESPONSES.inc(host, endpoint, "error")
+            raise
+        finally:
+            UPSTREAM_IN_FLIGHT.dec(host)
+        UPSTREAM_RESPONSES.inc(host, endpoint, str(r.status_code))
+        UPSTREAM_BYTES_IN.inc(host, endpoint, amount=len(r.content))
+        return r
+
+    async def _get_with_retries(self, url: str, params: Optional[Dict[str, Any]], headers: Optional[Dict[str, str]]) -> httpx.Response:
+        attempt = 0
+        while True:
+            try:
+                async with self._sem(url):
+                    r = await self.client.get(url, params=params, headers=headers)
+            except (httpx.TimeoutException, httpx.TransportError):
+                if attempt >= self.retries:
+                    raise
+            else:
+                if r.status_code not in RETRY_STATUS or attempt >= self.retries:
+                    return r
+            await self._sleep_before_retry(attempt)
+            attempt += 1
+
+    async def get_json(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        revalidate: bool = False,
+    ) -> Dict[str, Any]:
+        """GET que siempre devuelve un dict con ``_status_code`` (como los helpers de YouTube).
+
+        Con ``revalidate=True`` se envía ``If-None-Match`` con el último ETag del
+        recurso; ante un 304 se devuelve el cuerpo guardado sin descargar ni
+        parsear nada (``_revalidated`` queda en True).
+        """
+        key = self.etags.key(url, params) if revalidate else ""
+        cached = self.etags.get(key) if revalidate else None
+        if cached is not None:
+            headers = {**(headers or {}), "If-None-Match": cached[0]}
+            self.etags.conditional += 1
+        try:
+            r = await self.get(url, params=params, headers=headers)
+        except httpx.HTTPError as e:
+            return {"error": f"Error de red: {e.__class__.__name__}", "_status_code": None}
+
+        if r.status_code == 304 and cached is not None:
+            self.etags.not_modified_hit(key)
+            return {**cached[1], "_status_code": 200, "_revalidated": True}
+
+        try:
+            with JSON_PARSE.time(self._labels(url)[1]):
+                data = r.json()
+        except Exception:
+            data = {"error": f"Respuesta no-JSON ({r.status_code})"}
+        if not isinstance(data, dict):
+            data = {"data": data}
+        if revalidate and r.status_code == 200:
+            etag = r.headers.get("ETag") or data.get("etag")
+            if etag:
+                self.etags.put(key, etag, data, len(r.content))
+        data = {**data, "_status_code": r.status_code}
+        return data
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
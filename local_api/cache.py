@@ -0,0 +1,130 @@
+# local_api/cache.py — Caché TTL en memoria con coalescencia de peticiones
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+EVICTION_POLICIES = ("lru", "fifo")
+
+
+class TTLCache:
+    """Caché compartida por clave con expiración (TTL) y límite de entradas.
+
+    - ``policy="lru"`` desaloja la entrada menos usada; ``"fifo"`` la más antigua.
+    - Varios *miss* concurrentes de la misma clave comparten una sola llamada
+      al ``loader`` (single-flight), esperando la misma tarea; que un cliente
+      se desconecte no cancela la carga de los demás.
+
+    Se usa desde el event loop de la API (sin hilos), por eso no lleva locks.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 256, policy: str = "lru"):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Política de desalojo no soportada: {policy!r} (usa {EVICTION_POLICIES})")
+        self.ttl = float(ttl)
+        self.max_entries = max(1, int(max_entries))
+        self.policy = policy
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def _get_fresh(self, key: Hashable, now: float) -> Tuple[bool, Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= now:
+            del self._data[key]
+            return False, None
+        if self.policy == "lru":
+            self._data.move_to_end(key)
+        return True, value
+
+    def _store(self, key: Hashable, value: Any, now: float, ttl: Optional[float] = None) -> None:
+        self._data[key] = (now + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        found, value = self._get_fresh(key, time.monotonic())
+        return value if found else None
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self._store(key, value, time.monotonic(), ttl)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        should_cache: Callable[[Any], bool] = lambda _v: True,
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """``ttl`` sobrescribe el TTL por defecto solo para esta entrada."""
+        found, value = self._get_fresh(key, time.monotonic())
+        if found:
+            self.hits += 1
+            return value
+        self.misses += 1
+
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self.coalesced += 1
+        else:
+            # La carga corre como tarea propia: si el cliente que la inició se desconecta,
+            # los demás que esperan la misma clave siguen recibiendo el resultado.
+            flight = asyncio.ensure_future(self._load(key, loader, should_cache, ttl))
+            # evita "exception was never retrieved" si todos los que esperaban se fueron
+            flight.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._inflight[key] = flight
+        # shield: cancelar a este cliente no cancela la carga compartida
+        return await asyncio.shield(flight)
+
+    async def _load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        should_cache: Callable[[Any], bool],
+        ttl: Optional[float],
+    ) -> Any:
+        try:
+            value = await loader()
+            if should_cache(value):
+                self._store(key, value, time.monotonic(), ttl)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def has_fresh(self, key: Hashable) -> bool:
+        """True si ``key`` tiene un valor vigente (sin contar hit ni tocar el orden LRU)."""
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def is_inflight(self, key: Hashable) -> bool:
+        """True si hay un ``loader`` en curso para ``key`` (un nuevo pedido se uniría a él)."""
+        return key in self._inflight
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "maxEntries": self.max_entries,
+            "ttlSeconds": self.ttl,
+            "policy": self.policy,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "inFlight": len(self._inflight),
+            "hitRatio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
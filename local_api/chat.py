@@ -0,0 +1,327 @@
+# local_api/chat.py — Sondeo en segundo plano del chat en vivo de YouTube
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+
+from .chat_analytics import ChatAnalytics
+
+
+class ChatBuffer:
+    """Ring buffer de mensajes con deduplicación por ID y contadores acumulados.
+
+    Si se pasa ``analytics`` cada mensaje nuevo (no duplicado) también lo alimenta.
+    """
+
+    def __init__(self, max_messages: int = 500, max_seen_ids: int = 5000, analytics: Optional[ChatAnalytics] = None):
+        self._messages: Deque[Dict[str, str]] = deque(maxlen=max_messages)
+        self._seen_order: Deque[str] = deque()
+        self._seen: Set[str] = set()
+        self._max_seen = max(max_messages, max_seen_ids)
+        self._lock = threading.Lock()
+        self.total = 0
+        self.duplicates = 0
+        self.last_message_at: Optional[float] = None
+        self.analytics = analytics
+
+    def add(self, msg_id: str, comment: Dict[str, str]) -> bool:
+        with self._lock:
+            if msg_id:
+                if msg_id in self._seen:
+                    self.duplicates += 1
+                    return False
+                self._seen.add(msg_id)
+                self._seen_order.append(msg_id)
+                if len(self._seen_order) > self._max_seen:
+                    self._seen.discard(self._seen_order.popleft())
+            self._messages.append(comment)
+            self.total += 1
+            self.last_message_at = time.time()
+        if self.analytics is not None:
+            self.analytics.add(comment)
+        return True
+
+    def snapshot(self, limit: int = 200) -> Dict[str, Any]:
+        with self._lock:
+            n = len(self._messages)
+            start = max(0, n - limit)
+            recent = [self._messages[i] for i in range(start, n)]
+            return {"comentarios": recent, "total": self.total, "duplicates": self.duplicates}
+
+
+class _ChatWorker:
+    """Base de los workers de chat: hilo daemon, parada por inactividad y estado común."""
+
+    thread_prefix = "chat"
+
+    def __init__(self, key: str, buffer: ChatBuffer, idle_timeout: float):
+        self.key = key
+        self.buffer = buffer
+        self.idle_timeout = idle_timeout
+        self.ended = False
+        self.first_page = threading.Event()
+        self.last_access = time.monotonic()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._main, name=f"{self.thread_prefix}-{key[:12]}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive() and not self._stop.is_set()
+
+    def touch(self) -> None:
+        self.last_access = time.monotonic()
+
+    def is_idle(self) -> bool:
+        return time.monotonic() - self.last_access > self.idle_timeout
+
+    def inherit(self, prev: "_ChatWorker") -> "_ChatWorker":
+        """Continúa donde quedó ``prev`` (detenido por inactividad o por el límite del pool).
+
+        Se comparte su buffer (y con él totales y analítica); como ya hay
+        mensajes, no hace falta esperar la primera página.
+        """
+        self.buffer = prev.buffer
+        self.first_page.set()
+        return self
+
+    def _main(self) -> None:
+        try:
+            self._run()
+        finally:
+            self._stop.set()
+            self.first_page.set()
+
+    def _run(self) -> None:
+        raise NotImplementedError
+
+
+class LiveChatPoller(_ChatWorker):
+    """Hilo que sigue ``nextPageToken`` de liveChat/messages para un ``liveChatId``.
+
+    Respeta ``pollingIntervalMillis`` y se detiene solo si nadie lo consulta
+    durante ``idle_timeout`` segundos o si el chat terminó.
+    """
+
+    def __init__(
+        self,
+        live_chat_id: str,
+        fetch: Callable[[Optional[str]], Dict[str, Any]],
+        buffer: ChatBuffer,
+        idle_timeout: float = 60.0,
+        min_interval: float = 1.0,
+        error_backoff: float = 10.0,
+        pace: Optional[Callable[[], float]] = None,
+    ):
+        super().__init__(live_chat_id, buffer, idle_timeout)
+        self.live_chat_id = live_chat_id
+        self._fetch = fetch
+        self._pace = pace  # intervalo mínimo externo (p. ej. el presupuesto de cuota)
+        self.min_interval = min_interval
+        self.error_backoff = error_backoff
+        self.page_token: Optional[str] = None
+        self.polls = 0
+        self.errors = 0
+        self.last_status: Optional[int] = None
+        self.interval = min_interval
+
+    def inherit(self, prev: _ChatWorker) -> "LiveChatPoller":
+        super().inherit(prev)
+        # seguir desde el último nextPageToken: no se vuelven a pedir (ni contar) páginas viejas
+        self.page_token = getattr(prev, "page_token", None)
+        return self
+
+    def _ingest(self, data: Dict[str, Any]) -> None:
+        for it in data.get("items", []) or []:
+            sn = it.get("snippet", {}) or {}
+            au = it.get("authorDetails", {}) or {}
+            self.buffer.add(it.get("id", ""), {
+                "autor": au.get("displayName", ""),
+                "mensaje": sn.get("displayMessage", ""),
+                "ts": sn.get("publishedAt", ""),
+            })
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self.is_idle():
+                break
+            try:
+                data = self._fetch(self.page_token)
+            except Exception:
+                data = {"_status_code": None}
+            self.polls += 1
+            self.last_status = data.get("_status_code")
+
+            if self.last_status == 200:
+                self._ingest(data)
+                self.page_token = data.get("nextPageToken") or self.page_token
+                self.interval = max(self.min_interval, to_seconds(data.get("pollingIntervalMillis")))
+                if self._pace is not None:
+                    self.interval = max(self.interval, self._pace())
+                if data.get("offlineAt"):
+                    self.ended = True
+            elif self.last_status in (403, 404):
+                # liveChatEnded / liveChatNotFound / chat deshabilitado
+                self.ended = True
+            else:
+                self.errors += 1
+                self.interval = self.error_backoff
+
+            self.first_page.set()
+            if self.ended:
+                break
+            self._stop.wait(self.interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "liveChatId": self.live_chat_id,
+            "alive": self.is_alive(),
+            "ended": self.ended,
+            "polls": self.polls,
+            "errors": self.errors,
+            "lastStatus": self.last_status,
+            "intervalSeconds": self.interval,
+            "totalMessages": self.buffer.total,
+            "duplicates": self.buffer.duplicates,
+        }
+
+
+class PytchatWorker(_ChatWorker):
+    """Worker de larga duración con pytchat para videos sin ``activeLiveChatId``.
+
+    Mantiene un único cliente pytchat por video y vuelca los mensajes al buffer
+    compartido; así el endpoint nunca espera al scraper.
+    """
+
+    thread_prefix = "pytchat"
+
+    def __init__(self, video_id: str, buffer: ChatBuffer, idle_timeout: float = 60.0, poll_interval: float = 1.0):
+        super().__init__(video_id, buffer, idle_timeout)
+        self.video_id = video_id
+        self.poll_interval = poll_interval
+        self.error: Optional[str] = None
+
+    def _run(self) -> None:
+        try:
+            import pytchat  # type: ignore
+            # interruptable=False: pytchat registra un manejador de señales que solo funciona en el hilo principal
+            chat = pytchat.create(video_id=self.video_id, interruptable=False)
+        except Exception as e:
+            self.error = str(e)
+            self.ended = True
+            return
+        try:
+            while not self._stop.is_set() and not self.is_idle():
+                if not chat.is_alive():
+                    self.ended = True
+                    break
+                for c in chat.get().sync_items():
+                    self.buffer.add(getattr(c, "id", ""), {
+                        "autor": getattr(c.author, "name", ""),
+                        "mensaje": getattr(c, "message", ""),
+                        "ts": getattr(c, "timestamp", ""),
+                    })
+                self.first_page.set()
+                self._stop.wait(self.poll_interval)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            try:
+                chat.terminate()
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "videoId": self.video_id,
+            "alive": self.is_alive(),
+            "ended": self.ended,
+            "error": self.error,
+            "totalMessages": self.buffer.total,
+            "duplicates": self.buffer.duplicates,
+        }
+
+
+def to_seconds(millis: Any) -> float:
+    try:
+        return float(millis) / 1000.0
+    except Exception:
+        return 0.0
+
+
+class ChatPollerRegistry:
+    """Un worker por clave (``liveChatId`` o videoId).
+
+    Los workers detenidos (chat terminado o sin consultas) conservan su buffer
+    para seguir sirviendo totales y analítica. Si se vuelve a pedir uno que no
+    terminó, el worker nuevo sigue con ese buffer (``inherit``). Se descartan recién tras
+    ``retain`` segundos sin consultas, o por LRU al superar ``max_entries``.
+    Con ``max_workers`` se limita cuántos corren a la vez: al llenarse se
+    detiene el worker vivo consultado hace más tiempo.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], _ChatWorker],
+        max_workers: int = 0,
+        max_entries: int = 256,
+        retain: float = 3600.0,
+    ):
+        self._factory = factory
+        self.max_workers = max_workers
+        self.max_entries = max(1, max_entries)
+        self.retain = retain
+        self._pollers: Dict[str, _ChatWorker] = {}
+        self._lock = threading.Lock()
+
+    def ensure(self, key: str) -> _ChatWorker:
+        with self._lock:
+            poller = self._pollers.get(key)
+            if poller is None or not poller.is_alive():
+                # Si el chat terminó conservamos el buffer para seguir sirviendo los totales
+                if poller is not None and poller.ended:
+                    poller.touch()
+                    return poller
+                self._evict_for_new()
+                # detenido por inactividad o por el pool: el nuevo continúa su buffer y su página
+                fresh = self._factory(key)
+                if poller is not None:
+                    fresh.inherit(poller)
+                poller = fresh.start()
+                self._pollers[key] = poller
+            poller.touch()
+            return poller
+
+    def get(self, key: str) -> Optional[_ChatWorker]:
+        """Worker existente para ``key`` (sin arrancar uno nuevo)."""
+        with self._lock:
+            return self._pollers.get(key)
+
+    def _evict_for_new(self) -> None:
+        now = time.monotonic()
+        for k in [k for k, p in self._pollers.items() if not p.is_alive() and now - p.last_access > self.retain]:
+            del self._pollers[k]
+        if self.max_workers > 0:
+            alive = [k for k, p in self._pollers.items() if p.is_alive()]
+            while len(alive) >= self.max_workers:
+                oldest = min(alive, key=lambda k: self._pollers[k].last_access)
+                alive.remove(oldest)
+                self._pollers[oldest].stop()  # se detiene pero conserva su buffer
+        while len(self._pollers) >= self.max_entries:
+            oldest = min(self._pollers, key=lambda k: self._pollers[k].last_access)
+            self._pollers.pop(oldest).stop()
+
+    def stop_all(self) -> None:
+        with self._lock:
+            for p in self._pollers.values():
+                p.stop()
+            self._pollers.clear()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [p.stats() for p in self._pollers.values()]
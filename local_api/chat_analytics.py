@@ -0,0 +1,131 @@
+# local_api/chat_analytics.py — Métricas incrementales del chat en vivo (ritmo, autores, términos)
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+
+from .sketches import HyperLogLog, SpaceSaving
+
+_WORD_RE = re.compile(r"[^\W\d_]{3,}", re.UNICODE)
+_SHORTCODE_RE = re.compile(r":[a-z0-9_\-]+:")
+_EMOJI_RE = re.compile("[\U0001F1E6-\U0001F1FF\U0001F300-\U0001FAFF☀-➿⭐❤]")
+
+# palabras demasiado comunes para decir algo del live
+STOPWORDS = frozenset(
+    "que los las del por con una para como pero mas más muy este esta eso esto son sus ese esa hay ya "
+    "the and you for not are".split()
+)
+
+
+def minute_of(ts: Any) -> int:
+    # YouTube: ISO 8601 ("2025-01-01T20:00:00Z"); pytchat: epoch en ms
+    if isinstance(ts, (int, float)) and ts > 0:
+        return int(ts / 1000 if ts > 1e11 else ts) // 60
+    if isinstance(ts, str) and ts:
+        try:
+            return int(datetime.fromisoformat(ts.replace("Z", "+00:00")).timestamp()) // 60
+        except ValueError:
+            pass
+    return int(time.time()) // 60
+
+
+class _Minute:
+    __slots__ = ("minute", "comments", "authors")
+
+    def __init__(self, minute: int, hll_precision: int):
+        self.minute = minute
+        self.comments = 0
+        self.authors = HyperLogLog(hll_precision)
+
+
+class ChatAnalytics:
+    """Agregados de un chat que se actualizan mensaje a mensaje en memoria acotada.
+
+    - comentarios y autores distintos por minuto (ventanas fijas, últimos ``minutes``)
+    - autores distintos en todo el live (HyperLogLog)
+    - términos y emojis más usados (Space-Saving)
+    """
+
+    def __init__(self, minutes: int = 120, top_capacity: int = 256, hll_precision: int = 12):
+        self.hll_precision = hll_precision
+        self.authors = HyperLogLog(hll_precision)
+        self.terms = SpaceSaving(top_capacity)
+        self.emojis = SpaceSaving(top_capacity)
+        self.window = minutes
+        self._minutes: Deque[_Minute] = deque(maxlen=minutes)
+        self._lock = threading.Lock()
+        self.messages = 0
+        self.late = 0  # mensajes fuera de la ventana: cuentan en los totales, no por minuto
+
+    def _bucket(self, minute: int) -> Optional[_Minute]:
+        if not self._minutes or minute > self._minutes[-1].minute:
+            self._minutes.append(_Minute(minute, min(self.hll_precision, 10)))
+            return self._minutes[-1]
+        if minute <= self._minutes[-1].minute - self.window:
+            return None
+        for i in range(len(self._minutes) - 1, -1, -1):
+            b = self._minutes[i]
+            if b.minute == minute:
+                return b
+            if b.minute < minute:
+                break
+        else:
+            i = -1
+        # hueco dentro de la ventana (minuto sin mensajes hasta ahora): se crea su bucket
+        if len(self._minutes) == self._minutes.maxlen:
+            if i < 0:
+                return None  # más viejo que todos los buckets que entran
+            self._minutes.popleft()
+            i -= 1
+        b = _Minute(minute, min(self.hll_precision, 10))
+        self._minutes.insert(i + 1, b)
+        return b
+
+    def add(self, comment: Dict[str, Any]) -> None:
+        author = comment.get("autor") or ""
+        text = comment.get("mensaje") or ""
+        with self._lock:
+            self.messages += 1
+            b = self._bucket(minute_of(comment.get("ts")))
+            if b is None:
+                self.late += 1
+            else:
+                b.comments += 1
+        if author:
+            self.authors.add(author)
+            if b is not None:
+                b.authors.add(author)
+        shortcodes = _SHORTCODE_RE.findall(text)
+        if shortcodes:
+            text = _SHORTCODE_RE.sub(" ", text)
+        for w in _WORD_RE.findall(text.lower()):
+            if w not in STOPWORDS:
+                self.terms.offer(w)
+        for e in shortcodes + _EMOJI_RE.findall(text):
+            self.emojis.offer(e)
+
+    def per_minute(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            buckets = list(self._minutes)
+        return [
+            {
+                "minute": datetime.fromtimestamp(b.minute * 60, timezone.utc).isoformat(),
+                "comments": b.comments,
+                "uniqueAuthors": b.authors.count(),
+            }
+            for b in buckets
+        ]
+
+    def summary(self, k: int = 10) -> Dict[str, Any]:
+        per_minute = self.per_minute()
+        return {
+            "messages": self.messages,
+            "lateMessages": self.late,
+            "uniqueAuthors": self.authors.count(),
+            "commentsPerMinute": per_minute,
+            "lastMinuteComments": per_minute[-1]["comments"] if per_minute else 0,
+            "topTerms": [{"term": t, "count": int(c), "maxError": int(e)} for t, c, e in self.terms.top(k)],
+            "topEmojis": [{"emoji": t, "count": int(c), "maxError": int(e)} for t, c, e in self.emojis.top(k)],
+        }
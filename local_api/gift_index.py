@@ -0,0 +1,76 @@
+# local_api/gift_index.py — Agregados incrementales de gifts por streamer (leaderboards)
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+
+from .chat_analytics import minute_of
+from .sketches import SpaceSaving
+
+
+class GiftIndex:
+    """Diamonds por usuario, cantidad por gift y diamonds por minuto.
+
+    Se actualiza gift a gift (O(1) amortizado) y en memoria acotada: los top-K
+    usan Space-Saving y la tasa guarda solo los últimos ``minutes`` minutos.
+
+    ``source`` dice de dónde salen los gifts: ``"ndjson"`` (el log completo) o
+    ``"snapshot"`` (el JSON, que solo trae los últimos). ``partial`` es True
+    cuando el índice no vio todos los gifts del live.
+    """
+
+    def __init__(self, top_capacity: int = 512, minutes: int = 120, source: str = "ndjson"):
+        self.source = source
+        self.partial = False
+        self.by_user = SpaceSaving(top_capacity)
+        self.by_gift = SpaceSaving(top_capacity)
+        self._per_minute: Deque[List[int]] = deque(maxlen=minutes)
+        self._lock = threading.Lock()
+        self.gifts = 0
+        self.diamonds = 0
+
+    def add(self, gift: Dict[str, Any]) -> None:
+        diamonds = int(gift.get("diamonds") or 0)
+        amount = int(gift.get("amount") or 1)
+        self.by_user.offer(gift.get("user") or "?", diamonds)
+        self.by_gift.offer(gift.get("gift") or "?", amount)
+        minute = minute_of(gift.get("ts"))
+        with self._lock:
+            self.gifts += 1
+            self.diamonds += diamonds
+            if self._per_minute and self._per_minute[-1][0] == minute:
+                self._per_minute[-1][1] += diamonds
+            elif not self._per_minute or minute > self._per_minute[-1][0]:
+                self._per_minute.append([minute, diamonds])
+            else:
+                # gift atrasado: se suma a su minuto si todavía está en la ventana
+                for bucket in self._per_minute:
+                    if bucket[0] == minute:
+                        bucket[1] += diamonds
+                        break
+
+    @classmethod
+    def from_gifts(cls, gifts: List[Dict[str, Any]], total: Optional[int] = None) -> "GiftIndex":
+        """Índice de un snapshot JSON; ``total`` es el ``giftsCount`` real del live."""
+        idx = cls(source="snapshot")
+        for g in gifts:
+            idx.add(g)
+        idx.partial = total is not None and total > len(gifts)
+        return idx
+
+    def rate(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{"minute": datetime.fromtimestamp(m * 60, timezone.utc).isoformat(), "diamonds": d} for m, d in self._per_minute]
+
+    def leaderboard(self, k: int = 10) -> Dict[str, Any]:
+        per_minute = self.rate()
+        return {
+            "source": self.source,
+            "partial": self.partial,
+            "gifts": self.gifts,
+            "diamonds": self.diamonds,
+            "topGifters": [{"user": u, "diamonds": int(c), "maxError": int(e)} for u, c, e in self.by_user.top(k)],
+            "topGifts": [{"gift": g, "count": int(c), "maxError": int(e)} for g, c, e in self.by_gift.top(k)],
+            "diamondsPerMinute": per_minute,
+            "lastMinuteDiamonds": per_minute[-1]["diamonds"] if per_minute else 0,
+        }
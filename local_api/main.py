@@ -1,14 +1,30 @@
 # local_api/main.py — YouTube + TikTok
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-import os, re, time, requests, json
-from typing import Optional, Dict, Any, List
+import os, re, time, json, asyncio
+from datetime import date, datetime, timedelta
+from typing import Optional, Dict, Any, List, Tuple
 from dotenv import load_dotenv
 from pathlib import Path
 
+from .cache import TTLCache
+from .chat_analytics import ChatAnalytics
+from .chat import ChatBuffer, ChatPollerRegistry, LiveChatPoller, PytchatWorker
+from .push import SnapshotHub, delta_stream, sse_response
+from .tiktok_files import CaptureFileCache, CaptureWatcher
+from .tiktok_log import TailRegistry
+from .tiktok_supervisor import CapturerSupervisor
+from .timeseries import SnapshotWriter, TimeSeriesStore
+from .overview import OverviewRollup, empty_overview
+from .quota import QuotaScheduler
+from .ratelimit import RateLimiter, RateLimitMiddleware
+from common.metrics import FAST_BUCKETS, MetricsMiddleware, REGISTRY, cache_collector, prometheus_response
+from common.responses import CompressionMiddleware, FastJSONResponse, parse_fields, project, wants
+from common.upstream import UpstreamClient
+
 load_dotenv()
 
-app = FastAPI(title="Local API - Live Analytics")
+app = FastAPI(title="Local API - Live Analytics", default_response_class=FastJSONResponse)
 
 # CORS abierto (se debe ajustar si se quiere  restringir orígenes)
 app.add_middleware(
@@ -17,16 +33,97 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# gzip/br para las respuestas grandes (chat, gifts); los streams SSE no se tocan
+app.add_middleware(CompressionMiddleware, minimum_size=int(os.getenv("COMPRESS_MIN_BYTES", "1024")))
+# Límite por cliente y ruta (apagado por defecto). Loopback queda exento: el servidor de
+# Streamlit consulta en nombre de todos sus usuarios. Lo que sale del caché o se une a una
+# carga en curso no consume tokens.
+rate_limiter = RateLimiter(
+    rate=float(os.getenv("RATE_LIMIT_RPS", "5")),
+    burst=float(os.getenv("RATE_LIMIT_BURST", "20")),
+    routes=RateLimiter.parse_routes(os.getenv("RATE_LIMIT_ROUTES", "")),
+)
+if os.getenv("RATE_LIMIT_ENABLED", "0") == "1":
+    app.add_middleware(
+        RateLimitMiddleware,
+        limiter=rate_limiter,
+        joiners={
+            "/live-data": lambda q: live_data_is_free(q.get("video", "")),
+            "/tiktok-stats": lambda q: tiktok_stats_is_free(q.get("user", ""), q.get("fallback", "true")),
+        },
+        exempt_clients=[c.strip() for c in os.getenv("RATE_LIMIT_EXEMPT_CLIENTS", "127.0.0.1,::1").split(",") if c.strip()],
+    )
+# el último en agregarse envuelve a todos: mide también la compresión y los 429
+app.add_middleware(MetricsMiddleware)
 
 # =========================
 # Config común
 # =========================
 HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "12"))
+STREAM_COALESCE_MS = int(os.getenv("STREAM_COALESCE_MS", "500"))
+
+# Histórico local (SQLite): muestras crudas + rollups de 1 minuto y 1 hora
+LOCAL_API_DB = os.getenv("LOCAL_API_DB", "local_api.db")
+TS_MIN_INTERVAL = float(os.getenv("TS_MIN_INTERVAL", "5"))
+timeseries = TimeSeriesStore(
+    LOCAL_API_DB,
+    min_interval=TS_MIN_INTERVAL,
+    retention={
+        "raw": int(float(os.getenv("TS_RETENTION_RAW_HOURS", "48")) * 3600),
+        "1m": int(float(os.getenv("TS_RETENTION_1M_DAYS", "30")) * 86400),
+        "1h": int(float(os.getenv("TS_RETENTION_1H_DAYS", "400")) * 86400),
+    },
+)
+
+# SQLite escribe en su propio hilo: /live-data y /tiktok-stats solo encolan la muestra
+snapshot_writer = SnapshotWriter(timeseries, max_pending=int(os.getenv("TS_MAX_PENDING", "1000"))).start()
+
+def record_snapshot(platform: str, sid: str, metrics: Dict[str, Any]) -> None:
+    # El histórico nunca debe tumbar ni frenar el endpoint en vivo
+    snapshot_writer.submit(platform, sid, metrics)
+UPSTREAM_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "100"))
+UPSTREAM_PER_HOST_LIMIT = int(os.getenv("UPSTREAM_PER_HOST_LIMIT", "10"))
+UPSTREAM_RETRIES = int(os.getenv("UPSTREAM_RETRIES", "2"))
+
+# Cliente async compartido (keep-alive + límite por host + reintentos con jitter)
+upstream = UpstreamClient(
+    timeout=HTTP_TIMEOUT,
+    max_connections=UPSTREAM_MAX_CONNECTIONS,
+    per_host_limit=UPSTREAM_PER_HOST_LIMIT,
+    retries=UPSTREAM_RETRIES,
+)
+
+# Loop de la API: los hilos de chat lo usan para llamar al cliente async
+_app_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def run_on_app_loop(coro, timeout: Optional[float] = None):
+    if _app_loop is None:
+        coro.close()
+        raise RuntimeError("La API aún no inició su event loop")
+    return asyncio.run_coroutine_threadsafe(coro, _app_loop).result(timeout)
 
 # =========================
 # Helper YouTube
 # =========================
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY", "").strip()
+# Se puede apuntar a un stub local (bench/stub_upstream.py) para pruebas de carga
+YOUTUBE_API_BASE = os.getenv("YOUTUBE_API_BASE", "https://www.googleapis.com/youtube/v3").rstrip("/")
+
+# Presupuesto diario de cuota: fija el ritmo de videos.list y del chat por video
+quota = QuotaScheduler(
+    daily_budget=int(os.getenv("YT_DAILY_QUOTA", "10000")),
+    min_interval=float(os.getenv("YT_QUOTA_MIN_INTERVAL", "3")),
+    max_interval=float(os.getenv("YT_QUOTA_MAX_INTERVAL", "300")),
+    adaptive=os.getenv("YT_QUOTA_ADAPTIVE", "1").strip().lower() in ("1", "true", "yes"),
+)
+
+# Caché compartida de videos.list: todas las pestañas que miran el mismo video
+# comparten una sola llamada upstream por ventana de TTL.
+YT_CACHE_TTL = float(os.getenv("YT_CACHE_TTL", "5"))
+YT_CACHE_MAX = int(os.getenv("YT_CACHE_MAX", "256"))
+YT_CACHE_POLICY = os.getenv("YT_CACHE_POLICY", "lru").strip().lower()
+video_cache = TTLCache(ttl=YT_CACHE_TTL, max_entries=YT_CACHE_MAX, policy=YT_CACHE_POLICY)
+REGISTRY.add_collector(cache_collector("videos", video_cache.stats))
 
 def extract_video_id(url_or_id: str) -> Optional[str]:
     if not url_or_id:
@@ -42,29 +139,91 @@ def extract_video_id(url_or_id: str) -> Optional[str]:
         return m.group(1)
     return None
 
-def yt_get_video_details(video_id: str, api_key: str) -> Dict[str, Any]:
-    url = "https://www.googleapis.com/youtube/v3/videos"
+async def yt_get_video_details(video_id: str, api_key: str) -> Dict[str, Any]:
+    url = f"{YOUTUBE_API_BASE}/videos"
     params = {"part": "snippet,liveStreamingDetails,statistics", "id": video_id, "key": api_key}
-    r = requests.get(url, params=params, timeout=HTTP_TIMEOUT)
-    try:
-        data = r.json()
-    except Exception:
-        data = {"error": f"Respuesta no-JSON ({r.status_code})"}
-    data["_status_code"] = r.status_code
-    return data
+    quota.spend("videos.list")
+    # Revalidación con ETag: si el recurso no cambió, 304 sin cuerpo y se reutiliza el guardado
+    return await upstream.get_json(url, params=params, revalidate=True)
 
-def yt_get_live_chat_messages(live_chat_id: str, api_key: str, page_token: Optional[str] = None) -> Dict[str, Any]:
-    url = "https://www.googleapis.com/youtube/v3/liveChat/messages"
+YT_BATCH_SIZE = 50  # máximo de IDs por llamada a videos.list (mismo costo de cuota)
+
+async def yt_get_videos_batch(video_ids: List[str], api_key: str) -> Dict[str, Any]:
+    url = f"{YOUTUBE_API_BASE}/videos"
+    # con id= la API no admite maxResults; el lote ya viene limitado a YT_BATCH_SIZE
+    params = {"part": "snippet,liveStreamingDetails,statistics", "id": ",".join(video_ids), "key": api_key}
+    quota.spend("videos.list")
+    return await upstream.get_json(url, params=params, revalidate=True)
+
+async def yt_get_live_chat_messages(live_chat_id: str, api_key: str, page_token: Optional[str] = None) -> Dict[str, Any]:
+    url = f"{YOUTUBE_API_BASE}/liveChat/messages"
     params = {"liveChatId": live_chat_id, "part": "snippet,authorDetails", "maxResults": 200, "key": api_key}
     if page_token:
         params["pageToken"] = page_token
-    r = requests.get(url, params=params, timeout=HTTP_TIMEOUT)
-    try:
-        data = r.json()
-    except Exception:
-        data = {"error": f"Respuesta no-JSON ({r.status_code})"}
-    data["_status_code"] = r.status_code
-    return data
+    quota.spend("liveChatMessages.list")
+    return await upstream.get_json(url, params=params)
+
+# Pollers del chat en vivo: uno por liveChatId, en segundo plano
+CHAT_BUFFER_SIZE = int(os.getenv("CHAT_BUFFER_SIZE", "500"))
+CHAT_IDLE_TIMEOUT = float(os.getenv("CHAT_IDLE_TIMEOUT", "60"))
+CHAT_FIRST_WAIT = float(os.getenv("CHAT_FIRST_WAIT", "3"))
+
+# liveChatId -> videoId, para que el poller pida su ritmo al scheduler de cuota
+chat_video_ids: Dict[str, str] = {}
+
+def _new_chat_poller(live_chat_id: str) -> LiveChatPoller:
+    vid = chat_video_ids.get(live_chat_id, live_chat_id)
+    return LiveChatPoller(
+        live_chat_id,
+        fetch=lambda token: run_on_app_loop(yt_get_live_chat_messages(live_chat_id, YOUTUBE_API_KEY, token), HTTP_TIMEOUT * 4),
+        buffer=ChatBuffer(max_messages=CHAT_BUFFER_SIZE, analytics=ChatAnalytics()),
+        idle_timeout=CHAT_IDLE_TIMEOUT,
+        pace=lambda: quota.interval(vid, "liveChatMessages.list"),
+    )
+
+# Buffers de chats detenidos: se conservan CHAT_RETAIN_S segundos sin consultas
+CHAT_RETAIN_S = float(os.getenv("CHAT_RETAIN_S", "3600"))
+
+chat_pollers = ChatPollerRegistry(_new_chat_poller, retain=CHAT_RETAIN_S)
+
+# Fallback sin activeLiveChatId: workers pytchat persistentes, uno por video
+PYTCHAT_MAX_WORKERS = int(os.getenv("PYTCHAT_MAX_WORKERS", "16"))
+
+def _new_pytchat_worker(video_id: str) -> PytchatWorker:
+    return PytchatWorker(video_id, buffer=ChatBuffer(max_messages=CHAT_BUFFER_SIZE, analytics=ChatAnalytics()), idle_timeout=CHAT_IDLE_TIMEOUT)
+
+pytchat_workers = ChatPollerRegistry(_new_pytchat_worker, max_workers=PYTCHAT_MAX_WORKERS, retain=CHAT_RETAIN_S)
+
+async def yt_get_video_details_cached(video_id: str, api_key: str) -> Dict[str, Any]:
+    quota.touch(video_id, "videos.list")
+
+    async def load() -> Dict[str, Any]:
+        data = await yt_get_video_details(video_id, api_key)
+        items = data.get("items") or []
+        if data.get("_status_code") == 200 and items:
+            observe_video(video_id, items[0])
+        return data
+
+    # Solo se cachean respuestas 200; el TTL sale del presupuesto de cuota (nunca menor a YT_CACHE_TTL)
+    return await video_cache.get_or_load(
+        video_id,
+        load,
+        should_cache=lambda d: d.get("_status_code") == 200,
+        ttl=video_cache_ttl(video_id),
+    )
+
+def observe_video(video_id: str, item: Dict[str, Any]) -> None:
+    # la audiencia observada fija el ritmo de consultas de ese video (scheduler de cuota)
+    live = item.get("liveStreamingDetails", {}) or {}
+    quota.observe(video_id, to_int(live.get("concurrentViewers", 0)))
+
+def video_cache_ttl(video_id: str) -> float:
+    return max(YT_CACHE_TTL, quota.interval(video_id, "videos.list"))
+
+def live_data_is_free(video: str) -> bool:
+    # videos.list en caché o ya en curso: la petición no gasta cuota
+    vid = extract_video_id(video)
+    return vid is None or video_cache.has_fresh(vid) or video_cache.is_inflight(vid)
 
 def to_int(s: Any, default: int = 0) -> int:
     try:
@@ -72,16 +231,66 @@ def to_int(s: Any, default: int = 0) -> int:
     except Exception:
         return default
 
+def video_statistics(item: Dict[str, Any]) -> Dict[str, Any]:
+    stats_raw = item.get("statistics", {}) or {}
+    live = item.get("liveStreamingDetails", {}) or {}
+    return {
+        "viewCount": to_int(stats_raw.get("viewCount", 0)),
+        "likeCount": to_int(stats_raw.get("likeCount", 0)),
+        "concurrentViewers": to_int(live.get("concurrentViewers", 0)),
+        "actualStartTime": live.get("actualStartTime"),
+        "actualEndTime": live.get("actualEndTime"),
+    }
+
+def chunked(seq: List[str], size: int) -> List[List[str]]:
+    return [seq[i:i + size] for i in range(0, len(seq), size)]
+
 # =========================
 # Endpoints
 # =========================
 @app.get("/health")
-def health():
+async def health():
     return {"status": "ok"}
 
+@app.get("/quota")
+async def quota_state():
+    return quota.state()
+
+def _upstream_samples():
+    e, q = upstream.etags.stats(), quota.state()
+    return [
+        ("upstream_conditional_requests_total", "counter", "Peticiones con If-None-Match.", {}, e["conditionalRequests"]),
+        ("upstream_not_modified_total", "counter", "Respuestas 304 servidas desde el almacén de ETags.", {}, e["notModified"]),
+        ("youtube_quota_spent_units", "gauge", "Unidades de cuota gastadas hoy.", {}, q["spent"]),
+        ("youtube_quota_remaining_units", "gauge", "Unidades de cuota restantes hoy.", {}, q["remaining"]),
+    ]
+
+REGISTRY.add_collector(_upstream_samples)
+
+@app.get("/metrics")
+def metrics():
+    return prometheus_response()
+
+@app.get("/cache-stats")
+async def cache_stats():
+    return {
+        "videos": video_cache.stats(),
+        "chats": chat_pollers.stats(),
+        "pytchat": pytchat_workers.stats(),
+        "tiktokFiles": {**tiktok_files.stats(), "watching": tiktok_watcher.files},
+        "tiktokLogs": {**tiktok_logs.stats(), "watching": tiktok_log_watcher.files},
+        "timeseries": {**timeseries.stats(), "writer": snapshot_writer.stats()},
+        "overview": overview_rollup.stats(),
+        "etags": upstream.etags.stats(),
+        "streams": stream_hub.stats(),
+    }
+
 # ---- YouTube ----
 @app.get("/live-data")
-def live_data(video: str = Query(default="")):
+async def live_data(
+    video: str = Query(default=""),
+    fields: str = Query(default=""),  # << p.ej. fields=statistics no envía comentarios
+):
     if not YOUTUBE_API_KEY:
         return {"error": "Falta YOUTUBE_API_KEY en .env"}
 
@@ -89,7 +298,7 @@ def live_data(video: str = Query(default="")):
     if not vid:
         return {"items": [], "warning": "Pega una URL o ID válido de YouTube."}
 
-    v_data = yt_get_video_details(vid, YOUTUBE_API_KEY)
+    v_data = await yt_get_video_details_cached(vid, YOUTUBE_API_KEY)
     if v_data.get("_status_code") != 200:
         return {"items": [], "error": f"No se pudo obtener datos del video ({v_data.get('_status_code')})"}
 
@@ -98,99 +307,412 @@ def live_data(video: str = Query(default="")):
         return {"items": [], "warning": "El Data API no devolvió información para este video (¿privado/restringido/solo miembros?)."}
 
     item0 = items[0]
-    stats_raw = item0.get("statistics", {}) or {}
     live = item0.get("liveStreamingDetails", {}) or {}
+    statistics: Dict[str, Any] = video_statistics(item0)
 
-    statistics: Dict[str, Any] = {
-        "viewCount": to_int(stats_raw.get("viewCount", 0)),
-        "likeCount": to_int(stats_raw.get("likeCount", 0)),
-        "concurrentViewers": to_int(live.get("concurrentViewers", 0)),
-        "actualStartTime": live.get("actualStartTime"),
-        "actualEndTime": live.get("actualEndTime"),
-    }
-
+    fl = parse_fields(fields)
+    limit_factor = 1 if wants(fl, "comentarios") else 0
     comentarios: List[Dict[str, str]] = []
     live_chat_id = live.get("activeLiveChatId")
 
     if live_chat_id:
-        c_data = yt_get_live_chat_messages(live_chat_id, YOUTUBE_API_KEY)
-        if c_data.get("_status_code") == 200:
-            for it in c_data.get("items", []):
-                sn = it.get("snippet", {}) or {}
-                au = it.get("authorDetails", {}) or {}
-                comentarios.append({
-                    "autor": au.get("displayName", ""),
-                    "mensaje": sn.get("displayMessage", ""),
-                    "ts": sn.get("publishedAt", ""),
-                })
-            statistics["liveCommentCount"] = len(comentarios)
-        else:
-            statistics["liveCommentCount"] = 0
+        chat_video_ids[live_chat_id] = vid
+        quota.touch(vid, "liveChatMessages.list")
+        poller = chat_pollers.ensure(live_chat_id)
+        if not poller.first_page.is_set():
+            # solo la primera consulta espera (sin bloquear el loop) a la primera página
+            await asyncio.to_thread(poller.first_page.wait, CHAT_FIRST_WAIT)
+        snap = poller.buffer.snapshot(limit=200 * limit_factor)
+        comentarios = snap["comentarios"]
+        statistics["liveCommentCount"] = snap["total"]
     else:
-        try:
-            import pytchat  # type: ignore
-            chat = pytchat.create(video_id=vid)
-            t_end = time.time() + 2.5
-            while time.time() < t_end and chat.is_alive():
-                for c in chat.get().sync_items():
-                    comentarios.append({
-                        "autor": getattr(c.author, "name", ""),
-                        "mensaje": getattr(c, "message", ""),
-                        "ts": getattr(c, "timestamp", ""),
-                    })
-                    if len(comentarios) >= 120:
-                        break
-                time.sleep(0.2)
-            statistics["liveCommentCount"] = len(comentarios)
-        except Exception:
-            statistics["liveCommentCount"] = 0
-
-    return {"items": [{"statistics": statistics, "comentarios": comentarios}]}
+        # Sin espera: el worker llena el buffer en segundo plano
+        snap = pytchat_workers.ensure(vid).buffer.snapshot(limit=120 * limit_factor)
+        comentarios = snap["comentarios"]
+        statistics["liveCommentCount"] = snap["total"]
+
+    record_snapshot("youtube", vid, {
+        "viewers": statistics["concurrentViewers"],
+        "likes": statistics["likeCount"],
+        "views": statistics["viewCount"],
+        "comments": statistics["liveCommentCount"],
+    })
+    return project({"items": [{"statistics": statistics, "comentarios": comentarios}]}, fl)
+
+@app.get("/live-data/batch")
+async def live_data_batch(videos: List[str] = Query(default=[])):
+    # Acepta ?videos=a&videos=b y/o ?videos=a,b,c (URLs o IDs)
+    if not YOUTUBE_API_KEY:
+        return {"error": "Falta YOUTUBE_API_KEY en .env"}
+
+    ids: List[str] = []
+    invalid: List[str] = []
+    for raw in videos:
+        for part in raw.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            vid = extract_video_id(part)
+            if not vid:
+                invalid.append(part)
+            elif vid not in ids:
+                ids.append(vid)
+    if not ids:
+        return {"items": [], "invalid": invalid, "warning": "No se recibió ninguna URL o ID válido de YouTube."}
+
+    # Lo que ya está en la caché compartida no se vuelve a pedir; lo que /live-data ya está
+    # cargando se espera en lugar de pedirlo otra vez
+    by_id: Dict[str, Dict[str, Any]] = {}
+    pending: List[str] = []
+    joined: List[str] = []
+    for vid in ids:
+        quota.touch(vid, "videos.list")
+        cached = video_cache.get(vid)
+        if cached and cached.get("items"):
+            by_id[vid] = cached["items"][0]
+        elif video_cache.is_inflight(vid):
+            joined.append(vid)
+        else:
+            pending.append(vid)
+
+    chunks = chunked(pending, YT_BATCH_SIZE)
+    results, joined_results = await asyncio.gather(
+        asyncio.gather(*(yt_get_videos_batch(c, YOUTUBE_API_KEY) for c in chunks)),
+        asyncio.gather(*(yt_get_video_details_cached(vid, YOUTUBE_API_KEY) for vid in joined)),
+    )
+    errors: List[Dict[str, Any]] = []
+    for chunk, data in zip(chunks, results):
+        if data.get("_status_code") != 200:
+            errors.append({"videoIds": chunk, "status": data.get("_status_code")})
+            continue
+        for item in data.get("items", []) or []:
+            vid = item.get("id")
+            if vid:
+                by_id[vid] = item
+                observe_video(vid, item)
+                # alimenta la caché de /live-data con la misma respuesta (mismo TTL por cuota)
+                video_cache.set(vid, {"items": [item], "_status_code": 200}, ttl=video_cache_ttl(vid))
+    for vid, data in zip(joined, joined_results):
+        if data.get("_status_code") != 200:
+            errors.append({"videoIds": [vid], "status": data.get("_status_code")})
+        elif data.get("items"):
+            by_id[vid] = data["items"][0]
+
+    out = [{"videoId": vid, "statistics": video_statistics(by_id[vid])} for vid in ids if vid in by_id]
+    missing = [vid for vid in ids if vid not in by_id and not any(vid in e["videoIds"] for e in errors)]
+    return {
+        "items": out,
+        "missing": missing,
+        "invalid": invalid,
+        "errors": errors,
+        "upstreamCalls": len(chunks),
+    }
+
+def chat_worker_for(vid: str):
+    # el chat de un video lo sigue el poller del Data API (por liveChatId) o pytchat (por videoId)
+    for live_chat_id, v in list(chat_video_ids.items()):
+        if v == vid:
+            poller = chat_pollers.get(live_chat_id)
+            if poller is not None:
+                return poller
+    return pytchat_workers.get(vid)
+
+@app.get("/chat-analytics")
+def chat_analytics(video: str = Query(default=""), k: int = Query(default=10, ge=1, le=100)):
+    vid = extract_video_id(video)
+    if not vid:
+        return {"error": "Pega una URL o ID válido de YouTube."}
+    worker = chat_worker_for(vid)
+    if worker is None or worker.buffer.analytics is None:
+        return {"videoId": vid, "error": "No hay chat siguiéndose para este video (consulta /live-data primero)."}
+    worker.touch()
+    return {"videoId": vid, "platform": "YouTube", **worker.buffer.analytics.summary(k)}
 
 # ---- TikTok ----
 TIKTOK_DATA_FILE = os.getenv("TIKTOK_DATA_FILE", "live_data1.json")
+TIKTOK_WATCH_DIR = os.getenv("TIKTOK_WATCH_DIR", ".")
+TIKTOK_WATCH_INTERVAL = float(os.getenv("TIKTOK_WATCH_INTERVAL", "1"))
+TIKTOK_GIFTS_MAX = int(os.getenv("TIKTOK_GIFTS_MAX", "5000"))
 
-@app.get("/tiktok-stats")
-def tiktok_stats(
-    user: str = Query(default=""),
-    fallback: bool = Query(default=True)  # << se puede desactivar el fallback desde el front
-):
-    candidates = []
+# Los JSON del capturador solo se vuelven a parsear cuando cambian en disco
+tiktok_files = CaptureFileCache()
+tiktok_watcher = CaptureWatcher(tiktok_files, Path(TIKTOK_WATCH_DIR), interval=TIKTOK_WATCH_INTERVAL)
+
+# Log NDJSON append-only (live_<user>.ndjson): se leen solo las líneas nuevas
+tiktok_logs = TailRegistry(max_gifts=TIKTOK_GIFTS_MAX)
+tiktok_log_watcher = CaptureWatcher(tiktok_logs, Path(TIKTOK_WATCH_DIR), pattern="live_*.ndjson", interval=TIKTOK_WATCH_INTERVAL)
+
+# Supervisor de capturadores Node (opcional: requiere node + npm i en tiktok/)
+TIKTOK_SUPERVISE = os.getenv("TIKTOK_SUPERVISE", "0").strip().lower() in ("1", "true", "yes")
+TIKTOK_USERS = [u for u in os.getenv("TIKTOK_USERS", "").split(",") if u.strip()]
+TIKTOK_USERS_FILE = os.getenv("TIKTOK_USERS_FILE", "tiktok_users.txt")
+TIKTOK_MAX_CAPTURERS = int(os.getenv("TIKTOK_MAX_CAPTURERS", "25"))
+tiktok_supervisor = CapturerSupervisor(
+    script=Path(os.getenv("TIKTOK_CAPTURER_SCRIPT", "tiktok/tiktok_live.js")),
+    workdir=Path(TIKTOK_WATCH_DIR),
+    registry_file=Path(TIKTOK_USERS_FILE),
+    initial_users=TIKTOK_USERS,
+    node=os.getenv("NODE_BIN", "node"),
+    max_running=TIKTOK_MAX_CAPTURERS,
+)
+
+def capture_path(user: str) -> Path:
+    # live_<user>.json (y su .ndjson) en TIKTOK_WATCH_DIR: donde escribe el supervisor y miran los watchers
+    return Path(TIKTOK_WATCH_DIR) / f"live_{user}.json"
+
+def capture_log_path(p: Path) -> Path:
+    return p.with_suffix(".ndjson")
+
+def has_capture(p: Path) -> bool:
+    return p.exists() or capture_log_path(p).exists()
+
+FILE_READ = REGISTRY.histogram("tiktok_capture_read_duration_seconds", "Lectura de capturas TikTok (JSON o log).", ("kind",), buckets=FAST_BUCKETS)
+
+def read_capture(p: Path, gifts: bool = False, limit: int = 0) -> Dict[str, Any]:
+    # El log de eventos tiene prioridad; el JSON queda como snapshot/compatibilidad.
+    # ``data["gifts"]`` solo se garantiza con gifts=True (las últimas ``limit``; 0 = todas).
+    log = capture_log_path(p)
+    if log.exists():
+        with FILE_READ.time("ndjson"):
+            return tiktok_logs.read(log, gifts, limit)
+    with FILE_READ.time("json"):
+        data = tiktok_files.read(p)
+    if gifts and limit > 0:
+        return {**data, "gifts": data["gifts"][-limit:]}
+    return data
+
+def resolve_capture(user: str, fallback: bool) -> Tuple[Optional[Path], Optional[str]]:
     if user:
+        if not tiktok_supervisor.is_valid(user):
+            return None, f"Usuario de TikTok inválido: {user!r}"
         # buscamos live_<user>.json
-        primary = Path(f"live_{user}.json")
-        if primary.exists():
-            p = primary
-        elif fallback:
+        primary = capture_path(user)
+        if has_capture(primary):
+            return primary, None
+        if fallback:
             # usamos archivo por defecto si se permite fallback
             p = Path(TIKTOK_DATA_FILE)
-            if not p.exists():
-                return {"items": [], "error": f"No hay datos para @{user} (y tampoco {TIKTOK_DATA_FILE})."}
-        else:
-            return {"items": [], "error": f"No hay datos para @{user}. Ejecuta el capturador Node para ese usuario."}
-    else:
-        p = Path(TIKTOK_DATA_FILE)
-        if not p.exists():
-            return {"items": [], "error": f"No se encontró {TIKTOK_DATA_FILE}. Ejecuta el capturador."}
+            if not has_capture(p):
+                return None, f"No hay datos para @{user} (y tampoco {TIKTOK_DATA_FILE})."
+            return p, None
+        return None, f"No hay datos para @{user}. Ejecuta el capturador Node para ese usuario."
+    p = Path(TIKTOK_DATA_FILE)
+    if not has_capture(p):
+        return None, f"No se encontró {TIKTOK_DATA_FILE}. Ejecuta el capturador."
+    return p, None
+
+def tiktok_stats_is_free(user: str, fallback: str) -> bool:
+    # la captura ya está parseada/leída completa: responder no toca el disco más que un stat
+    p, _ = resolve_capture(user, fallback.lower() not in ("0", "false", "no"))
+    if p is None:
+        return True
+    log = capture_log_path(p)
+    return tiktok_logs.is_fresh(log) if log.exists() else tiktok_files.is_fresh(p)
+
+@app.get("/tiktok-stats")
+def tiktok_stats(
+    user: str = Query(default=""),
+    fallback: bool = Query(default=True),  # << se puede desactivar el fallback desde el front
+    gifts: bool = Query(default=True),  # << gifts=false no envía el historial completo
+    fields: str = Query(default=""),  # << p.ej. fields=statistics.likes,statistics.viewers
+    limit: int = Query(default=0, ge=0),  # << solo los últimos N gifts (0 = todos)
+):
+    p, error = resolve_capture(user, fallback)
+    if p is None:
+        return {"items": [], "error": error}
 
+    fl = parse_fields(fields)
+    gifts = gifts and wants(fl, "gifts")
     try:
-        data = json.loads(p.read_text(encoding="utf-8"))
+        data = read_capture(p, gifts=gifts, limit=limit)
     except Exception as e:
         return {"items": [], "error": f"No se pudo leer JSON: {e}"}
 
-    gifts = data.get("gifts", []) or []
     stats = {
-        "username": data.get("username", user),
-        "likes": int(data.get("likes", 0)),
-        "comments": int(data.get("comments", 0)),
-        "viewers": int(data.get("viewers", 0)),
-        "diamonds": int(data.get("diamonds", 0)),
-        "shares": int(data.get("shares", 0)),
-        "giftsCount": len(gifts),
+        "username": data["username"] if data.get("username") is not None else user,
+        "likes": data["likes"],
+        "comments": data["comments"],
+        "viewers": data["viewers"],
+        "diamonds": data["diamonds"],
+        "shares": data["shares"],
+        "giftsCount": data["giftsCount"],
     }
-    return {"items": [{"platform": "TikTok", "statistics": stats, "gifts": gifts}]}
+    if stats["username"]:
+        record_snapshot("tiktok", stats["username"], {k: v for k, v in stats.items() if k != "username"})
+    item = {"platform": "TikTok", "statistics": stats}
+    if gifts:
+        item["gifts"] = data["gifts"]
+    return project({"items": [item]}, fl)
+
+@app.get("/tiktok-stats/leaderboard")
+def tiktok_leaderboard(
+    user: str = Query(default=""),
+    fallback: bool = Query(default=True),
+    k: int = Query(default=10, ge=1, le=100),
+):
+    p, error = resolve_capture(user, fallback)
+    if p is None:
+        return {"error": error}
+    try:
+        data = read_capture(p)
+    except Exception as e:
+        return {"error": f"No se pudo leer JSON: {e}"}
+    username = data["username"] if data.get("username") is not None else user
+    return {"platform": "TikTok", "username": username, **data["index"].leaderboard(k)}
+
+def tiktok_known_users() -> List[str]:
+    # registro del supervisor + cualquier live_<user>.json/.ndjson que vean los watchers
+    # (sin el archivo por defecto TIKTOK_DATA_FILE, que no es un streamer)
+    users = set(tiktok_supervisor.usernames())
+    default = Path(TIKTOK_DATA_FILE)
+    for name in tiktok_watcher.files + tiktok_log_watcher.files:
+        if Path(name).stem == default.stem:
+            continue
+        users.add(Path(name).stem[len("live_"):])
+    return sorted(u for u in users if tiktok_supervisor.is_valid(u))
+
+@app.get("/tiktok-stats/all")
+def tiktok_stats_all():
+    items, missing = [], []
+    for u in tiktok_known_users():
+        p = capture_path(u)
+        if not has_capture(p):
+            missing.append(u)
+            continue
+        try:
+            data = read_capture(p)
+        except Exception as e:
+            items.append({"username": u, "error": f"No se pudo leer JSON: {e}"})
+            continue
+        stats = {k: data[k] for k in ("likes", "comments", "viewers", "diamonds", "shares", "giftsCount")}
+        items.append({"username": u, "statistics": stats, "lastUpdate": data.get("lastUpdate")})
+    return {"platform": "TikTok", "items": items, "missing": missing}
+
+@app.get("/tiktok/capturers")
+def tiktok_capturers():
+    return tiktok_supervisor.status()
+
+@app.post("/tiktok/capturers/{user}")
+def tiktok_capturer_add(user: str):
+    try:
+        return tiktok_supervisor.add(user)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.delete("/tiktok/capturers/{user}")
+def tiktok_capturer_remove(user: str):
+    if not tiktok_supervisor.remove(user):
+        raise HTTPException(status_code=404, detail=f"@{user} no está en el registro")
+    return {"removed": user}
+
+# ---- Visión general ----
+OVERVIEW_POSTS_CSV = os.getenv("OVERVIEW_POSTS_CSV", "data/sample/sample_posts.csv")
+OVERVIEW_GEO_CSV = os.getenv("OVERVIEW_GEO_CSV", "src/data/sample/sample_geo_views.csv")
+overview_rollup = OverviewRollup(LOCAL_API_DB, Path(OVERVIEW_POSTS_CSV), Path(OVERVIEW_GEO_CSV) if OVERVIEW_GEO_CSV else None)
+
+@app.get("/overview")
+def overview(from_: str = Query(default="", alias="from"), to: str = Query(default="")):
+    # Mismo esquema que espera src/pages/00_Visión_general.py
+    try:
+        d_to = date.fromisoformat(to) if to else date.today()
+        d_from = date.fromisoformat(from_) if from_ else d_to - timedelta(days=29)
+    except ValueError as e:
+        return {**empty_overview(from_, to), "error": f"Fecha inválida: {e}"}
+    if d_from > d_to:
+        d_from, d_to = d_to, d_from
+    return overview_rollup.query(d_from.isoformat(), d_to.isoformat())
+
+# ---- Histórico ----
+def parse_time(value: str, default: float) -> float:
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+@app.get("/timeseries")
+def get_timeseries(
+    platform: str = Query(...),
+    id: str = Query(...),
+    from_: str = Query(default="", alias="from"),
+    to: str = Query(default=""),
+    step: float = Query(default=0),
+):
+    # platform=youtube|tiktok, id=videoId o usuario; from/to en epoch o ISO-8601; step en segundos
+    now = time.time()
+    try:
+        t_to = parse_time(to, now)
+        t_from = parse_time(from_, t_to - 3600)
+    except ValueError as e:
+        return {"error": f"Fecha inválida: {e}"}
+    platform = platform.lower()
+    sid = (extract_video_id(id) or id) if platform == "youtube" else id.lstrip("@")
+    return timeseries.query(platform, sid, t_from, t_to, step or None)
+
+# ---- Push (SSE) ----
+# Un Topic por recurso y ventana: todas las conexiones SSE al mismo live comparten la consulta
+stream_hub = SnapshotHub()
+
+def _window_seconds(window_ms: int) -> float:
+    return max(100, window_ms) / 1000.0
+
+@app.get("/live-data/stream")
+async def live_data_stream(request: Request, video: str = Query(default=""), window_ms: int = Query(default=STREAM_COALESCE_MS)):
+    async def snapshot() -> Dict[str, Any]:
+        data = await live_data(video=video, fields="statistics")
+        items = data.get("items") or []
+        if not items:
+            return {"error": data.get("error") or data.get("warning") or "Sin datos del live"}
+        s = items[0]["statistics"]
+        return {
+            "viewers": s.get("concurrentViewers", 0),
+            "likes": s.get("likeCount", 0),
+            "comments": s.get("liveCommentCount", 0),
+            "views": s.get("viewCount", 0),
+        }
+    key = ("youtube", extract_video_id(video) or video)
+    return sse_response(delta_stream(request, stream_hub, key, snapshot, window=_window_seconds(window_ms)))
+
+@app.get("/tiktok-stats/stream")
+async def tiktok_stats_stream(
+    request: Request,
+    user: str = Query(default=""),
+    fallback: bool = Query(default=True),
+    window_ms: int = Query(default=STREAM_COALESCE_MS),
+):
+    async def snapshot() -> Dict[str, Any]:
+        data = await asyncio.to_thread(tiktok_stats, user=user, fallback=fallback, gifts=False, fields="statistics", limit=0)
+        items = data.get("items") or []
+        if not items:
+            return {"error": data.get("error") or "Sin datos de TikTok"}
+        s = items[0]["statistics"]
+        return {k: s.get(k, 0) for k in ("username", "viewers", "likes", "comments", "diamonds", "shares", "giftsCount")}
+    key = ("tiktok", user.lstrip("@"), fallback)
+    return sse_response(delta_stream(request, stream_hub, key, snapshot, window=_window_seconds(window_ms)))
+
+@app.on_event("startup")
+async def _capture_app_loop():
+    global _app_loop
+    _app_loop = asyncio.get_running_loop()
+    tiktok_watcher.start()
+    tiktok_log_watcher.start()
+    if TIKTOK_SUPERVISE:
+        tiktok_supervisor.start()
+
+@app.on_event("shutdown")
+async def _stop_background_workers():
+    chat_pollers.stop_all()
+    pytchat_workers.stop_all()
+    tiktok_watcher.stop()
+    tiktok_log_watcher.stop()
+    await asyncio.to_thread(tiktok_supervisor.stop)
+    await upstream.aclose()
+    await asyncio.to_thread(snapshot_writer.close)
+    timeseries.close()
+    overview_rollup.close()
 
-# (Opcional) ejecutar directo: python local_api/main.py
+# (Opcional) ejecutar directo: python -m local_api.main
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("local_api.main:app", host="0.0.0.0", port=8001, reload=True)
\ No newline at end of file
@@ -0,0 +1,247 @@
+# local_api/overview.py — Rollups diarios materializados para /overview
+import csv
+import hashlib
+import io
+import sqlite3
+import threading
+import datetime as dt
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+POST_METRICS = ("posts", "views", "interactions")
+
+COUNTRY_NAMES = {
+    "ARG": "Argentina", "BOL": "Bolivia", "BRA": "Brasil", "CHL": "Chile", "COL": "Colombia",
+    "ECU": "Ecuador", "ESP": "España", "MEX": "México", "PER": "Perú", "PRY": "Paraguay",
+    "URY": "Uruguay", "USA": "USA", "VEN": "Venezuela",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_rollup (
+    date TEXT NOT NULL, platform TEXT NOT NULL, metric TEXT NOT NULL,
+    value REAL NOT NULL, cum REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (platform, metric, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS daily_rollup_metric_date ON daily_rollup (metric, date);
+CREATE TABLE IF NOT EXISTS daily_geo (
+    date TEXT NOT NULL, iso3 TEXT NOT NULL, views REAL NOT NULL,
+    PRIMARY KEY (date, iso3)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS ingest_state (
+    source TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,
+    offset INTEGER NOT NULL, header TEXT NOT NULL, tail_sig TEXT NOT NULL
+);
+"""
+
+# Las filas de geo sin columna ``date`` se guardan con esta fecha y entran en cualquier rango
+UNDATED = ""
+_SIG_BYTES = 64
+
+
+class OverviewRollup:
+    """Tabla diaria fecha × plataforma × métrica (con suma acumulada) y fecha × iso3.
+
+    Los CSV fuente se ingieren de forma incremental: si el archivo solo creció,
+    se leen únicamente las líneas nuevas; si se reescribió, se reconstruye.
+    Un rango de fechas se responde con dos búsquedas por (plataforma, métrica)
+    sobre la suma acumulada, sin re-agregar los posts.
+    """
+
+    def __init__(self, db_path: str, posts_csv: Optional[Path], geo_csv: Optional[Path] = None):
+        self.posts_csv = posts_csv
+        self.geo_csv = geo_csv
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self.rows_ingested = 0
+        self.rebuilds = 0
+
+    # ---------- Ingesta ----------
+    def refresh(self) -> None:
+        with self._lock:
+            if self.posts_csv is not None:
+                self._refresh_source("posts", self.posts_csv, self._apply_posts, "DELETE FROM daily_rollup")
+            if self.geo_csv is not None:
+                self._refresh_source("geo", self.geo_csv, self._apply_geo, "DELETE FROM daily_geo")
+
+    def _refresh_source(self, name: str, path: Path, apply, wipe_sql: str) -> None:
+        if not path.exists():
+            return
+        st = path.stat()
+        state = self._conn.execute(
+            "SELECT size, mtime_ns, offset, header, tail_sig FROM ingest_state WHERE source=?", (name,)
+        ).fetchone()
+        if state and state[0] == st.st_size and state[1] == st.st_mtime_ns:
+            return
+
+        with path.open("rb") as f:
+            appended = bool(state) and st.st_size >= state[2] and _tail_sig(f, state[2]) == state[4]
+            if appended:
+                offset, header = state[2], state[3].split(",")
+                f.seek(offset)
+                chunk = f.read()
+            else:
+                f.seek(0)
+                data = f.read()
+                first_nl = data.find(b"\n")
+                if first_nl < 0:
+                    return
+                header = [h.strip() for h in data[:first_nl].decode("utf-8-sig").split(",")]
+                offset, chunk = first_nl + 1, data[first_nl + 1:]
+
+            # solo líneas completas; una línea a medio escribir se lee en el próximo refresh
+            last_nl = chunk.rfind(b"\n")
+            complete = chunk[:last_nl + 1] if last_nl >= 0 else b""
+            new_offset = offset + len(complete)
+            rows = list(csv.DictReader(io.StringIO(complete.decode("utf-8")), fieldnames=header))
+            sig = _tail_sig(f, new_offset)
+
+        self._conn.execute("BEGIN")
+        try:
+            if not appended:
+                self._conn.execute(wipe_sql)
+                self.rebuilds += 1
+            apply(rows)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ingest_state (source, size, mtime_ns, offset, header, tail_sig) VALUES (?, ?, ?, ?, ?, ?)",
+                (name, st.st_size, st.st_mtime_ns, new_offset, ",".join(header), sig),
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self.rows_ingested += len(rows)
+
+    def _apply_posts(self, rows: List[Dict[str, str]]) -> None:
+        first_date: Dict[str, str] = {}
+        for r in rows:
+            date, platform = (r.get("date") or "")[:10], (r.get("platform") or "").strip()
+            if not date or not platform:
+                continue
+            for m in POST_METRICS:
+                self._conn.execute(
+                    "INSERT INTO daily_rollup (date, platform, metric, value) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (platform, metric, date) DO UPDATE SET value = value + excluded.value",
+                    (date, platform, m, _num(r.get(m))),
+                )
+            if platform not in first_date or date < first_date[platform]:
+                first_date[platform] = date
+        for platform, since in first_date.items():
+            for m in POST_METRICS:
+                self._recompute_cum(platform, m, since)
+
+    def _recompute_cum(self, platform: str, metric: str, since: str) -> None:
+        # Solo se recalculan las sumas acumuladas desde la primera fecha tocada
+        prev = self._conn.execute(
+            "SELECT cum FROM daily_rollup WHERE platform=? AND metric=? AND date<? ORDER BY date DESC LIMIT 1",
+            (platform, metric, since),
+        ).fetchone()
+        cum = prev[0] if prev else 0.0
+        rows = self._conn.execute(
+            "SELECT date, value FROM daily_rollup WHERE platform=? AND metric=? AND date>=? ORDER BY date",
+            (platform, metric, since),
+        ).fetchall()
+        updates = []
+        for date, value in rows:
+            cum += value
+            updates.append((cum, platform, metric, date))
+        self._conn.executemany("UPDATE daily_rollup SET cum=? WHERE platform=? AND metric=? AND date=?", updates)
+
+    def _apply_geo(self, rows: List[Dict[str, str]]) -> None:
+        for r in rows:
+            iso3 = (r.get("iso3") or "").strip().upper()
+            if not iso3:
+                continue
+            self._conn.execute(
+                "INSERT INTO daily_geo (date, iso3, views) VALUES (?, ?, ?) "
+                "ON CONFLICT (date, iso3) DO UPDATE SET views = views + excluded.views",
+                ((r.get("date") or UNDATED)[:10], iso3, _num(r.get("views"))),
+            )
+
+    # ---------- Consultas ----------
+    def _cum_at(self, platform: str, metric: str, date: str, inclusive: bool) -> float:
+        op = "<=" if inclusive else "<"
+        row = self._conn.execute(
+            f"SELECT cum FROM daily_rollup WHERE platform=? AND metric=? AND date{op}? ORDER BY date DESC LIMIT 1",
+            (platform, metric, date),
+        ).fetchone()
+        return row[0] if row else 0.0
+
+    def totals(self, date_from: str, date_to: str) -> Dict[str, Dict[str, float]]:
+        platforms = [r[0] for r in self._conn.execute("SELECT DISTINCT platform FROM daily_rollup")]
+        return {
+            p: {m: self._cum_at(p, m, date_to, True) - self._cum_at(p, m, date_from, False) for m in POST_METRICS}
+            for p in platforms
+        }
+
+    def query(self, date_from: str, date_to: str) -> Dict[str, Any]:
+        self.refresh()
+        with self._lock:
+            totals = self.totals(date_from, date_to)
+            posts_by_day = self._conn.execute(
+                "SELECT date, sum(value) FROM daily_rollup WHERE metric='posts' AND date BETWEEN ? AND ? GROUP BY date ORDER BY date",
+                (date_from, date_to),
+            ).fetchall()
+            geo = self._conn.execute(
+                "SELECT iso3, sum(views) FROM daily_geo WHERE (date BETWEEN ? AND ?) OR date=? GROUP BY iso3 ORDER BY 2 DESC",
+                (date_from, date_to, UNDATED),
+            ).fetchall()
+
+        totals = {p: t for p, t in totals.items() if any(t.values())}
+        by_day = {d: int(v) for d, v in posts_by_day}
+        total_views = sum(t["views"] for t in totals.values())
+        ordered = sorted(totals.items(), key=lambda kv: kv[1]["views"], reverse=True)
+        return {
+            "from": date_from,
+            "to": date_to,
+            # todos los días del rango (0 si no hubo posts), para que el promedio diario sea real
+            "posts_by_day": [{"date": d, "posts": by_day.get(d, 0)} for d in _days(date_from, date_to)],
+            "geo": [{"country": COUNTRY_NAMES.get(iso3, iso3), "iso3": iso3, "views": int(v)} for iso3, v in geo],
+            "share": [
+                {"platform": p, "value": round(t["views"] / total_views * 100.0, 2) if total_views else 0.0}
+                for p, t in ordered
+            ],
+            "views_by_platform": [{"platform": p, "views": int(t["views"])} for p, t in ordered],
+            "table": [
+                {"platform": p, "posts": int(t["posts"]), "interactions": int(t["interactions"]), "views": int(t["views"])}
+                for p, t in ordered
+            ],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            days = self._conn.execute("SELECT count(DISTINCT date) FROM daily_rollup").fetchone()[0]
+        return {"days": days, "rowsIngested": self.rows_ingested, "rebuilds": self.rebuilds}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def empty_overview(date_from: str = "", date_to: str = "") -> Dict[str, Any]:
+    """Mismo esquema que ``OverviewRollup.query`` sin filas (p.ej. para respuestas de error)."""
+    return {"from": date_from, "to": date_to, "posts_by_day": [], "geo": [], "share": [], "views_by_platform": [], "table": []}
+
+
+def _days(date_from: str, date_to: str) -> List[str]:
+    d, end = dt.date.fromisoformat(date_from), dt.date.fromisoformat(date_to)
+    out = []
+    while d <= end:
+        out.append(d.isoformat())
+        d += dt.timedelta(days=1)
+    return out
+
+
+def _num(v: Any) -> float:
+    try:
+        return float(v)
+    except Exception:
+        return 0.0
+
+
+def _tail_sig(f, offset: int) -> str:
+    # Firma de los últimos bytes ya ingeridos: si cambian, el archivo se reescribió
+    start = max(0, offset - _SIG_BYTES)
+    f.seek(start)
+    return hashlib.sha1(f.read(offset - start)).hexdigest()
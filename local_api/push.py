@@ -0,0 +1,151 @@
+# local_api/push.py — Stream SSE de deltas para las métricas en vivo
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Optional
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+Snapshot = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+def sse_event(event: str, data: Any) -> str:
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def diff_fields(prev: Dict[str, Any], cur: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in cur.items() if prev.get(k) != v}
+
+
+class Topic:
+    """Un ``snapshot`` compartido por todos los suscriptores de la misma clave.
+
+    Una sola tarea consulta la fuente cada ``window`` segundos (la ventana de
+    coalescencia) y avisa a los suscriptores solo cuando el resultado cambia.
+    """
+
+    def __init__(self, snapshot: Snapshot, window: float):
+        self.snapshot = snapshot
+        self.window = window
+        self.state: Optional[Dict[str, Any]] = None
+        self.version = 0
+        self.subscribers = 0
+        self.polls = 0
+        self._changed = asyncio.Condition()
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    async def _run(self) -> None:
+        while self.subscribers:
+            try:
+                cur = await self.snapshot()
+            except Exception as e:
+                cur = {"error": f"{e.__class__.__name__}: {e}"}
+            self.polls += 1
+            if cur != self.state:
+                async with self._changed:
+                    self.state = cur
+                    self.version += 1
+                    self._changed.notify_all()
+            await asyncio.sleep(self.window)
+
+    async def wait(self, version: int, timeout: float) -> None:
+        """Espera a que haya un resultado distinto de ``version`` (o ``timeout`` segundos)."""
+        async with self._changed:
+            try:
+                await asyncio.wait_for(self._changed.wait_for(lambda: self.version != version), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+class SnapshotHub:
+    """Registro de ``Topic`` por clave: N conexiones SSE al mismo recurso = 1 consulta por ventana."""
+
+    def __init__(self):
+        self._topics: Dict[Hashable, Topic] = {}
+
+    def subscribe(self, key: Hashable, snapshot: Snapshot, window: float) -> Topic:
+        topic = self._topics.get(key)
+        if topic is None:
+            topic = self._topics[key] = Topic(snapshot, window)
+        topic.subscribers += 1
+        if topic._task is None or topic._task.done():
+            topic._task = asyncio.get_running_loop().create_task(topic._run())
+        return topic
+
+    def unsubscribe(self, key: Hashable, topic: Topic) -> None:
+        topic.subscribers -= 1
+        if topic.subscribers <= 0:
+            if topic._task is not None:
+                topic._task.cancel()
+            if self._topics.get(key) is topic:
+                del self._topics[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "topics": len(self._topics),
+            "subscribers": sum(t.subscribers for t in self._topics.values()),
+            "polls": sum(t.polls for t in self._topics.values()),
+        }
+
+
+async def delta_stream(
+    request: Request,
+    hub: SnapshotHub,
+    key: Hashable,
+    snapshot: Snapshot,
+    window: float = 0.5,
+    heartbeat: float = 15.0,
+) -> AsyncIterator[str]:
+    """Emite un ``snapshot`` completo y luego solo los campos que cambian.
+
+    La fuente la consulta el ``Topic`` de ``key`` en ``hub``, compartido por
+    todas las conexiones a ese recurso; ``window`` es la ventana de
+    coalescencia: los cambios de una misma ventana salen juntos en un único
+    evento ``delta``. Si el snapshot trae ``error``, se emite un evento
+    ``error`` (solo cuando el mensaje cambia).
+    """
+    topic = hub.subscribe((key, window), snapshot, window)
+    last: Optional[Dict[str, Any]] = None
+    last_error: Optional[str] = None
+    last_sent = time.monotonic()
+    version = 0
+    try:
+        while not await request.is_disconnected():
+            await topic.wait(version, timeout=min(heartbeat, 5.0))
+            if topic.version != version:
+                version = topic.version
+                cur = dict(topic.state or {})
+                err = cur.pop("error", None)
+                if err:
+                    if err != last_error:
+                        last_error = err
+                        last_sent = time.monotonic()
+                        yield sse_event("error", {"error": err})
+                else:
+                    last_error = None
+                    if last is None:
+                        last = cur
+                        last_sent = time.monotonic()
+                        yield sse_event("snapshot", {**cur, "ts": time.time()})
+                    else:
+                        delta = diff_fields(last, cur)
+                        if delta:
+                            last = cur
+                            last_sent = time.monotonic()
+                            yield sse_event("delta", {**delta, "ts": time.time()})
+
+            if time.monotonic() - last_sent >= heartbeat:
+                last_sent = time.monotonic()
+                yield ": ping\n\n"
+    finally:
+        hub.unsubscribe((key, window), topic)
+
+
+def sse_response(stream: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
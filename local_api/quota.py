@@ -0,0 +1,147 @@
+# local_api/quota.py — Presupuesto diario de cuota del YouTube Data API y ritmo de sondeo
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Set
+from zoneinfo import ZoneInfo
+
+# Unidades por llamada (https://developers.google.com/youtube/v3/determine_quota_cost)
+COSTS: Dict[str, int] = {"videos.list": 1, "liveChatMessages.list": 5}
+
+# La cuota de Google se reinicia a medianoche, hora del Pacífico
+QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+
+
+class _VideoActivity:
+    def __init__(self):
+        self.last_seen = time.monotonic()
+        self.viewers: Optional[int] = None
+        self.trend = 0.0
+        self.unchanged = 0
+        self.endpoints: Set[str] = set()
+
+    def weight(self) -> float:
+        # sin cambios en varias lecturas -> stream ocioso; audiencia creciendo -> más frecuencia
+        if self.unchanged >= 3:
+            return 0.25
+        return min(4.0, max(0.25, 1.0 + 10.0 * self.trend))
+
+
+class QuotaScheduler:
+    """Lleva las unidades gastadas por endpoint y reparte lo que queda del día
+    entre los videos que se están mirando.
+
+    ``interval(video, endpoint)`` devuelve cada cuántos segundos conviene volver
+    a llamar a ese endpoint para ese video sin agotar ``daily_budget`` antes del
+    reinicio: más seguido para streams con audiencia en alza, menos para los
+    que no cambian.
+    """
+
+    def __init__(
+        self,
+        daily_budget: int = 10000,
+        min_interval: float = 3.0,
+        max_interval: float = 300.0,
+        watch_window: float = 120.0,
+        adaptive: bool = True,
+    ):
+        self.daily_budget = daily_budget
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.watch_window = watch_window
+        self.adaptive = adaptive
+        self._lock = threading.Lock()
+        self._day = self._quota_day()
+        self._spent: Dict[str, int] = {}
+        self._calls: Dict[str, int] = {}
+        self._videos: Dict[str, _VideoActivity] = {}
+
+    @staticmethod
+    def _quota_day() -> str:
+        return datetime.now(QUOTA_TZ).date().isoformat()
+
+    @staticmethod
+    def seconds_to_reset() -> float:
+        now = datetime.now(QUOTA_TZ)
+        midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return max(1.0, (midnight - now).total_seconds())
+
+    def _roll_day(self) -> None:
+        day = self._quota_day()
+        if day != self._day:
+            self._day = day
+            self._spent.clear()
+            self._calls.clear()
+
+    # ---------- Registro ----------
+    def spend(self, endpoint: str, units: Optional[int] = None) -> None:
+        with self._lock:
+            self._roll_day()
+            self._spent[endpoint] = self._spent.get(endpoint, 0) + (COSTS.get(endpoint, 1) if units is None else units)
+            self._calls[endpoint] = self._calls.get(endpoint, 0) + 1
+
+    def touch(self, video_id: str, endpoint: str) -> None:
+        with self._lock:
+            v = self._videos.setdefault(video_id, _VideoActivity())
+            v.last_seen = time.monotonic()
+            v.endpoints.add(endpoint)
+
+    def observe(self, video_id: str, viewers: int) -> None:
+        with self._lock:
+            v = self._videos.setdefault(video_id, _VideoActivity())
+            if v.viewers is not None:
+                change = (viewers - v.viewers) / max(v.viewers, 1)
+                v.trend = 0.7 * v.trend + 0.3 * change
+                v.unchanged = v.unchanged + 1 if viewers == v.viewers else 0
+            v.viewers = viewers
+
+    # ---------- Ritmo ----------
+    @property
+    def spent(self) -> int:
+        return sum(self._spent.values())
+
+    def _watched(self) -> Dict[str, _VideoActivity]:
+        horizon = time.monotonic() - self.watch_window
+        for vid in [k for k, v in self._videos.items() if v.last_seen < horizon]:
+            del self._videos[vid]
+        return self._videos
+
+    def interval(self, video_id: str, endpoint: str) -> float:
+        with self._lock:
+            self._roll_day()
+            remaining = self.daily_budget - self.spent
+            if remaining <= 0:
+                return self.max_interval
+            watched = self._watched()
+            v = watched.get(video_id)
+            if v is None:
+                return self.min_interval
+            weights = {k: (a.weight() if self.adaptive else 1.0) for k, a in watched.items()}
+            share = weights[video_id] / sum(weights.values())
+            units_per_second = remaining / self.seconds_to_reset() * share
+            # cada endpoint activo del video recibe la misma parte de sus unidades
+            n_endpoints = max(1, len(v.endpoints))
+            secs = COSTS.get(endpoint, 1) * n_endpoints / units_per_second
+            return min(self.max_interval, max(self.min_interval, secs))
+
+    def state(self) -> Dict[str, Any]:
+        with self._lock:
+            self._roll_day()
+            spent = self.spent
+            reset_in = self.seconds_to_reset()
+            videos = {k: {"viewers": a.viewers, "weight": round(a.weight(), 3), "endpoints": sorted(a.endpoints)}
+                      for k, a in self._watched().items()}
+        for vid, info in videos.items():
+            info["intervals"] = {e: round(self.interval(vid, e), 1) for e in info["endpoints"]}
+        return {
+            "day": self._day,
+            "dailyBudget": self.daily_budget,
+            "spent": spent,
+            "remaining": max(0, self.daily_budget - spent),
+            "spentByEndpoint": dict(self._spent),
+            "callsByEndpoint": dict(self._calls),
+            "resetInSeconds": int(reset_in),
+            "sustainableUnitsPerMinute": round(max(0, self.daily_budget - spent) / reset_in * 60, 2),
+            "adaptive": self.adaptive,
+            "watched": videos,
+        }
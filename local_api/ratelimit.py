@@ -0,0 +1,140 @@
+# local_api/ratelimit.py — Límite de peticiones por cliente y ruta (token bucket)
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from starlette.datastructures import QueryParams
+
+from common.metrics import REGISTRY
+from common.responses import FastJSONResponse
+
+RATE_LIMITED = REGISTRY.counter(
+    "rate_limited_total",
+    "Peticiones por encima del límite rechazadas con 429.",
+    ("route", "outcome"),
+)
+
+# Devuelve True si la petición no genera trabajo nuevo: su respuesta ya está en
+# caché o se une a una carga en curso. Esas peticiones no consumen tokens.
+Joiner = Callable[[QueryParams], bool]
+
+LOOPBACK = ("127.0.0.1", "::1")
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Consume un token; devuelve 0 si se pudo o los segundos hasta el próximo."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Un token bucket por (cliente, ruta), con ``rate`` peticiones/s y ráfagas de ``burst``.
+
+    ``routes`` permite otros límites por ruta. Los buckets se guardan en un LRU
+    de ``max_buckets`` para que muchos clientes distintos no hagan crecer la
+    memoria. Se usa desde el event loop (sin hilos), como ``TTLCache``.
+    """
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        burst: float = 20.0,
+        routes: Optional[Dict[str, Tuple[float, float]]] = None,
+        max_buckets: int = 10000,
+    ):
+        self.rate = max(0.001, rate)
+        self.burst = max(1.0, burst)
+        self.routes = dict(routes or {})
+        self.max_buckets = max(1, max_buckets)
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+
+    def limits_for(self, route: str) -> Tuple[float, float]:
+        return self.routes.get(route, (self.rate, self.burst))
+
+    def check(self, client: str, route: str) -> float:
+        now = time.monotonic()
+        key = (client, route)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            rate, burst = self.limits_for(route)
+            bucket = self._buckets[key] = TokenBucket(max(0.001, rate), max(1.0, burst), now)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.take(now)
+
+    @staticmethod
+    def parse_routes(spec: str) -> Dict[str, Tuple[float, float]]:
+        """``"/live-data=2:10,/tiktok-stats=5:20"`` -> ``{ruta: (rate, burst)}``."""
+        routes: Dict[str, Tuple[float, float]] = {}
+        for part in (spec or "").split(","):
+            if "=" not in part:
+                continue
+            route, _, limits = part.partition("=")
+            rate, _, burst = limits.partition(":")
+            routes[route.strip()] = (float(rate), float(burst or rate))
+        return routes
+
+
+class RateLimitMiddleware:
+    """Aplica ``RateLimiter`` antes de llegar a los endpoints.
+
+    - Las peticiones de ``exempt_clients`` no se limitan: por defecto loopback,
+      porque el servidor de Streamlit pide en nombre de todos sus usuarios.
+    - Una petición que no genera trabajo nuevo (``joiners[ruta](query)`` devuelve
+      True: respuesta en caché o carga en curso) pasa sin consumir tokens.
+    - El resto consume un token de su bucket; sin tokens, 429 con ``Retry-After``.
+    """
+
+    def __init__(
+        self,
+        app,
+        limiter: RateLimiter,
+        joiners: Optional[Dict[str, Joiner]] = None,
+        exempt: Iterable[str] = ("/health", "/metrics"),
+        exempt_clients: Iterable[str] = LOOPBACK,
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.joiners = dict(joiners or {})
+        self.exempt = set(exempt)
+        self.exempt_clients = set(exempt_clients)
+
+    async def __call__(self, scope, receive, send):
+        client = (scope.get("client") or ("?", 0))[0]
+        if scope["type"] != "http" or scope["path"] in self.exempt or client in self.exempt_clients:
+            await self.app(scope, receive, send)
+            return
+        route = scope["path"]
+        joiner = self.joiners.get(route)
+        if joiner is not None and joiner(QueryParams(scope.get("query_string", b""))):
+            await self.app(scope, receive, send)
+            return
+        wait = self.limiter.check(client, route)
+        if wait <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        RATE_LIMITED.inc(route, "rejected")
+        retry_after = max(1, math.ceil(wait))
+        response = FastJSONResponse(
+            {"error": "Demasiadas peticiones; reintenta más tarde.", "retryAfter": retry_after},
+            status_code=429,
+            headers={"Retry-After": str(retry_after)},
+        )
+        await response(scope, receive, send)
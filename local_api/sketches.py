@@ -0,0 +1,100 @@
+# local_api/sketches.py — Estructuras aproximadas de memoria acotada
+import hashlib
+import math
+import threading
+from typing import Any, Dict, Hashable, List, Tuple
+
+
+class SpaceSaving:
+    """Top-K aproximado (algoritmo Space-Saving) con ``capacity`` contadores como máximo.
+
+    Cada contador guarda (conteo, error): el valor real está entre
+    ``conteo - error`` y ``conteo``. Los elementos con peso suficiente nunca se
+    pierden, aunque pasen millones de elementos distintos.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = max(1, capacity)
+        self._counts: Dict[Hashable, List[float]] = {}
+        self._lock = threading.Lock()
+        self._top: List[Tuple[Hashable, float, float]] = []
+        self._dirty = False
+        self.total = 0.0
+
+    def offer(self, item: Hashable, weight: float = 1.0) -> None:
+        with self._lock:
+            self.total += weight
+            c = self._counts.get(item)
+            if c is not None:
+                c[0] += weight
+            elif len(self._counts) < self.capacity:
+                self._counts[item] = [weight, 0.0]
+            else:
+                # reemplaza al mínimo y hereda su conteo como error
+                victim = min(self._counts, key=lambda k: self._counts[k][0])
+                floor = self._counts.pop(victim)[0]
+                self._counts[item] = [floor + weight, floor]
+            self._dirty = True
+
+    def top(self, k: int = 10) -> List[Tuple[Hashable, float, float]]:
+        with self._lock:
+            if self._dirty:
+                self._top = sorted(((i, c[0], c[1]) for i, c in self._counts.items()), key=lambda t: t[1], reverse=True)
+                self._dirty = False
+            return self._top[:k]
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"capacity": self.capacity, "tracked": len(self._counts), "total": self.total}
+
+
+class HyperLogLog:
+    """Conteo aproximado de distintos con ``2**p`` registros de 1 byte.
+
+    Error típico ≈ 1.04 / sqrt(2**p): con p=12 (4 KB) ronda el 1.6 %.
+    """
+
+    def __init__(self, p: int = 12):
+        self.p = min(16, max(4, p))
+        self.m = 1 << self.p
+        self._registers = bytearray(self.m)
+        self._lock = threading.Lock()
+        if self.m >= 128:
+            self._alpha = 0.7213 / (1 + 1.079 / self.m)
+        else:
+            self._alpha = {16: 0.673, 32: 0.697, 64: 0.709}[self.m]
+
+    @staticmethod
+    def _hash(item: Any) -> int:
+        data = item if isinstance(item, bytes) else str(item).encode("utf-8")
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+    def add(self, item: Any) -> None:
+        x = self._hash(item)
+        idx = x >> (64 - self.p)
+        rest = x & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        with self._lock:
+            if rank > self._registers[idx]:
+                self._registers[idx] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.p != self.p:
+            raise ValueError("HyperLogLog con distinta precisión")
+        with self._lock:
+            self._registers = bytearray(max(a, b) for a, b in zip(self._registers, other._registers))
+
+    def count(self) -> int:
+        with self._lock:
+            regs = bytes(self._registers)
+        estimate = self._alpha * self.m * self.m / sum(2.0 ** -r for r in regs)
+        zeros = regs.count(0)
+        if estimate <= 2.5 * self.m and zeros:
+            # rango bajo: conteo lineal
+            estimate = self.m * math.log(self.m / zeros)
+        return int(round(estimate))
+
+    def __len__(self) -> int:
+        return self.count()
@@ -0,0 +1,129 @@
+# local_api/tiktok_files.py — Lectura cacheada de los JSON del capturador TikTok
+import json
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .gift_index import GiftIndex
+
+
+def parse_capture(raw: Dict[str, Any]) -> Dict[str, Any]:
+    gifts = raw.get("gifts", []) or []
+    gifts_count = int(raw.get("giftsCount", len(gifts)))
+    return {
+        "username": raw.get("username"),
+        "likes": int(raw.get("likes", 0)),
+        "comments": int(raw.get("comments", 0)),
+        "viewers": int(raw.get("viewers", 0)),
+        "diamonds": int(raw.get("diamonds", 0)),
+        "shares": int(raw.get("shares", 0)),
+        # los snapshots nuevos del capturador solo traen los últimos gifts + el total
+        "giftsCount": gifts_count,
+        "gifts": gifts,
+        "lastUpdate": raw.get("lastUpdate"),
+        # se arma una vez por re-parseo; las consultas de leaderboard no recorren ``gifts``.
+        # Si el snapshot viene recortado el leaderboard sale con partial=True.
+        "index": GiftIndex.from_gifts(gifts, gifts_count),
+    }
+
+
+class CaptureFileCache:
+    """Re-parsea un ``live_<user>.json`` solo cuando cambian su mtime o tamaño.
+
+    Si el archivo está a medio escribir (JSON inválido) se sigue sirviendo la
+    última versión buena en lugar de fallar.
+    """
+
+    def __init__(self, parse: Callable[[Dict[str, Any]], Dict[str, Any]] = parse_capture):
+        self._parse = parse
+        self._entries: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.reparses = 0
+        self.parse_errors = 0
+
+    def read(self, path: Path) -> Dict[str, Any]:
+        key = str(path.resolve())
+        st = path.stat()
+        sig = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == sig:
+                self.hits += 1
+                return entry[1]
+        try:
+            parsed = self._parse(json.loads(path.read_text(encoding="utf-8")))
+        except Exception:
+            with self._lock:
+                self.parse_errors += 1
+                if entry is not None:
+                    return entry[1]
+            raise
+        with self._lock:
+            self._entries[key] = (sig, parsed)
+            self.reparses += 1
+        return parsed
+
+    def is_fresh(self, path: Path) -> bool:
+        """True si ``read(path)`` saldría del caché (mismo mtime y tamaño, sin re-parsear)."""
+        try:
+            st = path.stat()
+        except OSError:
+            return False
+        with self._lock:
+            entry = self._entries.get(str(path.resolve()))
+        return entry is not None and entry[0] == (st.st_mtime_ns, st.st_size)
+
+    def forget_missing(self) -> None:
+        with self._lock:
+            for k in [k for k in self._entries if not Path(k).exists()]:
+                del self._entries[k]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "files": len(self._entries),
+                "hits": self.hits,
+                "reparses": self.reparses,
+                "parseErrors": self.parse_errors,
+            }
+
+
+class CaptureWatcher:
+    """Hilo que revisa periódicamente ``pattern`` en ``directory`` y precarga la caché.
+
+    Así las peticiones casi siempre encuentran el archivo ya parseado y solo
+    pagan un ``stat()``.
+    """
+
+    def __init__(self, cache: CaptureFileCache, directory: Path, pattern: str = "live_*.json", interval: float = 1.0):
+        self.cache = cache
+        self.directory = directory
+        self.pattern = pattern
+        self.interval = interval
+        self.files: List[str] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "CaptureWatcher":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="tiktok-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            found = sorted(self.directory.glob(self.pattern))
+            for p in found:
+                try:
+                    self.cache.read(p)
+                except Exception:
+                    pass
+            if len(found) != len(self.files):
+                self.cache.forget_missing()
+            self.files = [p.name for p in found]
+            self._stop.wait(self.interval)
@@ -0,0 +1,157 @@
+# local_api/tiktok_log.py — Lectura incremental (tail) del log NDJSON del capturador TikTok
+import json
+import threading
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from .gift_index import GiftIndex
+
+
+class NdjsonTail:
+    """Pliega los eventos de ``live_<user>.ndjson`` en contadores en memoria.
+
+    Recuerda el offset en bytes: cada lectura solo procesa las líneas nuevas.
+    Un evento ``start`` (live nuevo) reinicia los contadores; ``resume`` (el
+    capturador se reinició a mitad del live y sigue escribiendo al final) no.
+    Si el archivo se trunca o se reemplaza se vuelve a leer desde el inicio.
+    """
+
+    def __init__(self, path: Path, max_gifts: int = 5000):
+        self.path = path
+        self.max_gifts = max_gifts
+        self.offset = 0
+        self.lines = 0
+        self.bad_lines = 0
+        self._remainder = b""
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.state: Dict[str, Any] = {
+            "username": None,
+            "likes": 0,
+            "comments": 0,
+            "viewers": 0,
+            "diamonds": 0,
+            "shares": 0,
+            "giftsCount": 0,
+            "startedAt": None,
+            "lastUpdate": None,
+            "ended": False,
+        }
+        self.gifts: Deque[Dict[str, Any]] = deque(maxlen=self.max_gifts)
+        self.index = GiftIndex()
+
+    def _fold(self, ev: Dict[str, Any]) -> None:
+        t = ev.get("t")
+        s = self.state
+        if t == "start":
+            self._reset()
+            s = self.state
+            s["username"] = ev.get("username")
+            s["startedAt"] = ev.get("ts")
+        elif t == "resume":
+            s["ended"] = False
+            s["username"] = ev.get("username") or s["username"]
+        elif t == "roomUser":
+            s["viewers"] = int(ev.get("viewers", s["viewers"]))
+        elif t == "like":
+            if "n" in ev:
+                s["likes"] += int(ev["n"])
+            elif "total" in ev:
+                s["likes"] = int(ev["total"])
+        elif t == "chat":
+            s["comments"] += 1
+        elif t == "share":
+            s["shares"] += 1
+        elif t == "gift":
+            gift = {k: ev.get(k) for k in ("user", "gift", "amount", "diamonds", "ts")}
+            s["diamonds"] += int(ev.get("diamonds") or 0)
+            s["giftsCount"] += 1
+            self.gifts.append(gift)
+            self.index.add(gift)
+        elif t == "end":
+            s["ended"] = True
+        if ev.get("ts"):
+            s["lastUpdate"] = ev["ts"]
+
+    def poll(self) -> None:
+        with self._lock:
+            st = self.path.stat()
+            file_id = (st.st_dev, st.st_ino)
+            if file_id != self._file_id or st.st_size < self.offset:
+                self._file_id = file_id
+                self.offset = 0
+                self._remainder = b""
+                self._reset()
+            if st.st_size == self.offset:
+                return
+            with self.path.open("rb") as f:
+                f.seek(self.offset)
+                chunk = f.read(st.st_size - self.offset)
+            self.offset += len(chunk)
+            *complete, self._remainder = (self._remainder + chunk).split(b"\n")
+            for line in complete:
+                if not line.strip():
+                    continue
+                try:
+                    self._fold(json.loads(line))
+                    self.lines += 1
+                except Exception:
+                    self.bad_lines += 1
+
+    def read(self, gifts: bool = False, limit: int = 0) -> Dict[str, Any]:
+        """Contadores + índice de gifts; la lista de gifts solo si se pide (las últimas ``limit``)."""
+        self.poll()
+        with self._lock:
+            out = {**self.state, "index": self.index}
+            if gifts:
+                n = len(self.gifts) if limit <= 0 else min(limit, len(self.gifts))
+                out["gifts"] = list(islice(self.gifts, len(self.gifts) - n, None))
+            return out
+
+
+class TailRegistry:
+    """Un ``NdjsonTail`` por archivo; misma interfaz ``read(path)`` que ``CaptureFileCache``."""
+
+    def __init__(self, max_gifts: int = 5000):
+        self.max_gifts = max_gifts
+        self._tails: Dict[str, NdjsonTail] = {}
+        self._lock = threading.Lock()
+
+    def tail(self, path: Path) -> NdjsonTail:
+        key = str(path.resolve())
+        with self._lock:
+            t = self._tails.get(key)
+            if t is None:
+                t = self._tails[key] = NdjsonTail(path, max_gifts=self.max_gifts)
+            return t
+
+    def read(self, path: Path, gifts: bool = False, limit: int = 0) -> Dict[str, Any]:
+        return self.tail(path).read(gifts, limit)
+
+    def is_fresh(self, path: Path) -> bool:
+        """True si el tail de ``path`` ya leyó todo el archivo (una lectura no parsea nada)."""
+        with self._lock:
+            t = self._tails.get(str(path.resolve()))
+        try:
+            return t is not None and t.offset == path.stat().st_size
+        except OSError:
+            return False
+
+    def forget_missing(self) -> None:
+        with self._lock:
+            for k in [k for k in self._tails if not Path(k).exists()]:
+                del self._tails[k]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "files": len(self._tails),
+                "lines": sum(t.lines for t in self._tails.values()),
+                "badLines": sum(t.bad_lines for t in self._tails.values()),
+                "bytes": sum(t.offset for t in self._tails.values()),
+            }
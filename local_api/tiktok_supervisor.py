@@ -0,0 +1,206 @@
+# local_api/tiktok_supervisor.py — Pool supervisado de capturadores Node (tiktok_live.js)
+import os
+import re
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Caracteres válidos de un usuario de TikTok: el nombre termina en rutas y argumentos de node
+USERNAME_RE = re.compile(r"^[A-Za-z0-9_.]{1,24}$")
+
+
+class _Capturer:
+    def __init__(self, username: str):
+        self.username = username
+        self.proc: Optional[subprocess.Popen] = None
+        self.restarts = 0
+        self.last_exit: Optional[int] = None
+        self.started_at: Optional[float] = None
+        self.next_start = 0.0
+        self.backoff = 0.0
+        self.error: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+
+class CapturerSupervisor:
+    """Arranca, detiene y reinicia un ``tiktok_live.js`` por usuario del registro.
+
+    - El registro es un archivo de texto (un usuario por línea) más ``TIKTOK_USERS``.
+    - Como máximo ``max_running`` procesos a la vez; el resto queda en cola.
+    - Si un proceso muere se reinicia con backoff exponencial (hasta ``max_backoff``).
+    """
+
+    def __init__(
+        self,
+        script: Path,
+        workdir: Path,
+        registry_file: Optional[Path] = None,
+        initial_users: Optional[List[str]] = None,
+        node: str = "node",
+        max_running: int = 25,
+        max_backoff: float = 60.0,
+        interval: float = 1.0,
+    ):
+        self.script = script.resolve()
+        self.workdir = workdir.resolve()
+        self.registry_file = registry_file
+        self.node = node
+        self.max_running = max(1, max_running)
+        self.max_backoff = max_backoff
+        self.interval = interval
+        self._capturers: Dict[str, _Capturer] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        for u in self._load_registry() + list(initial_users or []):
+            self._add(u)
+
+    # ---------- Registro ----------
+    @staticmethod
+    def normalize(username: str) -> str:
+        return username.strip().lstrip("@")
+
+    @staticmethod
+    def is_valid(username: str) -> bool:
+        return bool(USERNAME_RE.match(username)) and username not in (".", "..")
+
+    def _load_registry(self) -> List[str]:
+        if self.registry_file is None or not self.registry_file.exists():
+            return []
+        lines = self.registry_file.read_text(encoding="utf-8").splitlines()
+        return [l for l in (self.normalize(x) for x in lines) if self.is_valid(l)]
+
+    def _save_registry(self) -> None:
+        if self.registry_file is not None:
+            self.registry_file.write_text("\n".join(sorted(self._capturers)) + "\n", encoding="utf-8")
+
+    def _add(self, username: str) -> Optional[_Capturer]:
+        u = self.normalize(username)
+        if not self.is_valid(u):
+            return None
+        return self._capturers.setdefault(u, _Capturer(u))
+
+    def add(self, username: str) -> Dict[str, Any]:
+        with self._lock:
+            c = self._add(username)
+            if c is None:
+                raise ValueError(f"Usuario de TikTok inválido: {username!r} (letras, números, _ y ., hasta 24)")
+            self._save_registry()
+        return self._status(c)
+
+    def remove(self, username: str) -> bool:
+        with self._lock:
+            c = self._capturers.pop(self.normalize(username), None)
+            if c is None:
+                return False
+            self._terminate(c)
+            self._save_registry()
+            return True
+
+    def usernames(self) -> List[str]:
+        with self._lock:
+            return sorted(self._capturers)
+
+    # ---------- Procesos ----------
+    def _spawn(self, c: _Capturer) -> None:
+        env = {**os.environ, "TIKTOK_USERNAME": c.username, "TIKTOK_JSON_PATH": str(self.workdir / f"live_{c.username}.json")}
+        log = open(self.workdir / f"live_{c.username}.capturer.log", "ab")
+        try:
+            c.proc = subprocess.Popen(
+                [self.node, str(self.script), c.username],
+                cwd=str(self.workdir),
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+        finally:
+            log.close()  # el hijo conserva su propio descriptor
+        c.started_at = time.time()
+
+    @staticmethod
+    def _terminate(c: _Capturer) -> None:
+        if c.running:
+            c.proc.terminate()
+            try:
+                c.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                c.proc.kill()
+        c.proc = None
+
+    def _tick(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for c in self._capturers.values():
+                if c.proc is not None and not c.running:
+                    # murió: se reinicia con backoff; si llevaba >5 min corriendo se resetea
+                    c.last_exit = c.proc.returncode
+                    c.proc = None
+                    c.restarts += 1
+                    lived = time.time() - (c.started_at or 0)
+                    c.backoff = 1.0 if lived > 300 else min(self.max_backoff, max(1.0, c.backoff * 2))
+                    c.next_start = now + c.backoff
+            running = sum(1 for c in self._capturers.values() if c.running)
+            for c in self._capturers.values():
+                if running >= self.max_running:
+                    break
+                if not c.running and now >= c.next_start:
+                    try:
+                        self._spawn(c)
+                        c.error = None
+                        running += 1
+                    except OSError as e:
+                        c.last_exit = -1
+                        c.backoff = self.max_backoff
+                        c.next_start = now + c.backoff
+                        c.error = str(e)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._tick()
+            self._stop.wait(self.interval)
+
+    def start(self) -> "CapturerSupervisor":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="tiktok-supervisor", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._lock:
+            for c in self._capturers.values():
+                self._terminate(c)
+
+    # ---------- Estado ----------
+    def _status(self, c: _Capturer) -> Dict[str, Any]:
+        if c.running:
+            state = "running"
+        elif c.next_start > time.monotonic():
+            state = "backoff"
+        else:
+            state = "queued"
+        return {
+            "username": c.username,
+            "state": state,
+            "pid": c.proc.pid if c.running else None,
+            "restarts": c.restarts,
+            "lastExit": c.last_exit,
+            "error": c.error,
+        }
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            items = [self._status(c) for c in self._capturers.values()]
+        return {
+            "running": sum(1 for i in items if i["state"] == "running"),
+            "maxRunning": self.max_running,
+            "supervising": self._thread is not None and self._thread.is_alive(),
+            "capturers": sorted(items, key=lambda i: i["username"]),
+        }
@@ -0,0 +1,238 @@
+# local_api/timeseries.py — Histórico de snapshots en vivo (SQLite) con rollups 1m / 1h
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# (nombre, resolución en segundos, tabla)
+TIERS: List[Tuple[str, int, str]] = [("raw", 0, "ts_raw"), ("1m", 60, "ts_1m"), ("1h", 3600, "ts_1h")]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ts_raw (
+    platform TEXT NOT NULL, sid TEXT NOT NULL, metric TEXT NOT NULL, ts INTEGER NOT NULL, value REAL NOT NULL,
+    PRIMARY KEY (platform, sid, metric, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS ts_1m (
+    platform TEXT NOT NULL, sid TEXT NOT NULL, metric TEXT NOT NULL, bucket INTEGER NOT NULL,
+    n INTEGER NOT NULL, vsum REAL NOT NULL, vmin REAL NOT NULL, vmax REAL NOT NULL, vlast REAL NOT NULL,
+    PRIMARY KEY (platform, sid, metric, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS ts_1h (
+    platform TEXT NOT NULL, sid TEXT NOT NULL, metric TEXT NOT NULL, bucket INTEGER NOT NULL,
+    n INTEGER NOT NULL, vsum REAL NOT NULL, vmin REAL NOT NULL, vmax REAL NOT NULL, vlast REAL NOT NULL,
+    PRIMARY KEY (platform, sid, metric, bucket)
+) WITHOUT ROWID;
+"""
+
+_UPSERT_ROLLUP = """
+INSERT INTO {table} (platform, sid, metric, bucket, n, vsum, vmin, vmax, vlast)
+VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?)
+ON CONFLICT (platform, sid, metric, bucket) DO UPDATE SET
+    n = n + 1,
+    vsum = vsum + excluded.vsum,
+    vmin = min(vmin, excluded.vmin),
+    vmax = max(vmax, excluded.vmax),
+    vlast = excluded.vlast
+"""
+
+
+class TimeSeriesStore:
+    """Guarda snapshots (plataforma, id, métrica) y mantiene los rollups al insertar.
+
+    - ``raw``: cada muestra (como mucho una cada ``min_interval`` s por stream).
+    - ``1m`` / ``1h``: n, suma, mín, máx y último valor por bucket.
+
+    Las consultas eligen el tier más barato cuya resolución alcanza para el
+    ``step`` pedido, así un gráfico de una semana lee rollups horarios.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        min_interval: float = 5.0,
+        retention: Optional[Dict[str, int]] = None,
+        max_points: int = 500,
+    ):
+        self.path = path
+        self.min_interval = min_interval
+        self.max_points = max_points
+        self.retention = {"raw": 2 * 86400, "1m": 30 * 86400, "1h": 400 * 86400, **(retention or {})}
+        self._last_sample: Dict[Tuple[str, str], float] = {}
+        self._last_prune = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.samples = 0
+        self.skipped = 0
+
+    def record(self, platform: str, sid: str, metrics: Dict[str, Any], ts: Optional[float] = None) -> bool:
+        ts = time.time() if ts is None else ts
+        key = (platform, sid)
+        with self._lock:
+            last = self._last_sample.get(key)
+            if last is not None and ts - last < self.min_interval:
+                self.skipped += 1
+                return False
+            self._last_sample[key] = ts
+            t = int(ts)
+            rows = [(platform, sid, m, float(v)) for m, v in metrics.items() if isinstance(v, (int, float))]
+            cur = self._conn.cursor()
+            cur.execute("BEGIN")
+            try:
+                cur.executemany(
+                    "INSERT OR REPLACE INTO ts_raw (platform, sid, metric, ts, value) VALUES (?, ?, ?, ?, ?)",
+                    [(p, s, m, t, v) for p, s, m, v in rows],
+                )
+                for _name, res, table in TIERS[1:]:
+                    bucket = t - t % res
+                    cur.executemany(
+                        _UPSERT_ROLLUP.format(table=table),
+                        [(p, s, m, bucket, v, v, v, v) for p, s, m, v in rows],
+                    )
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+            self.samples += 1
+            if ts - self._last_prune > 600:
+                self._prune(ts)
+            return True
+
+    def _prune(self, now: float) -> None:
+        self._last_prune = now
+        for name, _res, table in TIERS:
+            col = "ts" if name == "raw" else "bucket"
+            self._conn.execute(f"DELETE FROM {table} WHERE {col} < ?", (int(now - self.retention[name]),))
+
+    def pick_tier(self, t_from: float, step: float, now: Optional[float] = None) -> Tuple[str, int, str]:
+        now = time.time() if now is None else now
+        candidates = [t for t in TIERS if t[1] <= step] or TIERS[:1]
+        tier = candidates[-1]
+        # si el rango empieza antes de la retención de ese tier, solo queda un tier más grueso
+        for t in TIERS[TIERS.index(tier):]:
+            tier = t
+            if t_from >= now - self.retention[t[0]]:
+                break
+        return tier
+
+    def query(self, platform: str, sid: str, t_from: float, t_to: float, step: Optional[float] = None) -> Dict[str, Any]:
+        if t_to <= t_from:
+            t_from, t_to = t_to, t_from
+        if not step or step <= 0:
+            step = max(1.0, (t_to - t_from) / self.max_points)
+        step_i = max(1, int(step))
+        name, res, table = self.pick_tier(t_from, step_i)
+        if name == "raw":
+            sql = (
+                "SELECT metric, ts, 1, value, value, value, value FROM ts_raw "
+                "WHERE platform=? AND sid=? AND ts BETWEEN ? AND ? ORDER BY metric, ts"
+            )
+        else:
+            sql = (
+                f"SELECT metric, bucket, n, vsum, vmin, vmax, vlast FROM {table} "
+                "WHERE platform=? AND sid=? AND bucket BETWEEN ? AND ? ORDER BY metric, bucket"
+            )
+        with self._lock:
+            rows = self._conn.execute(sql, (platform, sid, int(t_from) - res, int(t_to))).fetchall()
+
+        # re-agrupa en buckets de ``step`` segundos (avg ponderado, mín, máx y último)
+        series: Dict[str, List[Dict[str, Any]]] = {}
+        acc: Dict[str, List[float]] = {}
+        for metric, t, n, vsum, vmin, vmax, vlast in rows:
+            b = t - t % step_i
+            cur = acc.get(metric)
+            if cur is None or cur[0] != b:
+                if cur is not None:
+                    series.setdefault(metric, []).append(_point(cur))
+                acc[metric] = [b, n, vsum, vmin, vmax, vlast]
+            else:
+                cur[1] += n
+                cur[2] += vsum
+                cur[3] = min(cur[3], vmin)
+                cur[4] = max(cur[4], vmax)
+                cur[5] = vlast
+        for metric, cur in acc.items():
+            series.setdefault(metric, []).append(_point(cur))
+
+        return {
+            "platform": platform,
+            "id": sid,
+            "from": int(t_from),
+            "to": int(t_to),
+            "step": step_i,
+            "tier": name,
+            "rowsScanned": len(rows),
+            "series": series,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {name: self._conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0] for name, _r, table in TIERS}
+        return {"path": self.path, "samples": self.samples, "skipped": self.skipped, "rows": counts}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SnapshotWriter:
+    """Hilo que vuelca los snapshots en ``store``: quien llama a ``submit`` solo encola.
+
+    Los endpoints async no esperan a SQLite. La cola es acotada: si el disco no
+    da abasto se descartan muestras (el histórico es best-effort) en vez de
+    acumularlas en memoria.
+    """
+
+    def __init__(self, store: TimeSeriesStore, max_pending: int = 1000):
+        self.store = store
+        self._queue: "queue.Queue[Optional[Tuple[str, str, Dict[str, Any], float]]]" = queue.Queue(max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self.dropped = 0
+        self.errors = 0
+
+    def start(self) -> "SnapshotWriter":
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="timeseries-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, platform: str, sid: str, metrics: Dict[str, Any]) -> bool:
+        # el timestamp es el de la petición, no el de la escritura
+        try:
+            self._queue.put_nowait((platform, sid, dict(metrics), time.time()))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            platform, sid, metrics, ts = item
+            try:
+                self.store.record(platform, sid, metrics, ts)
+            except Exception:
+                self.errors += 1
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Escribe lo pendiente y detiene el hilo (hasta ``timeout`` segundos)."""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"pending": self._queue.qsize(), "dropped": self.dropped, "errors": self.errors}
+
+
+def _point(cur: List[float]) -> Dict[str, Any]:
+    b, n, vsum, vmin, vmax, vlast = cur
+    return {"t": int(b), "avg": round(vsum / n, 3) if n else None, "min": vmin, "max": vmax, "last": vlast}
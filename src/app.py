@@ -8,9 +8,13 @@
 # -> TikTok y Youtube limpio si no hay usuario consultado
 # =====================================================================================
 
+import os
+import time
 import streamlit as st
-import requests
-import json
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from services.live_fetch import get_fetcher
+from utils.live_buffer import METRICS, downsample, get_live_buffer
 
 # =====================
 # CONFIGURACIÓN GENERAL
@@ -18,14 +22,11 @@ import json
 st.set_page_config(page_title="📊 Comparativa de Tráfico en Vivo", layout="wide")
 
 # --- Funciones auxiliares ---
-def load_tiktok_json(url: str):
+def get_youtube_viewers(data):
     try:
-        r = requests.get(url, timeout=10)
-        r.raise_for_status()
-        return r.json()
-    except Exception as e:
-        st.error(f"No pude leer TikTok JSON: {e}")
-        return {}
+        return int(data["items"][0]["statistics"].get("concurrentViewers") or 0)
+    except Exception:
+        return 0
 
 def get_tiktok_viewers(data):
     try:
@@ -33,9 +34,22 @@ def get_tiktok_viewers(data):
     except Exception:
         return 0
 
-# --- URL RAW por defecto ---
+def get_tiktok_stats(data):
+    try:
+        return data["items"][0]["statistics"] or {}
+    except Exception:
+        return {}
+
+# --- Fuentes ---
+API_URL = os.getenv("API_URL", "http://127.0.0.1:8001").rstrip("/")
 RAW_TT_URL = "https://raw.githubusercontent.com/cdaniela3026/Proyecto_El_Deber_Metricas/main/live_data1.json"
 
+# --- Serie en tiempo real (buffer por sesión) ---
+PLATFORMS = ["YouTube", "TikTok"]
+LIVE_BUFFER_SIZE = int(os.getenv("LIVE_BUFFER_SIZE", "3600"))     # muestras por red que guarda la sesión
+LIVE_CHART_POINTS = int(os.getenv("LIVE_CHART_POINTS", "500"))    # puntos por serie que se dibujan (LTTB)
+LIVE_REFRESH_S = float(os.getenv("LIVE_REFRESH_S", "1"))
+
 # =====================
 # ENTRADAS GENERALES
 # =====================
@@ -63,20 +77,35 @@ st.session_state["tt_raw_input"] = c_tt2.text_input(
     placeholder="https://raw.githubusercontent.com/usuario/repo/main/archivo.json"
 )
 
+def live_sources(yt_url: str, tt_url: str):
+    # YouTube vía la API local (solo estadísticas, sin comentarios) y TikTok desde el JSON RAW
+    return {
+        "YouTube": (f"{API_URL}/live-data", {"video": yt_url, "fields": "statistics"}),
+        "TikTok": (tt_url, None),
+    }
+
+def fetch_live(yt_url: str, tt_url: str):
+    """Consulta todas las redes en paralelo (la espera es la de la más lenta); repetidas y recientes salen del caché."""
+    return get_fetcher().fetch_many(live_sources(yt_url, tt_url))
+
 # =====================
 # KPI EN VIVO
 # =====================
 col1, col2 = st.columns(2)
 
-# Simulación de viewers YouTube (en tu caso lo reemplazas por tu función real)
-yt_viewers = 7107
+tt_url_effective = (st.session_state["tt_raw_input"] or RAW_TT_URL).strip()
+live = fetch_live(youtube_url, tt_url_effective)
+yt_json, tt_json = live["YouTube"], live["TikTok"]
+
+yt_viewers = get_youtube_viewers(yt_json)
 col1.metric("YouTube (concurrentes)", yt_viewers)
+if yt_json.get("error") or yt_json.get("warning"):
+    col1.caption(f"⚠️ {yt_json.get('error') or yt_json.get('warning')}")
 
-# Viewers TikTok usando la URL RAW
-tt_url_effective = (st.session_state["tt_raw_input"] or RAW_TT_URL).strip()
-tt_json = load_tiktok_json(tt_url_effective)
 tt_viewers = get_tiktok_viewers(tt_json)
 col2.metric("TikTok (concurrentes)", tt_viewers)
+if tt_json.get("error"):
+    col2.caption(f"⚠️ No pude leer TikTok JSON: {tt_json['error']}")
 
 # =====================
 # GRÁFICO COMPARATIVO
@@ -84,6 +113,52 @@ col2.metric("TikTok (concurrentes)", tt_viewers)
 import pandas as pd
 import plotly.express as px
 
+def live_sample(live):
+    yt = get_tiktok_stats(live["YouTube"])  # misma forma: items[0].statistics
+    return {
+        "YouTube": {"viewers": yt.get("concurrentViewers"), "likes": yt.get("likeCount"), "comments": yt.get("liveCommentCount")},
+        "TikTok": get_tiktok_stats(live["TikTok"]),
+    }
+
+live_buffer = get_live_buffer(maxlen=LIVE_BUFFER_SIZE)
+live_buffer.append_many(live_sample(live))
+
+st.markdown("### Tiempo real")
+c_m, c_f = st.columns([3, 1])
+live_metric = c_m.radio("Métrica", METRICS, horizontal=True, key="live_metric")
+live_follow = c_f.toggle("Seguir en vivo", value=False, key="live_follow")
+
+def in_fragment_rerun() -> bool:
+    # True solo cuando Streamlit re-ejecuta únicamente un fragment (no el script completo)
+    ctx = get_script_run_ctx()
+    return bool(ctx and ctx.fragment_ids_this_run)
+
+@st.fragment(run_every=LIVE_REFRESH_S if live_follow else None)
+def realtime_chart(metric: str, follow: bool, yt_url: str, tt_url: str):
+    # La serie (reducida con LTTB) se dibuja una vez; después solo viajan los puntos nuevos
+    # con add_rows. El bucle corre solo en reruns del fragment: en un rerun completo bloquearía
+    # el resto de la página, y los ticks de run_every no interrumpen un fragment en curso
+    # (se encolan). Una interacción del usuario sí lo interrumpe en el próximo add_rows.
+    buf = get_live_buffer(maxlen=LIVE_BUFFER_SIZE)
+    base = downsample(buf.wide(metric).reindex(columns=PLATFORMS), LIVE_CHART_POINTS)
+    chart = st.line_chart(base, height=360)
+    st.caption(f"{len(buf)} muestras en la sesión · {len(base)} puntos dibujados")
+    if not (follow and in_fragment_rerun()):
+        return
+    seq, drawn = buf.seq, len(base)
+    while drawn <= 2 * LIVE_CHART_POINTS:
+        time.sleep(LIVE_REFRESH_S)
+        buf.append_many(live_sample(fetch_live(yt_url, tt_url)))
+        new = buf.wide(metric, buf.since(seq)).reindex(columns=PLATFORMS)
+        seq = buf.seq
+        chart.add_rows(new)
+        drawn += len(new)
+    # demasiados puntos en el navegador: se redibuja el fragment con la serie reducida
+    st.rerun(scope="fragment")
+
+realtime_chart(live_metric, live_follow, youtube_url, tt_url_effective)
+
+st.markdown("### Snapshot")
 df_live = pd.DataFrame({
     "platform": ["YouTube", "TikTok"],
     "viewers": [yt_viewers, tt_viewers]
@@ -114,18 +189,21 @@ with tab_tt:
         key="tt_raw_input_tab"
     )
 
-    tt_url_effective = (st.session_state["tt_raw_input"] or RAW_TT_URL).strip()
-
-    try:
-        tt_json = load_tiktok_json(tt_url_effective)
+    tab_tt_url = (st.session_state["tt_raw_input"] or RAW_TT_URL).strip()
+    if tab_tt_url != tt_url_effective:
+        # URL distinta a la del comparativo: una sola consulta más (también pasa por el caché)
+        tt_url_effective = tab_tt_url
+        tt_json = get_fetcher().get(tt_url_effective)
         tt_viewers = get_tiktok_viewers(tt_json)
+
+    if tt_json.get("error"):
+        st.error(f"No pude leer el JSON de TikTok: {tt_json['error']}")
+        st.caption(f"Intenté leer: {tt_url_effective}")
+    else:
         st.metric("👀 Viewers", tt_viewers)
         with st.expander("🔎 Debug del JSON"):
             st.json(tt_json)
         st.caption(f"Fuente: {tt_url_effective}")
         if st.session_state["tt_user_input"]:
             st.caption(f"Usuario: {st.session_state['tt_user_input']}")
-    except Exception as e:
-        st.error(f"No pude leer el JSON de TikTok: {e}")
-        st.caption(f"Intenté leer: {tt_url_effective}")
 
@@ -149,11 +149,15 @@ try:
     data = api_get("/overview", params={"from": start.isoformat(), "to": end.isoformat()})
     # Se espera un JSON con claves: posts_by_day, geo, share, views_by_platform, table
     if isinstance(data, dict) and all(k in data for k in ["posts_by_day", "geo", "share", "views_by_platform", "table"]):
-        posts_by_day = pd.DataFrame(data["posts_by_day"])  # [{date, posts}]
-        geo = pd.DataFrame(data["geo"])                    # [{country, iso3, views}]
-        share = pd.DataFrame(data["share"])                # [{platform, value}]
-        views_by_plat = pd.DataFrame(data["views_by_platform"]) # [{platform, views}]
-        table = pd.DataFrame(data["table"])                # [{platform, posts, interactions, views}]
+        if data.get("error"):
+            raise ValueError(data["error"])
+        if not data["table"]:
+            raise ValueError("no hay publicaciones en el rango elegido")
+        posts_by_day = pd.DataFrame(data["posts_by_day"], columns=["date", "posts"])
+        geo = pd.DataFrame(data["geo"], columns=["country", "iso3", "views"])
+        share = pd.DataFrame(data["share"], columns=["platform", "value"])
+        views_by_plat = pd.DataFrame(data["views_by_platform"], columns=["platform", "views"])
+        table = pd.DataFrame(data["table"], columns=["platform", "posts", "interactions", "views"])
     else:
         raise ValueError("/overview no devolvió el esquema esperado")
 except Exception as e:
@@ -171,8 +175,8 @@ if all(x is not None for x in [posts_by_day, views_by_plat, table]):
     total_views = int(views_by_plat["views"].sum())
     total_inter = int(table.get("interactions", pd.Series([0]*len(table))).sum())
     engagement = round((total_inter / total_views * 100.0) if total_views else 0.0, 2)
-    avg_posts_day = round(posts_by_day["posts"].mean(), 1)
-    best_plat = views_by_plat.sort_values("views", ascending=False).iloc[0]["platform"]
+    avg_posts_day = round(posts_by_day["posts"].mean(), 1) if len(posts_by_day) else 0.0
+    best_plat = views_by_plat.sort_values("views", ascending=False).iloc[0]["platform"] if len(views_by_plat) else "—"
     rango = f"{start:%d/%m}–{end:%d/%m}"
 
     k1, k2, k3, k4 = st.columns(4)
@@ -1,32 +1,26 @@
 # src/pages/1_Overview.py
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 from utils.charts import branded_bar   # << colores por plataforma
-from pathlib import Path
+from utils.posts import posts_bounds, posts_window
 from datetime import timedelta
 
 st.set_page_config(page_title="Overview", layout="wide")
 
-BASE_DIR = Path(__file__).resolve().parents[2]
-DATA_DIR = BASE_DIR / "data" / "sample"
-
 st.header("📌 Overview del rendimiento")
 st.caption("Resumen general con datos de muestra.")
 
-df = pd.read_csv(DATA_DIR / "sample_posts.csv", parse_dates=["date"])
-if df.empty:
+min_d, max_d = posts_bounds()
+if min_d is None:
     st.warning("No hay datos para mostrar.")
     st.stop()
 
 # Fechas con límites válidos
-min_d, max_d = df["date"].min().date(), df["date"].max().date()
 default_from = max(min_d, max_d - timedelta(days=30))
 date_from = st.sidebar.date_input("Desde", default_from, min_value=min_d, max_value=max_d)
 date_to   = st.sidebar.date_input("Hasta",   max_d,       min_value=min_d, max_value=max_d)
 
-mask = (df["date"].dt.date >= date_from) & (df["date"].dt.date <= date_to)
-df_now = df[mask]
+df_now = posts_window(date_from, date_to)  # solo lee el rango pedido
 
 # Métricas top
 c1, c2, c3, c4 = st.columns(4)
@@ -46,7 +40,7 @@ st.plotly_chart(
 
 # Barras por red con colores oficiales
 st.markdown("### Por red (período seleccionado)")
-by_plat = df_now.groupby("platform", as_index=False)[["posts","views","interactions"]].sum()
+by_plat = df_now.groupby("platform", as_index=False, observed=True)[["posts","views","interactions"]].sum()
 
 fig_bar = branded_bar(
     by_plat,
@@ -3,10 +3,10 @@ import os
 import datetime as dt
 import requests
 import streamlit as st
-from streamlit_autorefresh import st_autorefresh
 
 from utils.formatting import trend_card, inject_css
 from utils.charts import brand_color
+from services.live_stream import get_consumer
 
 API_URL = os.getenv("API_URL", "http://127.0.0.1:8001").rstrip("/")
 ACCENT = brand_color("TikTok") if callable(brand_color) else "#ff0050"
@@ -25,49 +25,56 @@ try:
 except Exception as e:
     c1.error(f"API sin respuesta: {e}")
 
-# Auto-refresh
-auto = st.toggle("Auto-actualizar cada 3s", value=True)
-if auto:
-    st_autorefresh(interval=3000, key="tt_live_auto")
+LIVE_REFRESH_S = float(os.getenv("LIVE_REFRESH_S", "1"))
 
-# Consulta
-try:
-    with st.spinner("Consultando métricas TikTok…"):
-        r = requests.get(f"{API_URL}/tiktok-stats", timeout=10)
-        data = r.json() if r.headers.get("content-type", "").startswith("application/json") else {}
-
-    if isinstance(data, dict) and data.get("error"):
-        st.error(data["error"])
-    else:
-        items = data.get("items", []) if isinstance(data, dict) else []
-        if not items:
-            st.info("Sin datos disponibles (¿el script Node está corriendo y escribiendo el JSON?).")
+# En modo push solo este fragment se re-ejecuta cada LIVE_REFRESH_S (lee el estado del stream SSE, sin HTTP);
+# el health check y el resto de la página corren únicamente en un rerun completo
+auto = st.toggle("Actualización en vivo (push)", value=True)
+
+
+@st.fragment(run_every=LIVE_REFRESH_S if auto else None)
+def live_kpis(auto: bool) -> None:
+    try:
+        s = {}
+        if auto:
+            consumer = get_consumer(f"{API_URL}/tiktok-stats/stream")
+            s = consumer.snapshot()
+            if consumer.error:
+                st.error(consumer.error)
         else:
-            info = items[0]
-            s = info.get("statistics", {}) or {}
-
-            username = s.get("username", "")
-            likes = int(s.get("likes", 0))
-            comments = int(s.get("comments", 0))
-            viewers = int(s.get("viewers", 0))
-            diamonds = int(s.get("diamonds", 0))
-            shares = int(s.get("shares", 0))
-            gifts_count = int(s.get("giftsCount", 0))
-
-            if username:
-                st.caption(f"Streamer: @{username}")
-
-            c1, c2, c3, c4, c5, c6 = st.columns(6)
-            trend_card(c1, "❤️ Likes", likes, accent=ACCENT)
-            trend_card(c2, "💬 Comentarios", comments, accent=ACCENT)
-            trend_card(c3, "👀 Viewers", viewers, accent=ACCENT)
-            trend_card(c4, "💎 Diamonds", diamonds, accent=ACCENT)
-            trend_card(c5, "🔁 Shares", shares, accent=ACCENT)
-            trend_card(c6, "🎁 Gifts", gifts_count, accent=ACCENT)
-
-            st.caption(f"Última actualización: {dt.datetime.now():%H:%M:%S}")
+            with st.spinner("Consultando métricas TikTok…"):
+                r = requests.get(f"{API_URL}/tiktok-stats", params={"fields": "statistics"}, timeout=10)
+                data = r.json() if r.headers.get("content-type", "").startswith("application/json") else {}
 
-except Exception as e:
-    st.error(f"No se pudo obtener datos: {e}")
+            if isinstance(data, dict) and data.get("error"):
+                st.error(data["error"])
+            else:
+                items = data.get("items", []) if isinstance(data, dict) else []
+                if items:
+                    s = items[0].get("statistics", {}) or {}
+
+        if not s:
+            st.info("Sin datos disponibles (¿el script Node está corriendo y escribiendo el JSON?).")
+            return
+
+        username = s.get("username", "")
+        if username:
+            st.caption(f"Streamer: @{username}")
+
+        c1, c2, c3, c4, c5, c6 = st.columns(6)
+        trend_card(c1, "❤️ Likes", int(s.get("likes", 0)), accent=ACCENT, css=False)
+        trend_card(c2, "💬 Comentarios", int(s.get("comments", 0)), accent=ACCENT, css=False)
+        trend_card(c3, "👀 Viewers", int(s.get("viewers", 0)), accent=ACCENT, css=False)
+        trend_card(c4, "💎 Diamonds", int(s.get("diamonds", 0)), accent=ACCENT, css=False)
+        trend_card(c5, "🔁 Shares", int(s.get("shares", 0)), accent=ACCENT, css=False)
+        trend_card(c6, "🎁 Gifts", int(s.get("giftsCount", 0)), accent=ACCENT, css=False)
+
+        st.caption(f"Última actualización: {dt.datetime.now():%H:%M:%S}")
+
+    except Exception as e:
+        st.error(f"No se pudo obtener datos: {e}")
+
+
+live_kpis(auto)
 
 st.caption("Asegúrate de ejecutar el capturador Node (tiktok_live.js) y que `TIKTOK_DATA_FILE` apunte al JSON generado.")
\ No newline at end of file
@@ -1,23 +1,21 @@
 import os
+import datetime as dt
 import requests
 import streamlit as st
-import pandas as pd
-from pathlib import Path
-from datetime import timedelta
-from streamlit_autorefresh import st_autorefresh
 
-from utils.charts import branded_line, brand_color
+from utils.charts import brand_color
 from utils.formatting import trend_card, inject_css
+from utils.platform_page import render_platform_page
+from services.live_stream import get_consumer
 
 # ---------- Config ----------
 st.set_page_config(page_title="▶️ YouTube", layout="wide")
-BASE_DIR = Path(__file__).resolve().parents[2]
-DATA_DIR = BASE_DIR / "data" / "sample"
 PLATFORM = "YouTube"
 ACCENT = brand_color(PLATFORM)
 inject_css(ACCENT)
 
 API_URL = os.getenv("API_URL", "http://127.0.0.1:8001").rstrip("/")
+LIVE_REFRESH_S = float(os.getenv("LIVE_REFRESH_S", "1"))
 
 st.header("▶️ YouTube Live — Análisis")
 
@@ -26,39 +24,8 @@ tab_hist, tab_live = st.tabs(["Histórico (muestra)", "Live (API)"])
 
 # ===================== TAB 1 — HISTÓRICO (MUESTRA) =====================
 with tab_hist:
-    st.caption("Datos de muestra — luego conectamos API oficial.")
-
-    # Carga de CSV de ejemplo (si existe)
-    df = pd.DataFrame()
-    sample_file = DATA_DIR / "sample_posts.csv"
-    if sample_file.exists():
-        df = pd.read_csv(sample_file, parse_dates=["date"])
-        df = df[df["platform"] == PLATFORM]
-
-    if df.empty:
-        st.info("Sin datos de YouTube (muestra).")
-    else:
-        min_d, max_d = df["date"].min().date(), df["date"].max().date()
-        default_from = max(min_d, max_d - timedelta(days=30))
-
-        st.sidebar.subheader("Filtros YouTube")
-        f = st.sidebar.date_input("Desde", default_from, min_value=min_d, max_value=max_d, key="yt_from")
-        t = st.sidebar.date_input("Hasta", max_d, min_value=min_d, max_value=max_d, key="yt_to")
-
-        df_now = df[(df["date"].dt.date >= f) & (df["date"].dt.date <= t)]
-
-        c1, c2, c3 = st.columns(3)
-        trend_card(c1, "Publicaciones", int(df_now["posts"].sum()), accent=ACCENT)
-        trend_card(c2, "Vistas", int(df_now["views"].sum()), accent=ACCENT)
-        trend_card(c3, "Interacciones", int(df_now["interactions"].sum()), accent=ACCENT)
-
-        st.markdown("### Vistas por día")
-        ts = df_now.groupby("date", as_index=False)["views"].sum()
-        fig = branded_line(ts, "date", "views", "Vistas por día", single_platform=PLATFORM)
-        st.plotly_chart(fig, use_container_width=True)
-
-        st.subheader("Detalle")
-        st.dataframe(df_now.sort_values("date", ascending=False), use_container_width=True)
+    # Misma página genérica que Facebook/Instagram/X, sobre el cubo compartido
+    render_platform_page(PLATFORM, key_prefix="yt", stop_if_empty=False)
 
 # ===================== TAB 2 — LIVE (API) =====================
 with tab_live:
@@ -84,7 +51,7 @@ with tab_live:
 
     colA, colB, _ = st.columns([1, 1, 6])
     btn = colA.button("Consultar", type="primary")
-    auto = colB.toggle("Auto-actualizar cada 3s", value=True)
+    auto = colB.toggle("Actualización en vivo (push)", value=True)
 
     # Estado para recordar el último video consultado
     if "yt_q" not in st.session_state:
@@ -96,41 +63,53 @@ with tab_live:
 
     query = st.session_state.get("yt_q", "")
 
-    if auto and query:
-        st_autorefresh(interval=3000, key="yt_live_auto")
-
-    # --- Consulta de métricas (solo contadores) ---
-    if query:
-        try:
-            with st.spinner("Obteniendo métricas del live…"):
-                resp = requests.get(f"{API_URL}/live-data", params={"video": query}, timeout=15)
-                data = resp.json()
-
-            if isinstance(data, dict) and data.get("error"):
-                st.error(data["error"])
-                st.stop()
-            if isinstance(data, dict) and data.get("warning"):
-                st.warning(data["warning"])
-
-            items = data.get("items", []) if isinstance(data, dict) else []
-            if not items:
-                st.info("No se recibieron datos del live (¿está realmente en vivo?).")
-            else:
+    # Solo el bloque de KPIs se re-ejecuta cada LIVE_REFRESH_S (lee el estado del stream SSE, sin HTTP);
+    # health check, histórico y estilos quedan fuera del fragment
+    @st.fragment(run_every=LIVE_REFRESH_S if (auto and query) else None)
+    def live_kpis(query: str, auto: bool) -> None:
+        if query and auto:
+            consumer = get_consumer(f"{API_URL}/live-data/stream", {"video": query})
+            live = consumer.snapshot()
+            if consumer.error:
+                st.warning(consumer.error)
+            if not live:
+                st.info("Conectando al stream del live…")
+                return
+            c1, c2, c3, c4 = st.columns(4)
+            trend_card(c1, "👀 Vistas", int(live.get("views", 0)), accent=ACCENT, css=False)
+            trend_card(c2, "👍 Le gusta", int(live.get("likes", 0)), accent=ACCENT, css=False)
+            trend_card(c3, "🟢 Concurrentes", int(live.get("viewers", 0)), accent=ACCENT, css=False)
+            trend_card(c4, "💬 Comentarios (live)", int(live.get("comments", 0)), accent=ACCENT, css=False)
+            if consumer.last_event_at:
+                st.caption(f"Último cambio recibido: {dt.datetime.fromtimestamp(consumer.last_event_at):%H:%M:%S}")
+        elif query:
+            try:
+                with st.spinner("Obteniendo métricas del live…"):
+                    resp = requests.get(f"{API_URL}/live-data", params={"video": query, "fields": "statistics"}, timeout=15)
+                    data = resp.json()
+
+                if isinstance(data, dict) and data.get("error"):
+                    st.error(data["error"])
+                    return
+                if isinstance(data, dict) and data.get("warning"):
+                    st.warning(data["warning"])
+
+                items = data.get("items", []) if isinstance(data, dict) else []
+                if not items:
+                    st.info("No se recibieron datos del live (¿está realmente en vivo?).")
+                    return
                 stats = (items[0].get("statistics", {}) if items else {}) or {}
 
-                vistas  = int(stats.get("viewCount", 0))
-                likes   = int(stats.get("likeCount", 0))
-                conc    = int(stats.get("concurrentViewers", 0))
-                coment  = int(stats.get("liveCommentCount", 0))
-
                 c1, c2, c3, c4 = st.columns(4)
-                trend_card(c1, "👀 Vistas", vistas, accent=ACCENT)
-                trend_card(c2, "👍 Le gusta", likes, accent=ACCENT)
-                trend_card(c3, "🟢 Concurrentes", conc, accent=ACCENT)
-                trend_card(c4, "💬 Comentarios (live)", coment, accent=ACCENT)
+                trend_card(c1, "👀 Vistas", int(stats.get("viewCount", 0)), accent=ACCENT, css=False)
+                trend_card(c2, "👍 Le gusta", int(stats.get("likeCount", 0)), accent=ACCENT, css=False)
+                trend_card(c3, "🟢 Concurrentes", int(stats.get("concurrentViewers", 0)), accent=ACCENT, css=False)
+                trend_card(c4, "💬 Comentarios (live)", int(stats.get("liveCommentCount", 0)), accent=ACCENT, css=False)
+
+                st.caption(f"Última actualización: {dt.datetime.now():%H:%M:%S}")
+            except Exception as e:
+                st.error(f"No se pudo obtener datos: {e}")
 
-                st.caption("Última actualización: ")
-        except Exception as e:
-            st.error(f"No se pudo obtener datos: {e}")
+    live_kpis(query, auto)
 
-    st.caption("Si activas el auto-refresh, se volverá a consultar cada 3 segundos mientras haya un video seleccionado.")
+    st.caption("Con la actualización en vivo activada, la API empuja los cambios (SSE) mientras haya un video seleccionado.")
@@ -0,0 +1,119 @@
+# src/services/live_fetch.py — Consultas en paralelo (thread pool) de las fuentes en vivo
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+
+Key = Tuple[str, Tuple[Tuple[str, Any], ...]]
+Request = Tuple[str, Optional[Dict[str, Any]]]  # (url, params)
+
+
+def _key(url: str, params: Optional[Dict[str, Any]]) -> Key:
+    return url, tuple(sorted((params or {}).items()))
+
+
+class LiveFetcher:
+    """Pide varias URLs a la vez y guarda cada respuesta ``ttl`` segundos.
+
+    - ``fetch_many`` lanza todas las fuentes en paralelo: la latencia total es
+      la de la más lenta, no la suma.
+    - Las peticiones idénticas (misma URL y params) se hacen una sola vez, ya sea
+      dentro de un mismo rerun o entre sesiones que consultan al mismo tiempo.
+    - Las respuestas son dicts; un fallo se devuelve como ``{"error": ...}``.
+    - La caché es acotada: al guardar se descartan las entradas vencidas y, si
+      aun así pasa de ``max_entries``, las menos usadas.
+    """
+
+    def __init__(self, max_workers: int = 8, ttl: float = 2.0, timeout: float = 10.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="live-fetch")
+        self._cache: "OrderedDict[Key, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[Key, Future] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hits = 0
+
+    def _get(self, url: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        try:
+            r = requests.get(url, params=params, timeout=self.timeout)
+            r.raise_for_status()
+            data = r.json()
+            return data if isinstance(data, dict) else {"data": data}
+        except Exception as e:
+            return {"error": f"{e.__class__.__name__}: {e}"}
+
+    def _load(self, key: Key, url: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        try:
+            data = self._get(url, params)
+            if "error" not in data:
+                with self._lock:
+                    self._store(key, data)
+            return data
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _store(self, key: Key, data: Dict[str, Any]) -> None:
+        # llamado con ``_lock`` tomado
+        now = time.monotonic()
+        for k in [k for k, (expires, _) in self._cache.items() if expires <= now]:
+            del self._cache[k]
+        self._cache[key] = (now + self.ttl, data)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def submit(self, url: str, params: Optional[Dict[str, Any]] = None) -> "Future[Dict[str, Any]]":
+        key = _key(url, params)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > now:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                f: Future = Future()
+                f.set_result(cached[1])
+                return f
+            fut = self._inflight.get(key)
+            if fut is None:
+                self.requests += 1
+                fut = self._inflight[key] = self._pool.submit(self._load, key, url, params)
+            return fut
+
+    def fetch_many(self, sources: Dict[str, Request]) -> Dict[str, Dict[str, Any]]:
+        """``{nombre: (url, params)}`` -> ``{nombre: respuesta}``, todas en paralelo."""
+        futures = {name: self.submit(url, params) for name, (url, params) in sources.items()}
+        deadline = time.monotonic() + self.timeout + 1
+        out: Dict[str, Dict[str, Any]] = {}
+        for name, fut in futures.items():
+            try:
+                out[name] = fut.result(timeout=max(0.0, deadline - time.monotonic()))
+            except Exception as e:
+                out[name] = {"error": f"{e.__class__.__name__}: {e}"}
+        return out
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return self.fetch_many({"_": (url, params)})["_"]
+
+
+_fetcher: Optional[LiveFetcher] = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher() -> LiveFetcher:
+    """Un ``LiveFetcher`` compartido por todas las sesiones del proceso."""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = LiveFetcher(
+                max_workers=int(os.getenv("LIVE_FETCH_WORKERS", "8")),
+                ttl=float(os.getenv("LIVE_FETCH_TTL", "2")),
+                max_entries=int(os.getenv("LIVE_FETCH_CACHE_SIZE", "256")),
+            )
+        return _fetcher
@@ -0,0 +1,98 @@
+# src/services/live_stream.py — Consumidor SSE de la API local (push en vez de polling)
+import json
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+
+
+class LiveStreamConsumer:
+    """Mantiene una conexión SSE abierta en un hilo y aplica los deltas a ``state``.
+
+    La página de Streamlit solo lee ``state`` (memoria), así que un rerun no
+    hace ninguna petición HTTP. Se reconecta solo y se apaga si nadie lo lee
+    durante ``idle_timeout`` segundos.
+    """
+
+    def __init__(self, url: str, params: Optional[Dict[str, Any]] = None, idle_timeout: float = 60.0, reconnect_delay: float = 2.0):
+        self.url = url
+        self.params = dict(params or {})
+        self.idle_timeout = idle_timeout
+        self.reconnect_delay = reconnect_delay
+        self.state: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self.connected = False
+        self.last_event_at: Optional[float] = None
+        self.last_read = time.monotonic()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sse-consumer", daemon=True)
+        self._thread.start()
+
+    def snapshot(self) -> Dict[str, Any]:
+        self.last_read = time.monotonic()
+        return dict(self.state)
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _idle(self) -> bool:
+        return time.monotonic() - self.last_read > self.idle_timeout
+
+    def _apply(self, event: str, data: str) -> None:
+        try:
+            payload = json.loads(data)
+        except Exception:
+            return
+        self.last_event_at = time.time()
+        if event == "snapshot":
+            self.state = payload
+            self.error = None
+        elif event == "delta":
+            self.state = {**self.state, **payload}
+            self.error = None
+        elif event == "error":
+            self.error = payload.get("error")
+
+    def _run(self) -> None:
+        while not self._stop.is_set() and not self._idle():
+            try:
+                with requests.get(self.url, params=self.params, stream=True, timeout=(5, 30)) as r:
+                    r.raise_for_status()
+                    self.connected = True
+                    event, data = "message", []
+                    for line in r.iter_lines(decode_unicode=True):
+                        if self._stop.is_set() or self._idle():
+                            return
+                        if line is None:
+                            continue
+                        if line == "":
+                            if data:
+                                self._apply(event, "\n".join(data))
+                            event, data = "message", []
+                        elif line.startswith("event:"):
+                            event = line[6:].strip()
+                        elif line.startswith("data:"):
+                            data.append(line[5:].strip())
+            except Exception as e:
+                self.error = f"Stream desconectado: {e}"
+            finally:
+                self.connected = False
+            self._stop.wait(self.reconnect_delay)
+
+
+_consumers: Dict[Tuple[str, Tuple[Tuple[str, Any], ...]], LiveStreamConsumer] = {}
+_lock = threading.Lock()
+
+
+def get_consumer(url: str, params: Optional[Dict[str, Any]] = None) -> LiveStreamConsumer:
+    """Un consumidor compartido por (url, params) para todas las sesiones del proceso."""
+    key = (url, tuple(sorted((params or {}).items())))
+    with _lock:
+        c = _consumers.get(key)
+        if c is None or not c.is_alive():
+            c = _consumers[key] = LiveStreamConsumer(url, params)
+        return c
@@ -0,0 +1,100 @@
+# src/utils/cube.py — Cubo pre-agregado plataforma × día × métrica del histórico de posts
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.posts import all_posts, data_version
+
+METRICS = ["posts", "views", "interactions"]
+
+
+@dataclass
+class PostsCube:
+    """``values[p, d, m]``: suma de la métrica ``m`` de la red ``p`` el día ``d``.
+
+    Los días son un rango continuo; ``present`` marca los que tienen filas (las
+    series solo muestran esos, como el ``groupby('date')`` anterior). ``cum``
+    son sumas prefijas por día: el total de cualquier rango sale en O(1).
+    """
+
+    platforms: List[str]
+    days: np.ndarray  # datetime64[D], continuo
+    metrics: List[str]
+    values: np.ndarray  # (P, D, M)
+    present: np.ndarray  # (P, D) bool
+    cum: np.ndarray  # (P, D + 1, M)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, metrics: List[str] = METRICS) -> "PostsCube":
+        metrics = [m for m in metrics if m in df.columns]
+        if df.empty:
+            empty = np.zeros((0, 0, len(metrics)))
+            return cls([], np.array([], dtype="datetime64[D]"), metrics, empty, np.zeros((0, 0), bool), np.zeros((0, 1, len(metrics))))
+        day = df["date"].to_numpy().astype("datetime64[D]")
+        platforms = sorted(str(p) for p in pd.unique(df["platform"]))
+        days = np.arange(day.min(), day.max() + np.timedelta64(1, "D"), dtype="datetime64[D]")
+
+        p_idx = pd.Categorical(df["platform"].astype(str), categories=platforms).codes
+        d_idx = (day - days[0]).astype(np.int64)
+        values = np.zeros((len(platforms), len(days), len(metrics)))
+        for m, name in enumerate(metrics):
+            np.add.at(values[:, :, m], (p_idx, d_idx), df[name].to_numpy(dtype=float))
+        present = np.zeros((len(platforms), len(days)), dtype=bool)
+        present[p_idx, d_idx] = True
+        cum = np.concatenate([np.zeros((len(platforms), 1, len(metrics))), values.cumsum(axis=1)], axis=1)
+        return cls(platforms, days, metrics, values, present, cum)
+
+    def _p(self, platform: str) -> Optional[int]:
+        try:
+            return self.platforms.index(platform)
+        except ValueError:
+            return None
+
+    def _days(self, date_from: date, date_to: date) -> Tuple[int, int]:
+        # rango invertido (desde > hasta): se intercambia, igual que /overview en local_api
+        if date_from > date_to:
+            date_from, date_to = date_to, date_from
+        lo = int(np.searchsorted(self.days, np.datetime64(date_from, "D"), side="left"))
+        hi = int(np.searchsorted(self.days, np.datetime64(date_to, "D"), side="right"))
+        return lo, max(lo, hi)
+
+    def bounds(self, platform: str) -> Tuple[Optional[date], Optional[date]]:
+        p = self._p(platform)
+        if p is None or not self.present[p].any():
+            return None, None
+        idx = np.flatnonzero(self.present[p])
+        return self.days[idx[0]].item(), self.days[idx[-1]].item()
+
+    def totals(self, platform: str, date_from: date, date_to: date) -> Dict[str, float]:
+        p = self._p(platform)
+        if p is None:
+            return {m: 0.0 for m in self.metrics}
+        lo, hi = self._days(date_from, date_to)
+        row = self.cum[p, hi] - self.cum[p, lo]
+        return dict(zip(self.metrics, row.tolist()))
+
+    def series(self, platform: str, metric: str, date_from: date, date_to: date) -> pd.DataFrame:
+        """``date``/``metric`` de los días con datos del rango (rebanada del cubo, sin groupby)."""
+        p = self._p(platform)
+        if p is None:
+            return pd.DataFrame({"date": pd.Series(dtype="datetime64[ns]"), metric: pd.Series(dtype=float)})
+        lo, hi = self._days(date_from, date_to)
+        mask = self.present[p, lo:hi]
+        return pd.DataFrame({
+            "date": self.days[lo:hi][mask].astype("datetime64[ns]"),
+            metric: self.values[p, lo:hi, self.metrics.index(metric)][mask],
+        })
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _build(version: Tuple) -> PostsCube:
+    # ``version`` cambia con el CSV o el manifiesto del almacén: un cubo por versión de datos
+    return PostsCube.from_frame(all_posts())
+
+
+def load_cube() -> PostsCube:
+    return _build(data_version())
@@ -7,6 +7,8 @@ def inject_css(accent: str = DEFAULT_ACCENT):
     .metric-card .value{{font-size:1.9rem;font-weight:800;color:#e5e7eb;}}
     .metric-card .help{{font-size:.8rem;color:#9ca3af;}}
     </style>""", unsafe_allow_html=True)
-def trend_card(container,label,value,delta_pct=None,help_text=None,accent: str = DEFAULT_ACCENT):
-    inject_css(accent); color=accent if (delta_pct or 0)>=0 else '#ef4444'; arrow='▲' if (delta_pct or 0)>=0 else '▼'; delta_txt='—' if delta_pct is None else f"{arrow} {abs(delta_pct)*100:.1f}%"
+def trend_card(container,label,value,delta_pct=None,help_text=None,accent: str = DEFAULT_ACCENT, css: bool = True):
+    # css=False cuando la página ya llamó a inject_css (p.ej. tarjetas dentro de un fragment que se refresca)
+    if css: inject_css(accent)
+    color=accent if (delta_pct or 0)>=0 else '#ef4444'; arrow='▲' if (delta_pct or 0)>=0 else '▼'; delta_txt='—' if delta_pct is None else f"{arrow} {abs(delta_pct)*100:.1f}%"
     with container: st.markdown(f"<div class='metric-card' style='border-color:{color}55'><h3>{label}</h3><div class='value'>{value}</div><div class='help' style='color:{color}'>{delta_txt}</div><div class='help'>{help_text or ''}</div></div>", unsafe_allow_html=True)
@@ -0,0 +1,94 @@
+# src/utils/live_buffer.py — Buffer circular por sesión de muestras en vivo + downsampling LTTB
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+METRICS = ("viewers", "likes", "comments")
+
+Sample = Tuple[float, str, int, int, int]  # (ts, platform, viewers, likes, comments)
+
+
+class LiveBuffer:
+    """Últimas ``maxlen`` muestras (ts, platform, viewers, likes, comments) de la sesión.
+
+    Cada muestra lleva un número de secuencia, así un gráfico puede pedir solo
+    lo nuevo (``since``) en lugar de volver a mandar toda la serie.
+    """
+
+    def __init__(self, maxlen: int = 3600):
+        self.maxlen = maxlen
+        self._samples: Deque[Sample] = deque(maxlen=maxlen)
+        self.seq = 0  # total de muestras agregadas (no se reinicia al rotar)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def append(self, platform: str, values: Dict[str, Any], ts: Optional[float] = None) -> None:
+        ts = time.time() if ts is None else ts
+        self._samples.append((ts, platform, *(int(values.get(m, 0) or 0) for m in METRICS)))
+        self.seq += 1
+
+    def append_many(self, by_platform: Dict[str, Dict[str, Any]], ts: Optional[float] = None) -> None:
+        ts = time.time() if ts is None else ts
+        for platform, values in by_platform.items():
+            self.append(platform, values, ts)
+
+    def since(self, seq: int) -> List[Sample]:
+        """Muestras agregadas después de la secuencia ``seq`` (las que ya rotaron se pierden)."""
+        n = min(len(self._samples), max(0, self.seq - seq))
+        return list(self._samples)[len(self._samples) - n:] if n else []
+
+    def wide(self, metric: str = "viewers", samples: Optional[List[Sample]] = None) -> pd.DataFrame:
+        """Una columna por red, índice = instante de la muestra."""
+        rows = list(self._samples) if samples is None else samples
+        if not rows:
+            return pd.DataFrame()
+        df = pd.DataFrame(rows, columns=["ts", "platform", *METRICS])
+        out = df.pivot_table(index="ts", columns="platform", values=metric, aggfunc="last")
+        out.index = pd.to_datetime(out.index, unit="s")
+        out.columns.name = None
+        return out
+
+
+def get_live_buffer(key: str = "live_buffer", maxlen: int = 3600) -> LiveBuffer:
+    buf = st.session_state.get(key)
+    if buf is None or buf.maxlen != maxlen:
+        buf = st.session_state[key] = LiveBuffer(maxlen)
+    return buf
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: índices de ``threshold`` puntos que conservan la forma."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = x.astype(float)
+    y = y.astype(float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)  # n-2 puntos internos en threshold-2 buckets
+    out = np.empty(threshold, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # promedio del bucket siguiente (o el último punto)
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def downsample(df: pd.DataFrame, max_points: int) -> pd.DataFrame:
+    """Reduce un frame ancho a ~``max_points`` filas por serie con LTTB (unión de índices de cada columna)."""
+    if len(df) <= max_points:
+        return df
+    x = df.index.asi8 if isinstance(df.index, pd.DatetimeIndex) else np.arange(len(df))
+    keep = set()
+    for col in df.columns:
+        keep.update(lttb_indices(x, df[col].ffill().fillna(0).to_numpy(), max_points).tolist())
+    return df.iloc[sorted(keep)]
@@ -0,0 +1,59 @@
+# src/utils/platform_page.py — Página genérica de una red (KPIs, vistas por día y detalle)
+from datetime import timedelta
+from typing import Optional
+
+import streamlit as st
+
+from utils.charts import branded_line, brand_color
+from utils.cube import load_cube
+from utils.formatting import trend_card, inject_css
+from utils.posts import posts_window
+
+
+def render_platform_page(
+    platform: str,
+    title: Optional[str] = None,
+    caption: str = "Datos de muestra — luego conectamos API oficial.",
+    key_prefix: str = "",
+    stop_if_empty: bool = True,
+) -> None:
+    """Dibuja la página histórica de ``platform`` a partir del cubo compartido.
+
+    KPIs y serie diaria salen de rebanadas del cubo (sin groupby por rerun);
+    solo la tabla de detalle lee filas, y únicamente las del rango elegido.
+    """
+    cube = load_cube()
+    min_d, max_d = cube.bounds(platform)
+    if min_d is None:
+        st.info(f"Sin datos de {platform}.")
+        if stop_if_empty:
+            st.stop()
+        return
+
+    default_from = max(min_d, max_d - timedelta(days=30))
+    key = key_prefix or platform.lower()
+    st.sidebar.subheader(f"Filtros {platform}")
+    f = st.sidebar.date_input("Desde", default_from, min_value=min_d, max_value=max_d, key=f"{key}_from")
+    t = st.sidebar.date_input("Hasta", max_d, min_value=min_d, max_value=max_d, key=f"{key}_to")
+    if f > t:
+        f, t = t, f  # mismo criterio que el cubo y /overview: el rango se intercambia
+
+    accent = brand_color(platform)
+    inject_css(accent)
+    if title:
+        st.header(title)
+    if caption:
+        st.caption(caption)
+
+    totals = cube.totals(platform, f, t)
+    c1, c2, c3 = st.columns(3)
+    trend_card(c1, "Publicaciones", int(totals["posts"]), accent=accent, css=False)
+    trend_card(c2, "Vistas", int(totals["views"]), accent=accent, css=False)
+    trend_card(c3, "Interacciones", int(totals["interactions"]), accent=accent, css=False)
+
+    st.markdown("### Vistas por día")
+    ts = cube.series(platform, "views", f, t)
+    st.plotly_chart(branded_line(ts, "date", "views", "Vistas por día", single_platform=platform), use_container_width=True)
+
+    st.subheader("Detalle")
+    st.dataframe(posts_window(f, t, platform).sort_values("date", ascending=False), use_container_width=True)
@@ -0,0 +1,155 @@
+# src/utils/post_store.py — Histórico de posts en Parquet particionado por red y mes
+#
+# Ingesta (desde la carpeta src/):
+#   python -m utils.post_store ingest ../data/sample/sample_posts.csv [otro.csv ...]
+#   python -m utils.post_store info
+#
+# Estructura:  data/store/posts/platform=<Red>/month=<AAAA-MM>/part.parquet  +  manifest.json
+# El manifiesto guarda filas y rango de fechas por partición: una consulta de 30
+# días abre solo las particiones que se solapan y filtra filas con pushdown.
+import argparse
+import json
+import os
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+try:  # opcional: sin pyarrow las páginas siguen leyendo el CSV
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = pq = None
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+STORE_DIR = Path(os.getenv("POSTS_STORE_DIR", BASE_DIR / "data" / "store" / "posts"))
+MANIFEST = "manifest.json"
+KEY_COLUMNS = ["date", "platform"]
+
+
+def available(store_dir: Path = STORE_DIR) -> bool:
+    return pq is not None and (store_dir / MANIFEST).exists()
+
+
+def read_manifest(store_dir: Path = STORE_DIR) -> Dict[str, Any]:
+    path = store_dir / MANIFEST
+    if not path.exists():
+        return {"partitions": {}}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _write_manifest(store_dir: Path, manifest: Dict[str, Any]) -> None:
+    manifest["updated"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    tmp = store_dir / (MANIFEST + ".tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True), encoding="utf-8")
+    tmp.replace(store_dir / MANIFEST)
+
+
+def _partition_dir(store_dir: Path, platform: str, month: str) -> Path:
+    return store_dir / f"platform={platform}" / f"month={month}"
+
+
+# ---------- Ingesta ----------
+def ingest(csv_paths: Iterable[Path], store_dir: Path = STORE_DIR) -> Dict[str, int]:
+    """Agrega CSVs exportados al almacén; las filas repetidas (date, platform) se reemplazan."""
+    if pq is None:
+        raise RuntimeError("Falta pyarrow: pip install pyarrow")
+    frames = [pd.read_csv(p, parse_dates=["date"]) for p in csv_paths]
+    new = pd.concat(frames, ignore_index=True).dropna(subset=["date", "platform"])
+    new["month"] = new["date"].dt.strftime("%Y-%m")
+
+    store_dir.mkdir(parents=True, exist_ok=True)
+    manifest = read_manifest(store_dir)
+    written: Dict[str, int] = {}
+    for (platform, month), part in new.groupby(["platform", "month"], sort=True):
+        pdir = _partition_dir(store_dir, platform, month)
+        pdir.mkdir(parents=True, exist_ok=True)
+        target = pdir / "part.parquet"
+        part = part.drop(columns=["month", "platform"])
+        if target.exists():
+            part = pd.concat([pd.read_parquet(target), part], ignore_index=True)
+        part = part.drop_duplicates(subset=["date"], keep="last").sort_values("date").reset_index(drop=True)
+
+        tmp = pdir / "part.parquet.tmp"
+        pq.write_table(pa.Table.from_pandas(part, preserve_index=False), tmp)
+        tmp.replace(target)
+
+        key = f"{platform}/{month}"
+        manifest["partitions"][key] = {
+            "platform": platform,
+            "month": month,
+            "path": str(target.relative_to(store_dir)),
+            "rows": int(len(part)),
+            "minDate": part["date"].min().date().isoformat(),
+            "maxDate": part["date"].max().date().isoformat(),
+        }
+        written[key] = int(len(part))
+    _write_manifest(store_dir, manifest)
+    return written
+
+
+# ---------- Lectura ----------
+def bounds(platform: Optional[str] = None, store_dir: Path = STORE_DIR) -> Tuple[Optional[date], Optional[date]]:
+    parts = [p for p in read_manifest(store_dir)["partitions"].values() if platform is None or p["platform"] == platform]
+    if not parts:
+        return None, None
+    return date.fromisoformat(min(p["minDate"] for p in parts)), date.fromisoformat(max(p["maxDate"] for p in parts))
+
+
+def prune(date_from: date, date_to: date, platform: Optional[str] = None, store_dir: Path = STORE_DIR) -> List[Dict[str, Any]]:
+    """Particiones (según el manifiesto) que pueden tener filas en el rango."""
+    lo, hi = date_from.isoformat(), date_to.isoformat()
+    return [
+        p for p in read_manifest(store_dir)["partitions"].values()
+        if (platform is None or p["platform"] == platform) and p["maxDate"] >= lo and p["minDate"] <= hi
+    ]
+
+
+def _empty_frame(store_dir: Path) -> pd.DataFrame:
+    # mismas columnas que una lectura con datos, para que las páginas puedan sumar sin chequear
+    parts = list(read_manifest(store_dir)["partitions"].values())
+    if not parts:
+        return pd.DataFrame(columns=KEY_COLUMNS)
+    df = pq.read_schema(store_dir / parts[0]["path"]).empty_table().to_pandas()
+    df.insert(1, "platform", pd.Series(dtype="category"))
+    return df
+
+
+def read_window(date_from: date, date_to: date, platform: Optional[str] = None, store_dir: Path = STORE_DIR) -> pd.DataFrame:
+    """Filas entre ``date_from`` y ``date_to`` leyendo solo las particiones necesarias."""
+    filters = [("date", ">=", pd.Timestamp(date_from)), ("date", "<", pd.Timestamp(date_to) + pd.Timedelta(days=1))]
+    frames = []
+    for p in sorted(prune(date_from, date_to, platform, store_dir), key=lambda p: (p["platform"], p["month"])):
+        df = pq.read_table(store_dir / p["path"], filters=filters).to_pandas()
+        if not df.empty:
+            df.insert(1, "platform", p["platform"])
+            frames.append(df)
+    if not frames:
+        return _empty_frame(store_dir)
+    out = pd.concat(frames, ignore_index=True)
+    out["platform"] = out["platform"].astype("category")
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Almacén Parquet del histórico de posts")
+    ap.add_argument("--store", default=str(STORE_DIR))
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    ing = sub.add_parser("ingest", help="convierte CSVs exportados (date,platform,...) al almacén")
+    ing.add_argument("csv", nargs="+")
+    sub.add_parser("info", help="muestra el manifiesto")
+    args = ap.parse_args()
+
+    store_dir = Path(args.store)
+    if args.cmd == "ingest":
+        for key, rows in ingest([Path(c) for c in args.csv], store_dir).items():
+            print(f"{key}: {rows} filas")
+    else:
+        for key, p in sorted(read_manifest(store_dir)["partitions"].items()):
+            print(f"{key}: {p['rows']} filas  {p['minDate']} → {p['maxDate']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# src/utils/posts.py — Carga compartida (y cacheada) de sample_posts.csv para todas las páginas
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import post_store
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+POSTS_CSV = BASE_DIR / "data" / "sample" / "sample_posts.csv"
+
+
+@dataclass
+class PostsData:
+    """Dataset de posts ordenado por (platform, date) con ``platform`` categórica.
+
+    Cada red ocupa un rango contiguo de filas, así ``platform()`` y ``window()``
+    devuelven rebanadas posicionales (``iloc``) sin copiar ni volver a filtrar
+    con máscaras; las fechas se ubican con ``searchsorted``.
+    """
+
+    df: pd.DataFrame
+    ranges: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "PostsData":
+        df = df.dropna(subset=["date"]).copy()
+        df["platform"] = df["platform"].astype("category")
+        df = df.sort_values(["platform", "date"], kind="stable").reset_index(drop=True)
+        codes = df["platform"].cat.codes.to_numpy()
+        ranges: Dict[str, Tuple[int, int]] = {}
+        for code, name in enumerate(df["platform"].cat.categories):
+            lo, hi = np.searchsorted(codes, [code, code + 1])
+            if hi > lo:
+                ranges[str(name)] = (int(lo), int(hi))
+        return cls(df=df, ranges=ranges)
+
+    @property
+    def empty(self) -> bool:
+        return self.df.empty
+
+    def platform(self, name: Optional[str] = None) -> pd.DataFrame:
+        """Filas de una red (vista, sin copia); ``None`` devuelve todas."""
+        if name is None:
+            return self.df
+        lo, hi = self.ranges.get(name, (0, 0))
+        return self.df.iloc[lo:hi]
+
+    def date_bounds(self, name: Optional[str] = None) -> Tuple[Optional[date], Optional[date]]:
+        part = self.platform(name)
+        if part.empty:
+            return None, None
+        if name is None:
+            return part["date"].min().date(), part["date"].max().date()
+        return part["date"].iloc[0].date(), part["date"].iloc[-1].date()
+
+    def window(self, date_from: date, date_to: date, name: Optional[str] = None) -> pd.DataFrame:
+        """Filas entre ``date_from`` y ``date_to`` (inclusive) de una red o de todas."""
+        if name is not None:
+            return self._slice(self.platform(name), date_from, date_to)
+        parts = [self._slice(self.platform(n), date_from, date_to) for n in self.ranges]
+        parts = [p for p in parts if not p.empty]
+        if not parts:
+            return self.df.iloc[0:0]
+        return parts[0] if len(parts) == 1 else pd.concat(parts)
+
+    @staticmethod
+    def _slice(part: pd.DataFrame, date_from: date, date_to: date) -> pd.DataFrame:
+        dates = part["date"].to_numpy()
+        lo = np.searchsorted(dates, np.datetime64(pd.Timestamp(date_from)), side="left")
+        hi = np.searchsorted(dates, np.datetime64(pd.Timestamp(date_to) + pd.Timedelta(days=1)), side="left")
+        return part.iloc[lo:hi]
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _load(path: str, signature: Tuple[int, int]) -> PostsData:
+    # ``signature`` (mtime, tamaño) forma parte de la clave: si el archivo cambia se vuelve a leer
+    return PostsData.from_frame(pd.read_csv(path, parse_dates=["date"]))
+
+
+def load_posts(path: Path = POSTS_CSV) -> PostsData:
+    """Dataset compartido entre páginas y sesiones; el CSV se parsea una vez por versión."""
+    if not path.exists():
+        return PostsData.from_frame(pd.DataFrame({"date": pd.Series(dtype="datetime64[ns]"), "platform": pd.Series(dtype=str)}))
+    st_ = path.stat()
+    return _load(str(path), (st_.st_mtime_ns, st_.st_size))
+
+
+# ---------- Acceso por rango (almacén Parquet si existe, si no el CSV) ----------
+def _manifest_signature() -> Optional[Tuple[int, int]]:
+    if not post_store.available():
+        return None
+    st_ = (post_store.STORE_DIR / post_store.MANIFEST).stat()
+    return st_.st_mtime_ns, st_.st_size
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _store_window(date_from: date, date_to: date, platform: Optional[str], signature: Tuple[int, int]) -> pd.DataFrame:
+    return post_store.read_window(date_from, date_to, platform)
+
+
+def posts_bounds(platform: Optional[str] = None) -> Tuple[Optional[date], Optional[date]]:
+    """Primera y última fecha con datos (del manifiesto, sin leer filas)."""
+    if _manifest_signature() is not None:
+        return post_store.bounds(platform)
+    return load_posts().date_bounds(platform)
+
+
+def posts_window(date_from: date, date_to: date, platform: Optional[str] = None) -> pd.DataFrame:
+    """Filas del rango con el filtro de fechas empujado hasta la lectura."""
+    signature = _manifest_signature()
+    if signature is not None:
+        return _store_window(date_from, date_to, platform, signature)
+    return load_posts().window(date_from, date_to, platform)
+
+
+def data_version() -> Tuple:
+    """Identifica la versión actual de los datos (almacén o CSV) para claves de caché."""
+    signature = _manifest_signature()
+    if signature is not None:
+        return ("store", signature)
+    if POSTS_CSV.exists():
+        st_ = POSTS_CSV.stat()
+        return ("csv", (st_.st_mtime_ns, st_.st_size))
+    return ("none",)
+
+
+def all_posts() -> pd.DataFrame:
+    lo, hi = posts_bounds()
+    if lo is None:
+        return load_posts().df
+    return posts_window(lo, hi)
@@ -0,0 +1,8 @@
+# tests/conftest.py — La raíz del repo (local_api, common) y src/ (utils, services) importables
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+for p in (ROOT, ROOT / "src"):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from local_api.cache import TTLCache
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache(ttl=30)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"n": calls}
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_load("k", loader) for _ in range(10)))
+
+    results = run(main())
+    assert calls == 1
+    assert all(r == {"n": 1} for r in results)
+    assert cache.coalesced == 9
+    assert cache.get("k") == {"n": 1}
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    cache = TTLCache(ttl=30)
+
+    async def loader():
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    async def main():
+        leader = asyncio.ensure_future(cache.get_or_load("k", loader))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(cache.get_or_load("k", loader))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower, leader
+
+    value, leader = run(main())
+    assert value == "ok"
+    assert leader.cancelled()
+    assert cache.get("k") == "ok"
+
+
+def test_should_cache_false_is_not_stored():
+    cache = TTLCache(ttl=30)
+
+    async def loader():
+        return {"_status_code": 500}
+
+    run(cache.get_or_load("k", loader, should_cache=lambda v: v["_status_code"] == 200))
+    assert cache.get("k") is None
+    assert not cache.is_inflight("k")
+
+
+def test_lru_and_fifo_eviction():
+    lru = TTLCache(max_entries=2, policy="lru")
+    fifo = TTLCache(max_entries=2, policy="fifo")
+    for c in (lru, fifo):
+        c.set("a", 1)
+        c.set("b", 2)
+        c.get("a")
+        c.set("c", 3)
+    assert lru.get("a") == 1 and lru.get("b") is None
+    assert fifo.get("a") is None and fifo.get("b") == 2
+
+
+def test_expired_entries_miss():
+    cache = TTLCache(ttl=30)
+    cache.set("k", 1, ttl=0)
+    assert cache.get("k") is None
+    assert not cache.has_fresh("k")
+
+
+def test_unknown_policy_rejected():
+    with pytest.raises(ValueError):
+        TTLCache(policy="random")
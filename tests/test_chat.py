@@ -0,0 +1,85 @@
+import threading
+
+from local_api.chat import ChatBuffer, ChatPollerRegistry, LiveChatPoller
+
+
+def test_buffer_dedups_by_id_and_keeps_totals():
+    buf = ChatBuffer(max_messages=3)
+    assert buf.add("a", {"mensaje": "1"})
+    assert not buf.add("a", {"mensaje": "1"})
+    for i in range(5):
+        buf.add(f"m{i}", {"mensaje": str(i)})
+    snap = buf.snapshot(limit=10)
+    assert snap["total"] == 6
+    assert snap["duplicates"] == 1
+    assert [c["mensaje"] for c in snap["comentarios"]] == ["2", "3", "4"]
+
+
+def test_buffer_forgets_oldest_ids_past_max_seen():
+    buf = ChatBuffer(max_messages=2, max_seen_ids=2)
+    for mid in ("a", "b", "c"):
+        buf.add(mid, {})
+    assert buf.add("a", {})  # "a" ya salió de la ventana de IDs
+    assert not buf.add("c", {})
+
+
+def _page(ids, token):
+    return {
+        "_status_code": 200,
+        "items": [{"id": i, "snippet": {"displayMessage": i}, "authorDetails": {"displayName": "u"}} for i in ids],
+        "nextPageToken": token,
+        "pollingIntervalMillis": 0,
+    }
+
+
+def test_restarted_poller_inherits_buffer_and_page_token():
+    tokens = []
+    served = threading.Event()
+
+    def fetch(token):
+        tokens.append(token)
+        served.set()
+        return _page([f"{token}-{i}" for i in range(3)], f"p{len(tokens)}")
+
+    def factory(key):
+        return LiveChatPoller(key, fetch, ChatBuffer(), idle_timeout=60, min_interval=60)
+
+    registry = ChatPollerRegistry(factory)
+    first = registry.ensure("chat")
+    assert first.first_page.wait(2)
+    first.stop()
+    first._thread.join(2)
+    total = first.buffer.total
+
+    served.clear()
+    second = registry.ensure("chat")
+    assert second is not first
+    assert second.buffer is first.buffer
+    assert served.wait(2)
+    second.stop()
+    assert tokens == [None, "p1"]
+    second._thread.join(2)
+    assert second.buffer.total == total + 3
+
+
+def test_ended_poller_is_kept_for_its_totals():
+    def fetch(_token):
+        return {"_status_code": 404}
+
+    registry = ChatPollerRegistry(lambda key: LiveChatPoller(key, fetch, ChatBuffer(), min_interval=60))
+    first = registry.ensure("chat")
+    first._thread.join(2)
+    assert first.ended
+    assert registry.ensure("chat") is first
+
+
+def test_max_workers_stops_the_least_recent_worker():
+    def fetch(_token):
+        return _page([], None)
+
+    registry = ChatPollerRegistry(lambda key: LiveChatPoller(key, fetch, ChatBuffer(), min_interval=60), max_workers=1)
+    a = registry.ensure("a")
+    b = registry.ensure("b")
+    assert not a.is_alive() and b.is_alive()
+    assert registry.get("a") is a  # detenido, pero conserva su buffer
+    registry.stop_all()
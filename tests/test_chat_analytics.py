@@ -0,0 +1,44 @@
+from local_api.chat_analytics import ChatAnalytics, minute_of
+
+
+def iso(minute, second=0):
+    return f"2025-01-01T20:{minute:02d}:{second:02d}Z"
+
+
+def test_minute_of_accepts_iso_and_epoch_ms():
+    m = minute_of(iso(5))
+    assert minute_of(iso(5, 59)) == m
+    assert minute_of(m * 60 * 1000) == m
+    assert minute_of(m * 60) == m
+
+
+def test_per_minute_fills_gaps_in_order():
+    a = ChatAnalytics(minutes=10)
+    a.add({"autor": "x", "mensaje": "hola", "ts": iso(0)})
+    a.add({"autor": "y", "mensaje": "hola", "ts": iso(3)})
+    a.add({"autor": "z", "mensaje": "hola", "ts": iso(1)})  # atrasado, dentro de la ventana
+    per = a.per_minute()
+    assert [p["comments"] for p in per] == [1, 1, 1]
+    assert [p["minute"][14:16] for p in per] == ["00", "01", "03"]
+    assert a.late == 0
+
+
+def test_messages_older_than_window_only_count_in_totals():
+    a = ChatAnalytics(minutes=5)
+    a.add({"autor": "x", "mensaje": "", "ts": iso(30)})
+    a.add({"autor": "y", "mensaje": "", "ts": iso(10)})
+    assert a.messages == 2
+    assert a.late == 1
+    assert sum(p["comments"] for p in a.per_minute()) == 1
+
+
+def test_summary_terms_emojis_and_authors():
+    a = ChatAnalytics()
+    for author in ("ana", "beto", "ana"):
+        a.add({"autor": author, "mensaje": "Golazo golazo que partido :fire: ❤", "ts": iso(0)})
+    s = a.summary(k=3)
+    assert s["messages"] == 3
+    assert s["uniqueAuthors"] == 2
+    assert s["topTerms"][0] == {"term": "golazo", "count": 6, "maxError": 0}
+    assert "que" not in [t["term"] for t in s["topTerms"]]
+    assert {e["emoji"] for e in s["topEmojis"]} == {":fire:", "❤"}
@@ -0,0 +1,48 @@
+from datetime import date
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("streamlit")
+
+from utils.cube import PostsCube  # noqa: E402
+
+
+@pytest.fixture
+def cube():
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2025-01-01", "2025-01-01", "2025-01-03", "2025-01-02"]),
+        "platform": ["YouTube", "YouTube", "YouTube", "TikTok"],
+        "posts": [1, 1, 1, 1],
+        "views": [10, 20, 40, 5],
+        "interactions": [1, 2, 4, 1],
+    })
+    return PostsCube.from_frame(df)
+
+
+def test_totals_match_groupby(cube):
+    assert cube.totals("YouTube", date(2025, 1, 1), date(2025, 1, 2)) == {"posts": 2.0, "views": 30.0, "interactions": 3.0}
+    assert cube.totals("YouTube", date(2024, 1, 1), date(2026, 1, 1))["views"] == 70.0
+    assert cube.totals("Nadie", date(2025, 1, 1), date(2025, 1, 3))["views"] == 0.0
+
+
+def test_inverted_range_is_swapped(cube):
+    d1, d3 = date(2025, 1, 1), date(2025, 1, 3)
+    assert cube.totals("YouTube", d3, d1) == cube.totals("YouTube", d1, d3)
+    assert cube.series("YouTube", "views", d3, d1).equals(cube.series("YouTube", "views", d1, d3))
+
+
+def test_series_only_has_days_with_rows(cube):
+    ts = cube.series("YouTube", "views", date(2025, 1, 1), date(2025, 1, 3))
+    assert ts["views"].tolist() == [30.0, 40.0]
+    assert ts["date"].dt.day.tolist() == [1, 3]
+
+
+def test_bounds_per_platform(cube):
+    assert cube.bounds("TikTok") == (date(2025, 1, 2), date(2025, 1, 2))
+    assert cube.bounds("Nadie") == (None, None)
+
+
+def test_empty_frame():
+    cube = PostsCube.from_frame(pd.DataFrame(columns=["date", "platform", "posts", "views", "interactions"]))
+    assert cube.bounds("YouTube") == (None, None)
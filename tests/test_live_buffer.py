@@ -0,0 +1,60 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("streamlit")
+
+from utils.live_buffer import LiveBuffer, downsample, lttb_indices  # noqa: E402
+
+
+def test_since_returns_only_new_samples():
+    buf = LiveBuffer(maxlen=5)
+    buf.append_many({"YouTube": {"viewers": 1}, "TikTok": {"viewers": 2}}, ts=1.0)
+    seq = buf.seq
+    buf.append("YouTube", {"viewers": 3}, ts=2.0)
+    assert [s[:3] for s in buf.since(seq)] == [(2.0, "YouTube", 3)]
+    assert buf.since(buf.seq) == []
+
+
+def test_since_loses_rotated_samples():
+    buf = LiveBuffer(maxlen=3)
+    for i in range(10):
+        buf.append("YouTube", {"viewers": i}, ts=float(i))
+    assert [s[2] for s in buf.since(0)] == [7, 8, 9]
+
+
+def test_wide_has_one_column_per_platform():
+    buf = LiveBuffer()
+    buf.append_many({"YouTube": {"likes": 5}, "TikTok": {"likes": 7}}, ts=60.0)
+    df = buf.wide("likes")
+    assert list(df.columns) == ["TikTok", "YouTube"]
+    assert df.iloc[0].tolist() == [7, 5]
+    assert df.index[0] == pd.Timestamp(60, unit="s")
+    assert LiveBuffer().wide().empty
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(1000)
+    y = np.zeros(1000)
+    y[437] = 100.0
+    y[800] = -50.0
+    idx = lttb_indices(x, y, 50)
+    assert len(idx) == 50
+    assert idx[0] == 0 and idx[-1] == 999
+    assert np.all(np.diff(idx) > 0)
+    assert {437, 800} <= set(idx.tolist())
+
+
+def test_lttb_returns_everything_below_threshold():
+    assert lttb_indices(np.arange(10), np.arange(10), 20).tolist() == list(range(10))
+    assert lttb_indices(np.arange(10), np.arange(10), 2).tolist() == list(range(10))
+
+
+def test_downsample_keeps_union_of_columns():
+    idx = pd.date_range("2025-01-01", periods=500, freq="s")
+    df = pd.DataFrame({"a": np.sin(np.arange(500) / 10), "b": np.r_[np.full(250, np.nan), np.arange(250.0)]}, index=idx)
+    out = downsample(df, 40)
+    assert 40 <= len(out) <= 80
+    assert out.index.is_monotonic_increasing
+    assert out.index[0] == idx[0] and out.index[-1] == idx[-1]
+    assert downsample(df, 1000) is df
@@ -0,0 +1,60 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+from services.live_fetch import LiveFetcher  # noqa: E402
+
+
+def fetcher(**kw):
+    f = LiveFetcher(max_workers=4, **kw)
+    f.calls = []
+
+    def get(url, params):
+        f.calls.append(url)
+        time.sleep(0.05)
+        return {"url": url}
+
+    f._get = get
+    return f
+
+
+def test_fetch_many_runs_sources_in_parallel():
+    f = fetcher(ttl=5)
+    start = time.monotonic()
+    out = f.fetch_many({n: (f"http://x/{n}", None) for n in "abcd"})
+    assert time.monotonic() - start < 0.15  # en serie serían 0.2 s
+    assert out["c"] == {"url": "http://x/c"}
+
+
+def test_identical_requests_share_one_call():
+    f = fetcher(ttl=5)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(f.get("http://x/a", {"v": 1}))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert f.calls == ["http://x/a"]
+    assert len(results) == 5
+    f.get("http://x/a", {"v": 1})
+    assert f.hits >= 1 and f.calls == ["http://x/a"]
+
+
+def test_errors_are_not_cached():
+    f = LiveFetcher(ttl=5)
+    f._get = lambda url, params: {"error": "boom"}
+    assert f.get("http://x/a") == {"error": "boom"}
+    assert not f._cache
+
+
+def test_cache_is_bounded_and_drops_expired():
+    f = fetcher(ttl=0.5, max_entries=3)
+    for i in range(10):
+        f.get(f"http://x/{i}")
+    assert [k[0] for k in f._cache] == ["http://x/7", "http://x/8", "http://x/9"]
+    time.sleep(0.5)
+    f.get("http://x/new")
+    assert len(f._cache) == 1
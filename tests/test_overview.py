@@ -0,0 +1,60 @@
+from local_api.overview import OverviewRollup, empty_overview
+
+HEADER = "date,platform,posts,views,interactions\n"
+
+
+def make(tmp_path, rows, geo=None):
+    posts = tmp_path / "posts.csv"
+    posts.write_text(HEADER + rows)
+    geo_path = None
+    if geo is not None:
+        geo_path = tmp_path / "geo.csv"
+        geo_path.write_text(geo)
+    return OverviewRollup(str(tmp_path / "ov.db"), posts, geo_path), posts
+
+
+def test_range_totals_from_cumulative_sums(tmp_path):
+    ov, _ = make(tmp_path, "2025-01-01,YouTube,1,100,10\n2025-01-02,YouTube,2,200,20\n2025-01-03,YouTube,3,300,30\n"
+                           "2025-01-02,TikTok,1,50,5\n")
+    out = ov.query("2025-01-02", "2025-01-03")
+    table = {r["platform"]: r for r in out["table"]}
+    assert table["YouTube"] == {"platform": "YouTube", "posts": 5, "interactions": 50, "views": 500}
+    assert table["TikTok"]["views"] == 50
+    assert [s["value"] for s in out["share"]] == [round(500 / 550 * 100, 2), round(50 / 550 * 100, 2)]
+
+
+def test_posts_by_day_includes_empty_days(tmp_path):
+    ov, _ = make(tmp_path, "2025-01-01,YouTube,2,0,0\n2025-01-04,YouTube,1,0,0\n")
+    days = ov.query("2025-01-01", "2025-01-04")["posts_by_day"]
+    assert [d["posts"] for d in days] == [2, 0, 0, 1]
+
+
+def test_appended_rows_are_ingested_incrementally(tmp_path):
+    ov, posts = make(tmp_path, "2025-01-01,YouTube,1,100,0\n")
+    ov.query("2025-01-01", "2025-01-31")
+    with posts.open("a") as f:
+        f.write("2025-01-02,YouTube,1,50,0\n")
+    out = ov.query("2025-01-01", "2025-01-31")
+    assert out["views_by_platform"] == [{"platform": "YouTube", "views": 150}]
+    assert ov.rebuilds == 1
+    assert ov.rows_ingested == 2
+
+
+def test_rewritten_file_is_rebuilt(tmp_path):
+    ov, posts = make(tmp_path, "2025-01-01,YouTube,1,100,0\n")
+    ov.query("2025-01-01", "2025-01-31")
+    posts.write_text(HEADER + "2025-01-01,TikTok,1,7,0\n")
+    out = ov.query("2025-01-01", "2025-01-31")
+    assert out["views_by_platform"] == [{"platform": "TikTok", "views": 7}]
+    assert ov.rebuilds == 2
+
+
+def test_undated_geo_rows_enter_every_range(tmp_path):
+    ov, _ = make(tmp_path, "2025-01-01,YouTube,1,1,0\n", geo="iso3,views\nBOL,10\nARG,5\n")
+    geo = ov.query("2025-02-01", "2025-02-02")["geo"]
+    assert geo == [{"country": "Bolivia", "iso3": "BOL", "views": 10}, {"country": "Argentina", "iso3": "ARG", "views": 5}]
+
+
+def test_empty_overview_has_query_schema(tmp_path):
+    ov, _ = make(tmp_path, "")
+    assert set(empty_overview()) == set(ov.query("2025-01-01", "2025-01-01"))
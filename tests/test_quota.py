@@ -0,0 +1,60 @@
+import pytest
+
+from local_api.quota import QuotaScheduler
+
+
+@pytest.fixture
+def quota(monkeypatch):
+    # 10 000 s hasta el reinicio: con 10 000 unidades sobra 1 unidad/s
+    monkeypatch.setattr(QuotaScheduler, "seconds_to_reset", staticmethod(lambda: 10000.0))
+    return QuotaScheduler(daily_budget=10000, min_interval=0.1, max_interval=300)
+
+
+def test_single_video_gets_the_whole_budget(quota):
+    quota.touch("a", "videos.list")
+    assert quota.interval("a", "videos.list") == pytest.approx(1.0)
+
+
+def test_budget_is_split_between_watched_videos_and_endpoints(quota):
+    quota.touch("a", "videos.list")
+    quota.touch("b", "videos.list")
+    quota.touch("b", "liveChatMessages.list")
+    assert quota.interval("a", "videos.list") == pytest.approx(2.0)
+    # dos endpoints activos, cada uno con la mitad; el chat cuesta 5 unidades
+    assert quota.interval("b", "liveChatMessages.list") == pytest.approx(5 * 2 / 0.5)
+
+
+def test_spending_slows_the_pace_and_exhaustion_hits_max(quota):
+    quota.touch("a", "videos.list")
+    quota.spend("videos.list", 5000)
+    assert quota.interval("a", "videos.list") == pytest.approx(2.0)
+    quota.spend("liveChatMessages.list", 5000)
+    assert quota.interval("a", "videos.list") == 300
+    assert quota.state()["remaining"] == 0
+
+
+def test_unwatched_video_uses_min_interval(quota):
+    assert quota.interval("nadie", "videos.list") == 0.1
+
+
+def test_idle_stream_yields_budget_to_growing_one(quota):
+    for vid in ("idle", "hot"):
+        quota.touch(vid, "videos.list")
+    for viewers in (100, 100, 100, 100):
+        quota.observe("idle", viewers)
+    for viewers in (100, 150, 220, 300):
+        quota.observe("hot", viewers)
+    assert quota.interval("hot", "videos.list") < quota.interval("idle", "videos.list")
+
+    flat = QuotaScheduler(daily_budget=10000, min_interval=0.1, adaptive=False)
+    for vid in ("idle", "hot"):
+        flat.touch(vid, "videos.list")
+    assert flat.interval("hot", "videos.list") == flat.interval("idle", "videos.list")
+
+
+def test_spend_uses_endpoint_cost(quota):
+    quota.spend("videos.list")
+    quota.spend("liveChatMessages.list")
+    state = quota.state()
+    assert state["spentByEndpoint"] == {"videos.list": 1, "liveChatMessages.list": 5}
+    assert state["callsByEndpoint"] == {"videos.list": 1, "liveChatMessages.list": 1}
@@ -0,0 +1,46 @@
+import pytest
+
+pytest.importorskip("starlette")
+
+from local_api import ratelimit  # noqa: E402
+from local_api.ratelimit import RateLimiter, TokenBucket  # noqa: E402
+
+
+def test_bucket_allows_burst_then_reports_wait():
+    bucket = TokenBucket(rate=2.0, burst=3.0, now=0.0)
+    assert [bucket.take(0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take(0.0) == pytest.approx(0.5)
+    assert bucket.take(0.5) == 0.0  # medio segundo repone un token
+
+
+def test_bucket_never_exceeds_burst():
+    bucket = TokenBucket(rate=1.0, burst=2.0, now=0.0)
+    bucket.take(0.0)
+    bucket.take(1000.0)
+    bucket.take(1000.0)
+    assert bucket.take(1000.0) > 0
+
+
+def test_limiter_is_per_client_and_route(monkeypatch):
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: 100.0)
+    limiter = RateLimiter(rate=1.0, burst=1.0, routes={"/slow": (0.5, 2.0)})
+    assert limiter.check("a", "/x") == 0.0
+    assert limiter.check("a", "/x") > 0
+    assert limiter.check("b", "/x") == 0.0
+    assert limiter.check("a", "/slow") == 0.0
+    assert limiter.check("a", "/slow") == 0.0
+    assert limiter.check("a", "/slow") == pytest.approx(2.0)
+
+
+def test_limiter_buckets_are_lru_bounded():
+    limiter = RateLimiter(max_buckets=2)
+    for client in ("a", "b", "c"):
+        limiter.check(client, "/x")
+    assert [k[0] for k in limiter._buckets] == ["b", "c"]
+
+
+def test_parse_routes():
+    assert RateLimiter.parse_routes("/live-data=2:10, /tiktok-stats=5,bad") == {
+        "/live-data": (2.0, 10.0),
+        "/tiktok-stats": (5.0, 5.0),
+    }
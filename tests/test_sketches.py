@@ -0,0 +1,47 @@
+import pytest
+
+from local_api.sketches import HyperLogLog, SpaceSaving
+
+
+def test_space_saving_exact_under_capacity():
+    ss = SpaceSaving(capacity=10)
+    for item, n in (("a", 5), ("b", 3), ("c", 1)):
+        for _ in range(n):
+            ss.offer(item)
+    assert ss.top(2) == [("a", 5.0, 0.0), ("b", 3.0, 0.0)]
+    assert ss.total == 9
+
+
+def test_space_saving_keeps_heavy_hitters_with_bounded_error():
+    ss = SpaceSaving(capacity=5)
+    for i in range(1000):
+        ss.offer("heavy", 10)
+        ss.offer(f"noise-{i}")
+    assert len(ss) == 5
+    item, count, error = ss.top(1)[0]
+    assert item == "heavy"
+    assert count - error <= 10000 <= count
+
+
+@pytest.mark.parametrize("n", [10, 1000, 50000])
+def test_hyperloglog_error_within_bounds(n):
+    hll = HyperLogLog(p=12)
+    for i in range(n):
+        hll.add(f"user-{i}")
+        hll.add(f"user-{i}")  # repetidos no suman
+    assert abs(hll.count() - n) <= max(2, 0.05 * n)
+
+
+def test_hyperloglog_merge_is_union():
+    a, b = HyperLogLog(10), HyperLogLog(10)
+    for i in range(3000):
+        (a if i % 2 else b).add(i)
+        if i < 1000:
+            b.add(i)  # solapamiento entre ambos
+    a.merge(b)
+    assert abs(a.count() - 3000) <= 0.06 * 3000
+
+
+def test_hyperloglog_merge_requires_same_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(10).merge(HyperLogLog(12))
@@ -0,0 +1,84 @@
+import json
+
+from local_api.gift_index import GiftIndex
+from local_api.tiktok_files import parse_capture
+from local_api.tiktok_log import NdjsonTail
+
+
+def write(path, *events, mode="a"):
+    with path.open(mode) as f:
+        for ev in events:
+            f.write(json.dumps(ev) + "\n")
+
+
+def gift(user, diamonds, ts="2025-01-01T20:00:00Z"):
+    return {"t": "gift", "user": user, "gift": "rose", "amount": 1, "diamonds": diamonds, "ts": ts}
+
+
+def test_tail_only_reads_new_lines(tmp_path):
+    log = tmp_path / "live_x.ndjson"
+    write(log, {"t": "start", "username": "x", "ts": "2025-01-01T20:00:00Z"}, {"t": "chat"}, mode="w")
+    tail = NdjsonTail(log)
+    assert tail.read()["comments"] == 1
+    offset = tail.offset
+    write(log, {"t": "chat"}, gift("a", 5))
+    data = tail.read(gifts=True)
+    assert (data["comments"], data["diamonds"], data["giftsCount"]) == (2, 5, 1)
+    assert tail.lines == 4 and tail.offset > offset
+
+
+def test_partial_line_waits_for_newline(tmp_path):
+    log = tmp_path / "live_x.ndjson"
+    log.write_text(json.dumps({"t": "chat"}) + "\n" + '{"t": "ch')
+    tail = NdjsonTail(log)
+    assert tail.read()["comments"] == 1
+    with log.open("a") as f:
+        f.write('at"}\n')
+    assert tail.read()["comments"] == 2
+    assert tail.bad_lines == 0
+
+
+def test_start_resets_but_resume_continues(tmp_path):
+    log = tmp_path / "live_x.ndjson"
+    write(log, {"t": "start", "username": "x"}, {"t": "like", "n": 3}, {"t": "end"}, mode="w")
+    tail = NdjsonTail(log)
+    assert tail.read()["ended"]
+    write(log, {"t": "resume", "username": "x"}, {"t": "like", "n": 2})
+    data = tail.read()
+    assert (data["likes"], data["ended"]) == (5, False)
+    write(log, {"t": "start", "username": "x"}, {"t": "like", "n": 1})
+    assert tail.read()["likes"] == 1
+
+
+def test_truncated_file_is_reread(tmp_path):
+    log = tmp_path / "live_x.ndjson"
+    write(log, {"t": "chat"}, {"t": "chat"}, {"t": "chat"}, mode="w")
+    tail = NdjsonTail(log)
+    assert tail.read()["comments"] == 3
+    write(log, {"t": "chat"}, mode="w")
+    assert tail.read()["comments"] == 1
+
+
+def test_gifts_limit_returns_latest(tmp_path):
+    log = tmp_path / "live_x.ndjson"
+    write(log, *(gift(f"u{i}", 1) for i in range(5)), mode="w")
+    data = NdjsonTail(log, max_gifts=3).read(gifts=True, limit=2)
+    assert [g["user"] for g in data["gifts"]] == ["u3", "u4"]
+    assert "gifts" not in NdjsonTail(log).read()
+
+
+def test_leaderboard_from_log_is_complete(tmp_path):
+    log = tmp_path / "live_x.ndjson"
+    write(log, gift("a", 5), gift("b", 1), gift("a", 5, ts="2025-01-01T20:01:10Z"), mode="w")
+    board = NdjsonTail(log).read()["index"].leaderboard(k=1)
+    assert board["source"] == "ndjson" and not board["partial"]
+    assert board["topGifters"] == [{"user": "a", "diamonds": 10, "maxError": 0}]
+    assert [m["diamonds"] for m in board["diamondsPerMinute"]] == [6, 5]
+    assert board["lastMinuteDiamonds"] == 5
+
+
+def test_snapshot_leaderboard_is_flagged_partial():
+    raw = {"username": "x", "giftsCount": 10, "gifts": [{"user": "a", "gift": "rose", "diamonds": 1}]}
+    board = parse_capture(raw)["index"].leaderboard()
+    assert board["source"] == "snapshot" and board["partial"]
+    assert not GiftIndex.from_gifts(raw["gifts"], total=1).partial
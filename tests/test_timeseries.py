@@ -0,0 +1,65 @@
+import time
+
+import pytest
+
+from local_api.timeseries import SnapshotWriter, TimeSeriesStore
+
+T0 = int(time.time()) // 3600 * 3600 - 3600  # hace una hora, inicio de hora (dentro de toda retención)
+
+
+@pytest.fixture
+def store():
+    s = TimeSeriesStore(":memory:", min_interval=5)
+    yield s
+    s.close()
+
+
+def test_min_interval_throttles_per_stream(store):
+    assert store.record("yt", "v", {"viewers": 1}, ts=T0)
+    assert not store.record("yt", "v", {"viewers": 2}, ts=T0 + 1)
+    assert store.record("yt", "other", {"viewers": 2}, ts=T0 + 1)
+    assert (store.samples, store.skipped) == (2, 1)
+
+
+def test_rollups_keep_count_sum_min_max_last(store):
+    for i, v in enumerate((10, 30, 20)):
+        store.record("yt", "v", {"viewers": v, "title": "no numérico"}, ts=T0 + 10 * i)
+    out = store.query("yt", "v", T0, T0 + 59, step=60)
+    assert out["tier"] == "1m"
+    assert out["series"] == {"viewers": [{"t": T0, "avg": 20.0, "min": 10.0, "max": 30.0, "last": 20.0}]}
+
+
+def test_query_picks_cheapest_tier_for_step(store):
+    now = T0 + 86400
+    assert store.pick_tier(now - 600, 1, now=now)[0] == "raw"
+    assert store.pick_tier(now - 600, 300, now=now)[0] == "1m"
+    assert store.pick_tier(now - 600, 7200, now=now)[0] == "1h"
+    # fuera de la retención de raw (48 h): solo queda un tier más grueso
+    assert store.pick_tier(now - 5 * 86400, 1, now=now)[0] == "1m"
+
+
+def test_writer_flushes_queue_on_close(store):
+    store.min_interval = 0
+    writer = SnapshotWriter(store).start()
+    for i in range(20):
+        assert writer.submit("tt", f"u{i}", {"likes": i})
+    writer.close()
+    assert store.samples == 20
+    assert writer.stats() == {"pending": 0, "dropped": 0, "errors": 0}
+
+
+def test_writer_drops_when_queue_is_full(store):
+    writer = SnapshotWriter(store, max_pending=2)  # sin start(): nadie vacía la cola
+    assert writer.submit("tt", "a", {"likes": 1})
+    assert writer.submit("tt", "b", {"likes": 1})
+    assert not writer.submit("tt", "c", {"likes": 1})
+    assert writer.dropped == 1
+
+
+def test_writer_keeps_submit_timestamp(store):
+    writer = SnapshotWriter(store).start()
+    before = time.time()
+    writer.submit("yt", "v", {"viewers": 1})
+    writer.close()
+    t = store.query("yt", "v", before - 60, before + 60, step=1)["series"]["viewers"][0]["t"]
+    assert int(before) <= t <= int(before) + 1
@@ -1,4 +1,6 @@
-// tiktok_live.js — Captura métricas de un Live de TikTok y guarda en live_<usuario>.json
+// tiktok_live.js — Captura métricas de un Live de TikTok
+//   - live_<usuario>.ndjson: log append-only de eventos (1 línea JSON compacta por evento)
+//   - live_<usuario>.json:   snapshot pequeño y periódico (contadores + últimos gifts)
 // Requisitos:  npm init -y && npm i tiktok-live-connector
 // Ejecutar (PowerShell):
 //   $env:TIKTOK_USERNAME="usuario_en_vivo"
@@ -20,6 +22,10 @@ if (!USERNAME) {
 
 // Si TIKTOK_JSON_PATH no está, guardamos en live_<usuario>.json en el cwd
 const OUT_JSON = process.env.TIKTOK_JSON_PATH || path.resolve(process.cwd(), `live_${USERNAME}.json`);
+// El log va junto al snapshot: live_<usuario>.ndjson
+const OUT_LOG = process.env.TIKTOK_LOG_PATH || OUT_JSON.replace(/\.json$/i, "") + ".ndjson";
+const SNAPSHOT_MS = parseInt(process.env.TIKTOK_SNAPSHOT_MS || "5000", 10);
+const SNAPSHOT_GIFTS = parseInt(process.env.TIKTOK_SNAPSHOT_GIFTS || "50", 10);
 
 // Cookies/UA para evitar bloqueos regionales
 const UA = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36";
@@ -39,44 +45,133 @@ const state = {
   viewers: 0,
   diamonds: 0,
   shares: 0,
-  gifts: [], // { user, gift, amount, diamonds, ts }
+  giftsCount: 0,
+  gifts: [], // últimos SNAPSHOT_GIFTS: { user, gift, amount, diamonds, ts }
   startedAt: new Date().toISOString(),
   lastUpdate: null,
 };
 
-// Guardado con debounce
-let t = null;
+// -------- Log de eventos (append-only) --------
+// El log se abre en modo append: si el supervisor reinicia el capturador a mitad del live,
+// se reconstruyen los contadores desde el log y se sigue escribiendo a continuación
+// (evento "resume"); el lector no pierde lo acumulado. Un live nuevo empieza con "start".
+function foldEvent(ev) {
+  switch (ev.t) {
+    case "start":
+      Object.assign(state, { likes: 0, comments: 0, viewers: 0, diamonds: 0, shares: 0, giftsCount: 0, gifts: [] });
+      state.startedAt = ev.ts || state.startedAt;
+      break;
+    case "roomUser": state.viewers = ev.viewers ?? state.viewers; break;
+    case "like":
+      if (typeof ev.n === "number") state.likes += ev.n;
+      else if (typeof ev.total === "number") state.likes = ev.total;
+      break;
+    case "chat": state.comments += 1; break;
+    case "share": state.shares += 1; break;
+    case "gift": {
+      const { t, ...item } = ev;
+      state.gifts.push(item);
+      if (state.gifts.length > SNAPSHOT_GIFTS) state.gifts.shift();
+      state.giftsCount += 1;
+      state.diamonds += item.diamonds || 0;
+      break;
+    }
+  }
+  if (ev.ts) state.lastUpdate = ev.ts;
+}
+
+function replayLog() {
+  // devuelve el último evento del log (null si no hay) y deja el log terminado en "\n"
+  let text;
+  try {
+    text = fs.readFileSync(OUT_LOG, "utf-8");
+  } catch {
+    return null;
+  }
+  let last = null;
+  for (const line of text.split("\n")) {
+    if (!line.trim()) continue;
+    try {
+      last = JSON.parse(line);
+      foldEvent(last);
+    } catch {}  // línea cortada por una caída: se ignora
+  }
+  if (text && !text.endsWith("\n")) fs.appendFileSync(OUT_LOG, "\n");
+  return last;
+}
+
+const lastEvent = replayLog();
+const resuming = lastEvent !== null && lastEvent.t !== "end";
+
+let logFd = null;
+try {
+  logFd = fs.openSync(OUT_LOG, "a");
+} catch (e) {
+  console.error("❌ No se pudo abrir el log NDJSON:", e.message);
+}
+function logEvent(ev) {
+  const ts = new Date().toISOString();
+  state.lastUpdate = ts;
+  if (logFd === null) return;
+  try {
+    fs.writeSync(logFd, JSON.stringify({ ts, ...ev }) + "\n");
+  } catch (e) {
+    console.error("❌ Error escribiendo log:", e.message);
+  }
+}
+if (resuming) {
+  logEvent({ t: "resume", username: USERNAME });
+} else {
+  foldEvent({ t: "start" });
+  state.startedAt = new Date().toISOString();
+  logEvent({ t: "start", username: USERNAME });
+}
+
+// -------- Snapshot periódico (pequeño, tamaño acotado) --------
+let dirty = false;
 function scheduleSave() {
-  if (t) clearTimeout(t);
-  t = setTimeout(saveNow, 300);
+  dirty = true;
 }
 function saveNow() {
   try {
-    state.lastUpdate = new Date().toISOString();
-    fs.writeFileSync(OUT_JSON, JSON.stringify(state, null, 2), { encoding: "utf-8" });
+    const tmp = OUT_JSON + ".tmp";
+    fs.writeFileSync(tmp, JSON.stringify(state), { encoding: "utf-8" });
+    fs.renameSync(tmp, OUT_JSON);  // reemplazo atómico: el lector nunca ve un JSON a medias
+    dirty = false;
   } catch (e) {
     console.error("❌ Error escribiendo JSON:", e.message);
   }
 }
+setInterval(() => { if (dirty) saveNow(); }, SNAPSHOT_MS);
+saveNow();
 
 // -------- Eventos --------
 conn.on("roomUser", (d) => {
-  if (typeof d.viewerCount === "number") state.viewers = d.viewerCount;
+  if (typeof d.viewerCount === "number") {
+    state.viewers = d.viewerCount;
+    logEvent({ t: "roomUser", viewers: d.viewerCount });
+  }
   scheduleSave();
 });
 
 conn.on("like", (d) => {
-  if (typeof d.likeCount === "number") state.likes += d.likeCount;
-  else if (typeof d.totalLikeCount === "number") state.likes = d.totalLikeCount;
+  if (typeof d.likeCount === "number") {
+    state.likes += d.likeCount;
+    logEvent({ t: "like", n: d.likeCount });
+  } else if (typeof d.totalLikeCount === "number") {
+    state.likes = d.totalLikeCount;
+    logEvent({ t: "like", total: d.totalLikeCount });
+  }
   scheduleSave();
 });
 
 conn.on("chat", () => {
   state.comments += 1;
+  logEvent({ t: "chat" });
   scheduleSave();
 });
 
-const onShare = () => { state.shares += 1; scheduleSave(); };
+const onShare = () => { state.shares += 1; logEvent({ t: "share" }); scheduleSave(); };
 conn.on("share", onShare);
 conn.on("social", (ev) => {
   if (ev && (ev.displayType === "share" || ev.label === "share")) onShare();
@@ -91,7 +186,10 @@ conn.on("gift", (d) => {
     ts: new Date().toISOString(),
   };
   state.gifts.push(item);
+  if (state.gifts.length > SNAPSHOT_GIFTS) state.gifts.shift();
+  state.giftsCount += 1;
   state.diamonds += item.diamonds;
+  logEvent({ t: "gift", ...item });
   scheduleSave();
 });
 
@@ -102,6 +200,7 @@ conn.on("disconnected", () => {
 
 conn.on("streamEnd", () => {
   console.warn("🛑 El stream terminó.");
+  logEvent({ t: "end" });
   scheduleSave();
 });
 
@@ -109,7 +208,7 @@ async function connect() {
   try {
     const info = await conn.connect();
     console.log(`✅ Conectado a @${USERNAME} | RoomId: ${info.roomId}`);
-    console.log(`Guardando en: ${OUT_JSON}`);
+    console.log(`Guardando en: ${OUT_JSON} (eventos en ${OUT_LOG})`);
   } catch (err) {
     console.error("❌ Error conectando:", err?.message || err);
     if ((err?.message || "").includes("SIGI_STATE")) {
@@ -122,5 +221,11 @@ async function connect() {
 
 connect();
 
-process.on("SIGINT", () => { console.log("\n💾 Guardando y saliendo..."); try { saveNow(); } catch {} process.exit(0); });
-process.on("SIGTERM", () => { console.log("\n💾 Guardando y saliendo..."); try { saveNow(); } catch {} process.exit(0); });
+function shutdown() {
+  console.log("\n💾 Guardando y saliendo...");
+  try { saveNow(); } catch {}
+  try { if (logFd !== null) fs.closeSync(logFd); } catch {}
+  process.exit(0);
+}
+process.on("SIGINT", shutdown);
+process.on("SIGTERM", shutdown);